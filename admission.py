@@ -0,0 +1,217 @@
+"""
+Admission control for upstream-bound requests.
+Routes that may call the portal API are tagged with a route class. Each
+class admits a bounded number of requests in flight plus a short queue;
+beyond that, requests are shed right away with 503 + Retry-After instead
+of piling up behind 15 s upstream timeouts. Requests a route can answer
+from DataCache are always admitted, so cached routes stay fast under load.
+"""
+
+import logging
+import math
+import os
+import threading
+import time
+from functools import wraps
+
+from flask import Response, jsonify
+
+logger = logging.getLogger(__name__)
+
+# Route class -> (max in flight, max queued, max queue wait in seconds).
+# user: one upstream call with the caller's token; public: shared-token
+# fallbacks when the cache is cold; fanout: several upstream calls per request
+DEFAULT_LIMITS = {
+    'user': (16, 32, 2.0),
+    'public': (8, 16, 2.0),
+    'fanout': (4, 8, 2.0),
+}
+
+# Retry-After bounds in seconds
+MIN_RETRY_AFTER = 1
+MAX_RETRY_AFTER = 30
+
+# Weight of the newest sample in the per-class service time average
+EWMA_ALPHA = 0.2
+
+
+def _env_flag(name, default):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+
+class RouteClass:
+    """In-flight and queued requests of one route class (thread-safe)."""
+
+    def __init__(self, name, max_in_flight, max_queued, queue_timeout):
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self._cond = threading.Condition()
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.cache_admitted = 0
+        self.rejected_full = 0
+        self.rejected_timeout = 0
+        self.peak_in_flight = 0
+        self.peak_queued = 0
+        self.avg_service_ms = None
+
+    def acquire(self):
+        """
+        Take an in-flight slot, waiting in the queue up to queue_timeout.
+
+        Returns:
+            True if admitted, False if the request should be shed
+        """
+        with self._cond:
+            if self.in_flight >= self.max_in_flight:
+                if self.queued >= self.max_queued:
+                    self.rejected_full += 1
+                    return False
+                self.queued += 1
+                self.peak_queued = max(self.peak_queued, self.queued)
+                deadline = time.monotonic() + self.queue_timeout
+                try:
+                    while self.in_flight >= self.max_in_flight:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.rejected_timeout += 1
+                            return False
+                        self._cond.wait(remaining)
+                finally:
+                    self.queued -= 1
+            self.in_flight += 1
+            self.admitted += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            return True
+
+    def release(self, service_ms):
+        with self._cond:
+            self.in_flight -= 1
+            if self.avg_service_ms is None:
+                self.avg_service_ms = service_ms
+            else:
+                self.avg_service_ms += EWMA_ALPHA * (service_ms - self.avg_service_ms)
+            self._cond.notify()
+
+    def retry_after(self):
+        """Seconds until a slot is likely free: the backlog drained at the observed service rate."""
+        with self._cond:
+            service_s = (self.avg_service_ms or 1000) / 1000
+            backlog = self.queued + 1
+            estimate = math.ceil(service_s * backlog / max(1, self.max_in_flight))
+        return min(MAX_RETRY_AFTER, max(MIN_RETRY_AFTER, estimate))
+
+    def stats(self):
+        with self._cond:
+            return {
+                'in_flight': self.in_flight,
+                'queued': self.queued,
+                'max_in_flight': self.max_in_flight,
+                'max_queued': self.max_queued,
+                'queue_timeout_seconds': self.queue_timeout,
+                'admitted': self.admitted,
+                'cache_admitted': self.cache_admitted,
+                'rejected_full': self.rejected_full,
+                'rejected_timeout': self.rejected_timeout,
+                'peak_in_flight': self.peak_in_flight,
+                'peak_queued': self.peak_queued,
+                'avg_service_ms': round(self.avg_service_ms, 1) if self.avg_service_ms is not None else None,
+            }
+
+
+class AdmissionController:
+    """Per route class admission limits, applied with the admit() decorator."""
+
+    def __init__(self, enabled=True, limits=None):
+        self.enabled = enabled
+        self.classes = {
+            name: RouteClass(name, *values)
+            for name, values in (limits or DEFAULT_LIMITS).items()
+        }
+
+    @classmethod
+    def from_env(cls):
+        """
+        Limits from ADMISSION_<CLASS>_MAX_IN_FLIGHT, ADMISSION_<CLASS>_MAX_QUEUED
+        and ADMISSION_<CLASS>_QUEUE_TIMEOUT; ADMISSION_ENABLED=0 turns shedding off.
+        """
+        limits = {}
+        for name, (in_flight, queued, timeout) in DEFAULT_LIMITS.items():
+            prefix = f'ADMISSION_{name.upper()}_'
+            limits[name] = (
+                int(os.environ.get(prefix + 'MAX_IN_FLIGHT', in_flight)),
+                int(os.environ.get(prefix + 'MAX_QUEUED', queued)),
+                float(os.environ.get(prefix + 'QUEUE_TIMEOUT', timeout)),
+            )
+        return cls(enabled=_env_flag('ADMISSION_ENABLED', True), limits=limits)
+
+    def admit(self, route_class, cached=None):
+        """
+        Decorator bounding a view's upstream-bound work.
+
+        Args:
+            route_class: Name of the route class whose limits apply
+            cached: Optional callable; when it returns True the request is
+                answered from the cache and always admitted
+
+        A streamed response keeps its slot until the client has received it.
+        """
+        limits = self.classes[route_class]
+
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                if cached is not None and cached():
+                    with limits._cond:
+                        limits.cache_admitted += 1
+                    return fn(*args, **kwargs)
+                if not limits.acquire():
+                    return self._shed(limits)
+
+                started = time.perf_counter()
+                released = threading.Event()
+
+                def release():
+                    if not released.is_set():
+                        released.set()
+                        limits.release((time.perf_counter() - started) * 1000)
+
+                try:
+                    result = fn(*args, **kwargs)
+                except BaseException:
+                    release()
+                    raise
+                response = result[0] if isinstance(result, tuple) else result
+                if isinstance(response, Response) and response.is_streamed:
+                    response.call_on_close(release)
+                else:
+                    release()
+                return result
+            return wrapper
+        return decorator
+
+    def _shed(self, limits):
+        retry_after = limits.retry_after()
+        logger.warning(f"Shedding {limits.name} request: {limits.in_flight} in flight, "
+                       f"{limits.queued} queued (retry after {retry_after}s)")
+        response = jsonify({
+            "status": "error",
+            "message": "Server busy, please retry shortly"
+        })
+        response.status_code = 503
+        response.headers['Retry-After'] = str(retry_after)
+        return response
+
+    def stats(self):
+        return {
+            'enabled': self.enabled,
+            'classes': {name: limits.stats() for name, limits in self.classes.items()},
+        }
@@ -1,6 +1,14 @@
 import os
+import gc
+import json
+import math
+import hashlib
+import itertools
+import threading
+import time
 import requests
-from flask import Flask, render_template, request, jsonify, make_response
+from urllib.parse import parse_qsl
+from flask import Flask, Response, render_template, request, jsonify, make_response, send_file, stream_with_context
 try:
     from flask_limiter import Limiter
     from flask_limiter.util import get_remote_address
@@ -13,10 +21,24 @@ except ModuleNotFoundError:
             def decorator(fn):
                 return fn
             return decorator
+        def exempt(self, fn):
+            return fn
     def get_remote_address():  # type: ignore
         return '127.0.0.1'
 import logging
-from data_cache import get_cache
+from data_cache import LISTINGS_KEY, get_cache
+from search_index import KINDS as SEARCH_KINDS
+from leaderboard import filter_players
+from leaderboard_history import parse_window
+from watchlists import hash_token
+from inventory import enrich_items, filter_items, normalize_inventory_filters, summarize
+from overview import build_overview, find_active, seller_listings
+from profiler import RequestProfiler
+from exports import DATASETS as EXPORT_DATASETS, FORMATS as EXPORT_FORMATS
+from admission import AdmissionController
+from hedging import Hedger
+import timing
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Configure logging
@@ -39,10 +61,88 @@ limiter = Limiter(
     storage_uri="memory://"
 )
 
-# Initialize and start data cache
+# Shared budget of concurrent upstream portal calls per process (batch
+# sub-requests and prefetch fan-out draw from it too)
+UPSTREAM_MAX_CONCURRENCY = int(os.environ.get("UPSTREAM_MAX_CONCURRENCY", 8))
+upstream_budget = threading.BoundedSemaphore(UPSTREAM_MAX_CONCURRENCY)
+
+# Passthrough bodies relayed at once; a relay gives its upstream_budget slot
+# back when the response headers arrive, so slow clients cannot starve it
+RELAY_MAX_CONCURRENCY = int(os.environ.get("RELAY_MAX_CONCURRENCY", 16))
+relay_budget = threading.BoundedSemaphore(RELAY_MAX_CONCURRENCY)
+
+# Opt-in hedging of slow read routes (HEDGE_* env vars); hedges draw from upstream_budget
+hedger = Hedger.from_env(max_workers=UPSTREAM_MAX_CONCURRENCY * 2)
+
+
+def _upstream_send(payload, timeout, **kwargs):
+    """
+    One portal API POST, hedged for read routes (see hedging.py). The caller
+    holds a budget slot and releases it once the response is consumed; a
+    hedged response arrives with its body unread (stream=True).
+    """
+    route = payload.get('route', 'unknown')
+    if not hedger.applies(route):
+        return requests.post(API_URL, json=payload, timeout=timeout, **kwargs)
+    kwargs['stream'] = True
+    return hedger.call(
+        route,
+        lambda: requests.post(API_URL, json=payload, timeout=timeout, **kwargs),
+        upstream_budget
+    )
+
+
+def upstream_post(payload, timeout=15):
+    """POST a payload to the portal API within the shared upstream budget."""
+    with timing.span("queue"):
+        upstream_budget.acquire()
+    try:
+        with timing.span(f"upstream_{payload.get('route', 'unknown')}"):
+            r = _upstream_send(payload, timeout)
+            # Read the body while the slot is held (already read unless hedged)
+            r.content
+            return r
+    finally:
+        upstream_budget.release()
+
+
+# Per-request spans as Server-Timing headers (SERVER_TIMING_LOG=1 also logs them as JSON)
+timing.init_app(app, log_json=os.environ.get("SERVER_TIMING_LOG", "").lower() in ("1", "true", "yes"))
+
+
+# Opt-in request profiling (PROFILING_ENABLED)
+profiler = RequestProfiler.from_env()
+profiler.init_app(app)
+
+# Data cache: importing this module only builds it. create_app() loads the
+# persisted snapshot and the serving process starts the refresh thread
+# (start_background), so a preloading master can fork with no threads running.
 cache = get_cache()
-cache.start()
-logger.info("Data cache initialized and started")
+
+# Load shedding for upstream-bound routes (ADMISSION_* env vars)
+admission = AdmissionController.from_env()
+
+
+def _cached(key):
+    """Admission predicate: the route can answer from this cache key."""
+    return lambda: cache.has(key)
+
+
+def _listings_cached():
+    """Unfiltered page 1 of /api/listings is served from the cache."""
+    args = request.args
+    return (args.get("page", "1") == "1"
+            and args.get("slot", "").strip().lower() in ("", "any")
+            and args.get("class", "").strip().lower() in ("", "any")
+            and cache.has('listings:page1'))
+
+
+def _skills_cached():
+    """Page 1 of /api/skills is served from the cache when present."""
+    req_data = request.get_json(silent=True) or {}
+    page = req_data.get('page', 1)
+    return (page == 1 or not page) and cache.has(f"skills:{req_data.get('class', 'barbarian')}")
+
 
 # Detect environment
 IS_PRODUCTION = os.environ.get('FLASK_ENV') == 'production'
@@ -68,29 +168,6 @@ def set_security_headers(response):
     return response
 
 
-def get_listings(page=1, slot=None, class_=None):
-    if not TOKEN:
-        raise RuntimeError("RPG_TOKEN environment variable not set")
-
-    payload = {
-        "route": "get_listings",
-        "token": TOKEN,
-    }
-
-    if slot:
-        payload["slot"] = slot
-    if class_:
-        payload["class"] = class_
-
-    try:
-        r = requests.post(API_URL, json=payload, timeout=15)
-        r.raise_for_status()
-        return r.json()
-    except requests.RequestException as e:
-        logger.error(f"API request failed: {str(e)}")
-        raise
-
-
 def get_game_items():
     if not TOKEN:
         raise RuntimeError("RPG_TOKEN environment variable not set")
@@ -101,7 +178,7 @@ def get_game_items():
     }
 
     try:
-        r = requests.post(API_URL, json=payload, timeout=15)
+        r = upstream_post(payload)
         r.raise_for_status()
         return r.json()
     except requests.RequestException as e:
@@ -129,7 +206,7 @@ def get_inventory(token, page=1):
     }
 
     try:
-        r = requests.post(API_URL, json=payload, timeout=15)
+        r = upstream_post(payload)
         r.raise_for_status()
         return r.json()
     except requests.RequestException as e:
@@ -137,13 +214,181 @@ def get_inventory(token, page=1):
         raise
 
 
+# Streamed responses are flushed in chunks of roughly this many bytes
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+def _ndjson_response(meta, rows):
+    """
+    Stream a collection as NDJSON: a meta control line, one JSON row per
+    line, then an end (or error) control line. Rows are produced lazily, so
+    server memory stays flat regardless of the collection size.
+    """
+    def generate():
+        yield json.dumps({"_stream": "meta", **meta}) + "\n"
+        buffer, size, count = [], 0, 0
+        try:
+            for row in rows:
+                line = json.dumps(row) + "\n"
+                buffer.append(line)
+                size += len(line)
+                count += 1
+                if size >= STREAM_CHUNK_BYTES:
+                    yield "".join(buffer)
+                    buffer, size = [], 0
+        except Exception as e:
+            logger.error(f"Stream error: {str(e)}")
+            buffer.append(json.dumps({"_stream": "error", "message": "An error occurred"}) + "\n")
+            yield "".join(buffer)
+            return
+        buffer.append(json.dumps({"_stream": "end", "count": count}) + "\n")
+        yield "".join(buffer)
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _wants_stream():
+    return request.args.get("format", "").lower() == "ndjson"
+
+
+# Upstream headers relayed unchanged by upstream_passthrough
+PASSTHROUGH_HEADERS = ("Content-Type", "Content-Encoding", "Content-Length")
+# Set on batch sub-requests, whose bodies /api/batch has to decode
+BATCH_ENVIRON_KEY = "app.batch_sub_request"
+
+
+def upstream_passthrough(payload, timeout=15):
+    """
+    Proxy a portal API call without decoding the body: upstream bytes are
+    streamed to the client as-is, keeping Content-Type and Content-Encoding
+    (the client's Accept-Encoding is forwarded so any encoding is one it
+    understands). The upstream budget slot is held until the response
+    headers arrive; the body is relayed under a relay_budget slot.
+
+    Raises:
+        requests.RequestException: on connection errors or an upstream error status
+    """
+    if request.environ.get(BATCH_ENVIRON_KEY):
+        r = upstream_post(payload, timeout=timeout)
+        r.raise_for_status()
+        return jsonify(r.json())
+    
+    with timing.span("queue"):
+        # Always relay slot first, then budget slot, so waiters cannot deadlock
+        relay_budget.acquire()
+        upstream_budget.acquire()
+    r = None
+    try:
+        # Time to response headers; the body is relayed after the view returns
+        with timing.span(f"upstream_{payload.get('route', 'unknown')}"):
+            r = _upstream_send(
+                payload,
+                timeout,
+                stream=True,
+                headers={"Accept-Encoding": request.headers.get("Accept-Encoding", "identity")}
+            )
+        r.raise_for_status()
+    except Exception:
+        if r is not None:
+            r.close()
+        relay_budget.release()
+        raise
+    finally:
+        upstream_budget.release()
+    
+    released = threading.Event()
+    
+    def release():
+        if not released.is_set():
+            released.set()
+            r.close()
+            relay_budget.release()
+    
+    headers = {name: r.headers[name] for name in PASSTHROUGH_HEADERS if name in r.headers}
+    headers["Vary"] = "Accept-Encoding"
+    response = Response(
+        r.raw.stream(STREAM_CHUNK_BYTES, decode_content=False),
+        status=r.status_code,
+        headers=headers
+    )
+    # Runs once the server is done with the body, even if it was never iterated
+    response.call_on_close(release)
+    return response
+
+
+# Cache keys embedded in the index page so the first paint needs no API calls
+BOOTSTRAP_KEYS = ('items', 'listings:page1', 'shaders', 'backs', 'chests')
+
+# Snapshots the browser persists in IndexedDB (static/js/system/local-cache.js);
+# it reports the ETags it holds in this cookie as key=etag pairs
+CLIENT_CACHE_KEYS = ('items', 'shaders', 'backs', 'chests', LISTINGS_KEY)
+CLIENT_CACHE_COOKIE = 'client_cache'
+
+
+def _snapshot_versions():
+    """ETag of each client-cacheable snapshot, and a generation that changes with any of them."""
+    keys = {key: cache.get_etag(key) for key in CLIENT_CACHE_KEYS}
+    generation = hashlib.sha1(
+        "&".join(f"{key}={etag or ''}" for key, etag in keys.items()).encode("utf-8")
+    ).hexdigest()[:12]
+    return {"generation": generation, "keys": keys}
+
+
+def _client_cache_etags():
+    """ETags of the snapshots the browser says it holds (from CLIENT_CACHE_COOKIE)."""
+    held = parse_qsl(request.cookies.get(CLIENT_CACHE_COOKIE, ""))
+    return {key: etag for key, etag in held if key in CLIENT_CACHE_KEYS}
+
+
+def _build_bootstrap(held=None):
+    """
+    Build the compact bootstrap payload from the current cache snapshot.
+    
+    Args:
+        held: {key: etag} of the browser's persisted copies; keys held at
+            the current ETag are sent as {'etag': ...} without data
+    """
+    held = held or {}
+    try:
+        versions = _snapshot_versions()
+        current = versions["keys"]
+        boot = {"versions": {"data": versions, "etag": versions["generation"]}}
+        keys = []
+        for key in BOOTSTRAP_KEYS:
+            if current.get(key) and held.get(key) == current[key]:
+                boot[key] = {"etag": current[key]}
+            elif key == 'listings:page1' and current[LISTINGS_KEY] and held.get(LISTINGS_KEY) == current[LISTINGS_KEY]:
+                # The persisted full listings make the inline first page redundant
+                continue
+            else:
+                keys.append(key)
+        boot.update(cache.get_snapshot(keys))
+        return boot
+    except Exception as e:
+        logger.error(f"Bootstrap build error: {str(e)}")
+        return {}
+
+
+def _etag_response(data, etag=None):
+    """JSON response tagged with an ETag, answering If-None-Match with 304."""
+    response = jsonify(data)
+    response.set_etag(etag or cache.compute_etag(data))
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+
 @app.route("/")
 def home():
-    return render_template("index.html")
+    return render_template("index.html", bootstrap=_build_bootstrap(_client_cache_etags()))
 
 
 @app.route("/api/listings")
 @limiter.limit("30 per minute")
+@admission.admit("public", cached=_listings_cached)
 def api_listings():
     page = request.args.get("page", "1")
     slot = request.args.get("slot", "").strip().lower()
@@ -155,8 +400,35 @@ def api_listings():
         class_ = None
 
     try:
-        data = get_listings(page=page, slot=slot, class_=class_)
-        return jsonify(data)
+        page = int(page)
+        if page < 1:
+            raise ValueError("Page must be positive")
+    except (ValueError, TypeError):
+        return jsonify({
+            "status": "error",
+            "message": "Invalid page parameter"
+        }), 400
+
+    try:
+        # Unfiltered page 1 comes from the cache with the same ETag as the bootstrap copy
+        if page == 1 and not slot and not class_:
+            data = cache.get('listings:page1')
+            if data:
+                return _etag_response(data, cache.get_etag('listings:page1'))
+        
+        if not TOKEN:
+            raise RuntimeError("RPG_TOKEN environment variable not set")
+        payload = {
+            "route": "get_listings",
+            "token": TOKEN,
+        }
+        if slot:
+            payload["slot"] = slot
+        if class_:
+            payload["class"] = class_
+        if page > 1:
+            payload["page"] = page
+        return upstream_passthrough(payload)
     except requests.HTTPError as e:
         logger.error(f"Upstream API error: {str(e)}")
         return jsonify({
@@ -171,15 +443,183 @@ def api_listings():
         }), 500
 
 
+def _float_arg(name):
+    """Read an optional numeric query parameter (None if missing or invalid)."""
+    value = request.args.get(name, "").strip()
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+@app.route("/api/listings/query")
+@limiter.limit("30 per minute")
+def api_listings_query():
+    """Filter, sort and aggregate the cached listings snapshot server-side"""
+    try:
+        store = cache.get_listing_store()
+        if not len(store):
+            return jsonify({
+                "status": "error",
+                "message": "Listings snapshot not ready"
+            }), 503
+        
+        slot = request.args.get("slot", "").strip().lower()
+        class_ = request.args.get("class", "").strip()
+        
+        selection = store.filter(
+            slot=None if slot in ("", "any") else slot,
+            item_class=None if class_.lower() in ("", "any") else class_,
+            username=request.args.get("username", "").strip() or None,
+            item_name=request.args.get("item_name", "").strip() or None,
+            min_power=_float_arg("min_power"),
+            max_power=_float_arg("max_power"),
+            min_range=_float_arg("min_range"),
+            max_range=_float_arg("max_range"),
+            max_platinum=_float_arg("max_platinum"),
+            max_gold=_float_arg("max_gold"),
+            max_gems=_float_arg("max_gems"),
+            search_index=cache.get_search_index(),
+        )
+        selection = store.sort(selection, request.args.get("sort", "time_newest"))
+        
+        # Streaming mode returns every matching row, materialized one at a time
+        if _wants_stream():
+            return _ndjson_response(
+                {"total_listings": len(selection), "aggregate": store.aggregate(selection)},
+                (store.row(i) for i in selection)
+            )
+        
+        try:
+            page = max(int(request.args.get("page", 1)), 1)
+            per_page = min(max(int(request.args.get("per_page", 100)), 1), 1000)
+        except ValueError:
+            return jsonify({
+                "status": "error",
+                "message": "Invalid request parameters"
+            }), 400
+        
+        start = (page - 1) * per_page
+        return jsonify({
+            "status": "success",
+            "total_listings": len(selection),
+            "total_pages": max((len(selection) + per_page - 1) // per_page, 1),
+            "page": page,
+            "aggregate": store.aggregate(selection),
+            "listings": store.rows(selection[start:start + per_page])
+        })
+    except Exception as e:
+        logger.error(f"Listings query error: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": "An error occurred"
+        }), 500
+
+
+@app.route("/api/deals")
+@limiter.limit("30 per minute")
+def api_deals():
+    """Get listings priced far below their analysis group's baseline"""
+    try:
+        deal_index = cache.get_deal_index()
+        
+        slot = request.args.get("slot", "").strip().lower()
+        class_ = request.args.get("class", "").strip()
+        try:
+            limit = min(max(int(request.args.get("limit", 20)), 1), 200)
+        except ValueError:
+            limit = 20
+        
+        deals = deal_index.top(
+            limit=limit,
+            slot=None if slot in ("", "any") else slot,
+            item_class=None if class_.lower() in ("", "any") else class_,
+            max_ratio=_float_arg("max_ratio"),
+        )
+        return jsonify({
+            "status": "success",
+            "deal_ratio": deal_index.deal_ratio,
+            "index_stats": deal_index.stats(),
+            "deals": deals
+        })
+    except Exception as e:
+        logger.error(f"Deals error: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": "An error occurred"
+        }), 500
+
+
+@app.route("/api/analysis")
+@limiter.limit("30 per minute")
+def api_analysis():
+    """Get per-group price baselines for the analysis tab (JSON or NDJSON stream)"""
+    try:
+        slot = request.args.get("slot", "").strip().lower()
+        class_ = request.args.get("class", "").strip()
+        groups = cache.get_deal_index().groups(
+            slot=None if slot in ("", "any") else slot,
+            item_class=None if class_.lower() in ("", "any") else class_,
+        )
+        
+        if _wants_stream():
+            return _ndjson_response({"total_groups": len(groups)}, iter(groups))
+        
+        return jsonify({
+            "status": "success",
+            "total_groups": len(groups),
+            "groups": groups
+        })
+    except Exception as e:
+        logger.error(f"Analysis error: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": "An error occurred"
+        }), 500
+
+
+@app.route("/api/search/suggest")
+@limiter.limit("120 per minute")
+def api_search_suggest():
+    """Autocomplete seller, item and player names"""
+    try:
+        query = request.args.get("q", "").strip()
+        kind = request.args.get("type", "").strip().lower()
+        kinds = SEARCH_KINDS if kind in ("", "any") else (kind,)
+        if any(k not in SEARCH_KINDS for k in kinds) or len(query) > 100:
+            return jsonify({
+                "status": "error",
+                "message": "Invalid request parameters"
+            }), 400
+        
+        try:
+            limit = min(max(int(request.args.get("limit", 10)), 1), 50)
+        except ValueError:
+            limit = 10
+        
+        return jsonify({
+            "status": "success",
+            "query": query,
+            "suggestions": cache.get_search_index().suggest(query, kinds=kinds, limit=limit)
+        })
+    except Exception as e:
+        logger.error(f"Search suggest error: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": "An error occurred"
+        }), 500
+
+
 @app.route("/api/items")
 @limiter.limit("10 per minute")
+@admission.admit("public", cached=_cached('items'))
 def api_items():
     try:
         # Try to get from cache first
         data = cache.get('items')
         if data:
             logger.debug("Serving items from cache")
-            return jsonify(data)
+            return _etag_response(data, cache.get_etag('items'))
         
         # Fallback to direct API call if cache is empty
         logger.warning("Cache miss for items, fetching from API")
@@ -201,6 +641,7 @@ def api_items():
 
 @app.route("/api/inventory", methods=["POST"])
 @limiter.limit("10 per minute")
+@admission.admit("user")
 def api_inventory():
     try:
         req_data = request.get_json() or {}
@@ -216,13 +657,258 @@ def api_inventory():
                 "message": "Authentication required"
             }), 400
         
-        page = req_data.get('page', 1) if req_data else 1
+        page = req_data.get('page', 1) if req_data else 1
+        
+        data = get_inventory(token, page)
+        logger.info(f"Inventory loaded successfully for IP: {request.remote_addr}")
+        return jsonify(data)
+    except ValueError as e:
+        logger.warning(f"Invalid inventory request: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": "Invalid request parameters"
+        }), 400
+    except requests.HTTPError as e:
+        logger.error(f"Upstream API error: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": "Service temporarily unavailable"
+        }), 502
+    except Exception as e:
+        logger.error(f"Inventory error: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": "An error occurred"
+        }), 500
+
+
+# Inventory pages fetched ahead of the one being streamed
+INVENTORY_STREAM_LOOKAHEAD = 2
+
+
+@app.route("/api/inventory/stream", methods=["POST"])
+@limiter.limit("10 per minute")
+@admission.admit("fanout")
+def api_inventory_stream():
+    """Stream the whole inventory as NDJSON, one upstream page at a time"""
+    try:
+        req_data = request.get_json(silent=True) or {}
+        
+        token = request.cookies.get('rpg_user_token')
+        if not token:
+            token = req_data.get('token')
+        
+        if not token:
+            return jsonify({
+                "status": "error",
+                "message": "Authentication required"
+            }), 400
+        
+        # Page 1 is fetched up front so upstream failures still get a proper status code
+        first = get_inventory(token, 1)
+        total_pages = int(first.get('total_pages') or 1)
+        
+        def rows():
+            yield from first.get('player_items') or []
+            pages = iter(range(2, total_pages + 1))
+            fetch = timing.propagate(get_inventory)
+            # The next pages are fetched while one is streamed; at most
+            # INVENTORY_STREAM_LOOKAHEAD more pages are held in memory
+            executor = ThreadPoolExecutor(max_workers=INVENTORY_STREAM_LOOKAHEAD)
+            try:
+                pending = deque(executor.submit(fetch, token, page)
+                                for page in itertools.islice(pages, INVENTORY_STREAM_LOOKAHEAD))
+                while pending:
+                    page_data = pending.popleft().result()
+                    page = next(pages, None)
+                    if page is not None:
+                        pending.append(executor.submit(fetch, token, page))
+                    yield from page_data.get('player_items') or []
+            finally:
+                # A client that disconnects stops the fetches not yet started
+                executor.shutdown(wait=False, cancel_futures=True)
+        
+        logger.info(f"Inventory stream started for IP: {request.remote_addr}")
+        return _ndjson_response({"total_pages": total_pages, "user": first.get('user')}, rows())
+    except ValueError as e:
+        logger.warning(f"Invalid inventory request: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": "Invalid request parameters"
+        }), 400
+    except requests.HTTPError as e:
+        logger.error(f"Upstream API error: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": "Service temporarily unavailable"
+        }), 502
+    except Exception as e:
+        logger.error(f"Inventory stream error: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": "An error occurred"
+        }), 500
+
+
+# Worker threads used to fetch the sources of the enriched inventory
+ENRICHED_MAX_WORKERS = 6
+
+
+def _fetch_pages(executor, token, route, first, items_key):
+    """All items of a paged user route, remaining pages fetched concurrently."""
+    items = list(first.get(items_key) or [])
+    total_pages = int(first.get('total_pages') or 1)
+    
+    def fetch(page):
+        r = upstream_post({"route": route, "token": token, "page": page})
+        r.raise_for_status()
+        return r.json().get(items_key) or []
+    
+    for page_items in executor.map(timing.propagate(fetch), range(2, total_pages + 1)):
+        items.extend(page_items)
+    return items
+
+
+@app.route("/api/inventory/enriched", methods=["POST"])
+@limiter.limit("10 per minute")
+@admission.admit("fanout")
+def api_inventory_enriched():
+    """
+    Whole inventory joined with equipped characters, listed status and
+    catalog data, filtered and sorted server-side
+    """
+    try:
+        req_data = request.get_json(silent=True) or {}
+        
+        token = request.cookies.get('rpg_user_token')
+        if not token:
+            token = req_data.get('token')
+        
+        if not token:
+            return jsonify({
+                "status": "error",
+                "message": "Authentication required"
+            }), 400
+        
+        filters = normalize_inventory_filters(req_data.get('filters'))
+        sort_by = str(req_data.get('sortBy') or 'time_newest')
+        
+        def fetch(payload):
+            r = upstream_post(payload)
+            r.raise_for_status()
+            return r.json()
+        
+        # Inventory, characters and listings are independent: fetch them concurrently
+        with ThreadPoolExecutor(max_workers=ENRICHED_MAX_WORKERS) as executor:
+            fetch = timing.propagate(fetch)
+            inventory_future = executor.submit(timing.propagate(get_inventory), token, 1)
+            udata_future = executor.submit(fetch, {"route": "get_udata", "token": token, "version": "1.0.0"})
+            listings_future = executor.submit(fetch, {"route": "my_listings", "token": token})
+            
+            first = inventory_future.result()
+            items = _fetch_pages(executor, token, "get_inv", first, "player_items")
+            characters = udata_future.result().get('characters') or []
+            my_listings = _fetch_pages(executor, token, "my_listings", listings_future.result(), "listings")
+        
+        enriched = enrich_items(items, characters, my_listings, cache.get('items'))
+        filtered = filter_items(enriched, filters, sort_by)
+        
+        logger.info(f"Enriched inventory loaded for IP: {request.remote_addr}")
+        return jsonify({
+            "status": "success",
+            "user": first.get('user'),
+            "items": filtered,
+            **summarize(enriched, filtered)
+        })
+    except ValueError as e:
+        logger.warning(f"Invalid enriched inventory request: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": "Invalid request parameters"
+        }), 400
+    except requests.HTTPError as e:
+        logger.error(f"Upstream API error: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": "Service temporarily unavailable"
+        }), 502
+    except Exception as e:
+        logger.error(f"Enriched inventory error: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": "An error occurred"
+        }), 500
+
+
+@app.route("/api/overview", methods=["POST"])
+@limiter.limit("10 per minute")
+@admission.admit("fanout")
+def api_overview():
+    """
+    Overview tab in one response: account summaries assembled from the
+    user's data (fetched concurrently) and market figures precomputed per
+    listings snapshot
+    """
+    try:
+        req_data = request.get_json(silent=True) or {}
+        
+        token = request.cookies.get('rpg_user_token')
+        if not token:
+            token = req_data.get('token')
+        
+        if not token:
+            return jsonify({
+                "status": "error",
+                "message": "Authentication required"
+            }), 400
+        
+        def fetch(payload):
+            r = upstream_post(payload)
+            r.raise_for_status()
+            return r.json()
+        
+        def optional(future, key):
+            # Friends and skills only decorate the overview; it renders without them
+            try:
+                return future.result().get(key) or [] if future else []
+            except Exception as e:
+                logger.warning(f"Overview: {key} unavailable: {str(e)}")
+                return []
+        
+        with ThreadPoolExecutor(max_workers=ENRICHED_MAX_WORKERS) as executor:
+            fetch = timing.propagate(fetch)
+            udata_future = executor.submit(fetch, {"route": "get_udata", "token": token, "version": "1.0.0"})
+            inventory_future = executor.submit(timing.propagate(get_inventory), token, 1)
+            listings_future = executor.submit(fetch, {"route": "my_listings", "token": token})
+            friends_future = executor.submit(fetch, {"route": "get_friend_list", "token": token})
+            
+            udata = udata_future.result()
+            user = udata.get('user') or {}
+            characters = udata.get('characters') or []
+            # Skill names of the active character, fetched while the inventory pages load
+            active = find_active(user, characters)
+            skills_future = executor.submit(
+                fetch, {"route": "get_skills", "token": token, "class": active['class']}
+            ) if active and active.get('class') else None
+            
+            items = _fetch_pages(executor, token, "get_inv", inventory_future.result(), "player_items")
+            my_listings = _fetch_pages(executor, token, "my_listings", listings_future.result(), "listings")
+            friends = optional(friends_future, 'friends')
+            skills = optional(skills_future, 'skills')
+        
+        # Listings not reported yet: recent listings come from the marketplace snapshot
+        seller_rows = None if my_listings else seller_listings(cache.get_listing_store(), user.get('username'))
         
-        data = get_inventory(token, page)
-        logger.info(f"Inventory loaded successfully for IP: {request.remote_addr}")
-        return jsonify(data)
+        logger.info(f"Overview loaded for IP: {request.remote_addr}")
+        return jsonify({
+            "status": "success",
+            "username": user.get('username'),
+            **build_overview(user, characters, items, my_listings, friends, cache.get('items'), skills,
+                             seller_rows=seller_rows),
+            "market": cache.get_market_summary()
+        })
     except ValueError as e:
-        logger.warning(f"Invalid inventory request: {str(e)}")
+        logger.warning(f"Invalid overview request: {str(e)}")
         return jsonify({
             "status": "error",
             "message": "Invalid request parameters"
@@ -234,7 +920,7 @@ def api_inventory():
             "message": "Service temporarily unavailable"
         }), 502
     except Exception as e:
-        logger.error(f"Inventory error: {str(e)}")
+        logger.error(f"Overview error: {str(e)}")
         return jsonify({
             "status": "error",
             "message": "An error occurred"
@@ -330,6 +1016,7 @@ def delete_token():
 
 @app.route("/api/prefetch-user-data", methods=["POST"])
 @limiter.limit("10 per minute")
+@admission.admit("fanout")
 def prefetch_user_data():
     """
     Prefetch all user data for all tabs at once using parallel requests.
@@ -352,7 +1039,7 @@ def prefetch_user_data():
         def fetch_udata():
             try:
                 payload = {"route": "get_udata", "token": token, "version": "1.0.0"}
-                r = requests.post(API_URL, json=payload, timeout=15)
+                r = upstream_post(payload)
                 r.raise_for_status()
                 return ('udata', r.json(), None)
             except Exception as e:
@@ -361,7 +1048,7 @@ def prefetch_user_data():
         def fetch_inventory():
             try:
                 payload = {"route": "get_inv", "token": token, "page": 1}
-                r = requests.post(API_URL, json=payload, timeout=15)
+                r = upstream_post(payload)
                 r.raise_for_status()
                 return ('inventory', r.json(), None)
             except Exception as e:
@@ -370,7 +1057,7 @@ def prefetch_user_data():
         def fetch_my_listings():
             try:
                 payload = {"route": "my_listings", "token": token}
-                r = requests.post(API_URL, json=payload, timeout=15)
+                r = upstream_post(payload)
                 r.raise_for_status()
                 return ('my_listings', r.json(), None)
             except Exception as e:
@@ -379,7 +1066,7 @@ def prefetch_user_data():
         def fetch_friends():
             try:
                 payload = {"route": "get_friend_list", "token": token}
-                r = requests.post(API_URL, json=payload, timeout=15)
+                r = upstream_post(payload)
                 r.raise_for_status()
                 return ('friends', r.json(), None)
             except Exception as e:
@@ -388,7 +1075,7 @@ def prefetch_user_data():
         def fetch_player_chests():
             try:
                 payload = {"route": "get_player_chest", "token": token}
-                r = requests.post(API_URL, json=payload, timeout=15)
+                r = upstream_post(payload)
                 r.raise_for_status()
                 return ('player_chests', r.json(), None)
             except Exception as e:
@@ -402,7 +1089,7 @@ def prefetch_user_data():
         udata_result = None
         try:
             payload = {"route": "get_udata", "token": token, "version": "1.0.0"}
-            r = requests.post(API_URL, json=payload, timeout=15)
+            r = upstream_post(payload)
             r.raise_for_status()
             udata_result = r.json()
             results['udata'] = udata_result
@@ -421,7 +1108,7 @@ def prefetch_user_data():
         def fetch_skills_for_class(class_name):
             try:
                 payload = {"route": "get_skills", "token": token, "class": class_name}
-                r = requests.post(API_URL, json=payload, timeout=15)
+                r = upstream_post(payload)
                 r.raise_for_status()
                 skill_data = r.json()
                 if skill_data.get('skills'):
@@ -433,15 +1120,15 @@ def prefetch_user_data():
         # Now fetch everything else + skills in parallel
         with ThreadPoolExecutor(max_workers=10) as executor:
             futures = [
-                executor.submit(fetch_inventory),
-                executor.submit(fetch_my_listings),
-                executor.submit(fetch_friends),
-                executor.submit(fetch_player_chests)
+                executor.submit(timing.propagate(fetch_inventory)),
+                executor.submit(timing.propagate(fetch_my_listings)),
+                executor.submit(timing.propagate(fetch_friends)),
+                executor.submit(timing.propagate(fetch_player_chests))
             ]
             
             # Add skill fetches for each class
             for class_name in character_classes:
-                futures.append(executor.submit(fetch_skills_for_class, class_name))
+                futures.append(executor.submit(timing.propagate(fetch_skills_for_class), class_name))
             
             all_skills = {}
             for future in as_completed(futures):
@@ -488,6 +1175,7 @@ def prefetch_user_data():
 
 @app.route("/api/udata", methods=["POST"])
 @limiter.limit("10 per minute")
+@admission.admit("user")
 def api_user_data():
     """Get complete user data including all characters"""
     try:
@@ -508,9 +1196,7 @@ def api_user_data():
             "version": "1.0.0"
         }
         
-        r = requests.post(API_URL, json=payload, timeout=15)
-        r.raise_for_status()
-        return jsonify(r.json())
+        return upstream_passthrough(payload)
     except requests.HTTPError as e:
         logger.error(f"Upstream API error: {str(e)}")
         return jsonify({
@@ -527,6 +1213,7 @@ def api_user_data():
 
 @app.route("/api/my-listings", methods=["POST"])
 @limiter.limit("10 per minute")
+@admission.admit("user")
 def api_my_listings():
     """Get user's active marketplace listings"""
     try:
@@ -553,9 +1240,7 @@ def api_my_listings():
         if page and page > 1:
             payload["page"] = page
         
-        r = requests.post(API_URL, json=payload, timeout=15)
-        r.raise_for_status()
-        return jsonify(r.json())
+        return upstream_passthrough(payload)
     except requests.HTTPError as e:
         logger.error(f"Upstream API error: {str(e)}")
         return jsonify({
@@ -572,6 +1257,7 @@ def api_my_listings():
 
 @app.route("/api/top-players")
 @limiter.limit("30 per minute")
+@admission.admit("public", cached=_cached('top_players'))
 def api_top_players():
     """Get leaderboard"""
     if not TOKEN:
@@ -581,14 +1267,20 @@ def api_top_players():
         }), 500
     
     try:
+        # Try to get from cache first
+        data = cache.get('top_players')
+        if data:
+            logger.debug("Serving top players from cache")
+            return _etag_response(data, cache.get_etag('top_players'))
+        
+        # Fallback to direct API call if cache is empty
+        logger.warning("Cache miss for top players, fetching from API")
         payload = {
             "route": "get_top_players",
             "token": TOKEN
         }
         
-        r = requests.post(API_URL, json=payload, timeout=15)
-        r.raise_for_status()
-        return jsonify(r.json())
+        return upstream_passthrough(payload)
     except requests.HTTPError as e:
         logger.error(f"Upstream API error: {str(e)}")
         return jsonify({
@@ -603,8 +1295,255 @@ def api_top_players():
         }), 500
 
 
+@app.route("/api/leaderboard")
+@limiter.limit("30 per minute")
+def api_leaderboard():
+    """Get the cached leaderboard joined with equipment, plus meta-statistics"""
+    try:
+        min_level = _int_arg("min_level")
+        max_level = _int_arg("max_level")
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    
+    try:
+        data = cache.get('leaderboard')
+        if not data:
+            return jsonify({
+                "status": "error",
+                "message": "Leaderboard not ready"
+            }), 503
+        
+        players = filter_players(
+            data['players'],
+            class_=request.args.get("class", "").strip() or None,
+            username=request.args.get("username", "").strip() or None,
+            min_level=min_level,
+            max_level=max_level,
+            sort_by=request.args.get("sort", "rank"),
+        )
+        return _etag_response({
+            "status": "success",
+            "total_players": len(data['players']),
+            "players": players,
+            "meta": data['meta'],
+            "movement": cache.leaderboard_history.movement()
+        })
+    except Exception as e:
+        logger.error(f"Leaderboard error: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": "An error occurred"
+        }), 500
+
+
+def _int_arg(name):
+    """
+    Optional integer query parameter.
+    
+    Raises:
+        ValueError: if the parameter is present but not an integer
+    """
+    if not request.args.get(name):
+        return None
+    try:
+        return int(request.args[name])
+    except ValueError:
+        raise ValueError(f"Invalid {name} parameter")
+
+
+def _timestamp_arg(name):
+    """
+    Optional Unix timestamp query parameter.
+    
+    Raises:
+        ValueError: if the parameter is present but not a finite number
+    """
+    if not request.args.get(name):
+        return None
+    try:
+        value = float(request.args[name])
+    except ValueError:
+        value = None
+    if value is None or not math.isfinite(value):
+        raise ValueError(f"Invalid {name} parameter")
+    return value
+
+
+def _history_args():
+    """
+    (since, until, limit) from the query string: a window shorthand
+    (window=24h, 7d, ...) ending at until (default now), or explicit
+    since/until Unix timestamps.
+    
+    Raises:
+        ValueError: on malformed values
+    """
+    until = _timestamp_arg("until")
+    if request.args.get("window"):
+        since = (until or time.time()) - parse_window(request.args["window"])
+    else:
+        since = _timestamp_arg("since")
+    limit = _int_arg("limit")
+    return since, until, min(max(100 if limit is None else limit, 1), 1000)
+
+
+@app.route("/api/leaderboard/history")
+@limiter.limit("30 per minute")
+def api_leaderboard_history():
+    """Leaderboard snapshots and rank/equipment changes over a time window"""
+    try:
+        since, until, limit = _history_args()
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    
+    try:
+        return jsonify({
+            "status": "success",
+            "since": since,
+            "until": until,
+            **cache.leaderboard_history.window(since, until, limit=limit)
+        })
+    except Exception as e:
+        logger.error(f"Leaderboard history error: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": "An error occurred"
+        }), 500
+
+
+@app.route("/api/leaderboard/history/<username>")
+@limiter.limit("30 per minute")
+def api_player_history(username):
+    """Rank history of one player over a time window"""
+    try:
+        since, until, limit = _history_args()
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    
+    try:
+        history = cache.leaderboard_history.player(username, since, until, limit=limit)
+        if history is None:
+            return jsonify({
+                "status": "error",
+                "message": "Player has no leaderboard history"
+            }), 404
+        return jsonify({"status": "success", "since": since, "until": until, **history})
+    except Exception as e:
+        logger.error(f"Player history error: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": "An error occurred"
+        }), 500
+
+
+def _watchlist_owner(req_data):
+    """Owner key (hashed token) for watchlist routes, or None if unauthenticated."""
+    token = request.cookies.get('rpg_user_token') or req_data.get('token')
+    if not token or not isinstance(token, str) or len(token) > 500:
+        return None
+    return hash_token(token)
+
+
+@app.route("/api/watchlists", methods=["POST"])
+@limiter.limit("30 per minute")
+def api_watchlists():
+    """List the user's saved searches"""
+    owner = _watchlist_owner(request.get_json(silent=True) or {})
+    if not owner:
+        return jsonify({
+            "status": "error",
+            "message": "Authentication required"
+        }), 400
+    
+    return jsonify({
+        "status": "success",
+        "watchlists": cache.watchlists.list(owner)
+    })
+
+
+@app.route("/api/watchlists/create", methods=["POST"])
+@limiter.limit("10 per minute")
+def api_watchlists_create():
+    """Save a marketplace filter query to be matched against new listings"""
+    try:
+        req_data = request.get_json(silent=True) or {}
+        owner = _watchlist_owner(req_data)
+        if not owner:
+            return jsonify({
+                "status": "error",
+                "message": "Authentication required"
+            }), 400
+        
+        record = cache.watchlists.add(owner, req_data.get('name'), req_data.get('filters'))
+        return jsonify({
+            "status": "success",
+            "watchlist": record
+        })
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 400
+    except Exception as e:
+        logger.error(f"Watchlist create error: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": "An error occurred"
+        }), 500
+
+
+@app.route("/api/watchlists/delete", methods=["POST"])
+@limiter.limit("10 per minute")
+def api_watchlists_delete():
+    """Delete one of the user's saved searches"""
+    req_data = request.get_json(silent=True) or {}
+    owner = _watchlist_owner(req_data)
+    if not owner:
+        return jsonify({
+            "status": "error",
+            "message": "Authentication required"
+        }), 400
+    
+    if not cache.watchlists.remove(owner, str(req_data.get('id', ''))):
+        return jsonify({
+            "status": "error",
+            "message": "Watchlist not found"
+        }), 404
+    
+    return jsonify({
+        "status": "success",
+        "message": "Watchlist deleted"
+    })
+
+
+@app.route("/api/watchlists/matches", methods=["POST"])
+@limiter.limit("30 per minute")
+def api_watchlists_matches():
+    """Get listings that matched the user's saved searches since a cursor"""
+    req_data = request.get_json(silent=True) or {}
+    owner = _watchlist_owner(req_data)
+    if not owner:
+        return jsonify({
+            "status": "error",
+            "message": "Authentication required"
+        }), 400
+    
+    try:
+        since = int(req_data.get('since', 0))
+    except (TypeError, ValueError):
+        since = 0
+    
+    matches, cursor = cache.watchlists.matches(owner, since)
+    return jsonify({
+        "status": "success",
+        "matches": matches,
+        "cursor": cursor
+    })
+
+
 @app.route("/api/friends", methods=["POST"])
 @limiter.limit("10 per minute")
+@admission.admit("user")
 def api_friends():
     """Get friends list"""
     try:
@@ -631,9 +1570,7 @@ def api_friends():
         if page and page > 1:
             payload["page"] = page
         
-        r = requests.post(API_URL, json=payload, timeout=15)
-        r.raise_for_status()
-        return jsonify(r.json())
+        return upstream_passthrough(payload)
     except requests.HTTPError as e:
         logger.error(f"Upstream API error: {str(e)}")
         return jsonify({
@@ -650,6 +1587,7 @@ def api_friends():
 
 @app.route("/api/shaders")
 @limiter.limit("30 per minute")
+@admission.admit("public", cached=_cached('shaders'))
 def api_shaders():
     """Get available shaders"""
     if not TOKEN:
@@ -663,7 +1601,7 @@ def api_shaders():
         data = cache.get('shaders')
         if data:
             logger.debug("Serving shaders from cache")
-            return jsonify(data)
+            return _etag_response(data, cache.get_etag('shaders'))
         
         # Fallback to direct API call if cache is empty
         logger.warning("Cache miss for shaders, fetching from API")
@@ -672,9 +1610,7 @@ def api_shaders():
             "token": TOKEN  # Use admin token, not user token
         }
         
-        r = requests.post(API_URL, json=payload, timeout=15)
-        r.raise_for_status()
-        return jsonify(r.json())
+        return upstream_passthrough(payload)
     except requests.HTTPError as e:
         logger.error(f"Upstream API error: {str(e)}")
         return jsonify({
@@ -691,6 +1627,7 @@ def api_shaders():
 
 @app.route("/api/backs")
 @limiter.limit("30 per minute")
+@admission.admit("public", cached=_cached('backs'))
 def api_backs():
     """Get available back items"""
     if not TOKEN:
@@ -704,7 +1641,7 @@ def api_backs():
         data = cache.get('backs')
         if data:
             logger.debug("Serving backs from cache")
-            return jsonify(data)
+            return _etag_response(data, cache.get_etag('backs'))
         
         # Fallback to direct API call if cache is empty
         logger.warning("Cache miss for backs, fetching from API")
@@ -713,9 +1650,7 @@ def api_backs():
             "token": TOKEN  # Use admin token, not user token
         }
         
-        r = requests.post(API_URL, json=payload, timeout=15)
-        r.raise_for_status()
-        return jsonify(r.json())
+        return upstream_passthrough(payload)
     except requests.HTTPError as e:
         logger.error(f"Upstream API error: {str(e)}")
         return jsonify({
@@ -732,6 +1667,7 @@ def api_backs():
 
 @app.route("/api/chests")
 @limiter.limit("30 per minute")
+@admission.admit("public", cached=_cached('chests'))
 def api_chests():
     """Get available chests"""
     if not TOKEN:
@@ -745,7 +1681,7 @@ def api_chests():
         data = cache.get('chests')
         if data:
             logger.debug("Serving chests from cache")
-            return jsonify(data)
+            return _etag_response(data, cache.get_etag('chests'))
         
         # Fallback to direct API call if cache is empty
         logger.warning("Cache miss for chests, fetching from API")
@@ -754,9 +1690,7 @@ def api_chests():
             "token": TOKEN  # Use admin token, not user token
         }
         
-        r = requests.post(API_URL, json=payload, timeout=15)
-        r.raise_for_status()
-        return jsonify(r.json())
+        return upstream_passthrough(payload)
     except requests.HTTPError as e:
         logger.error(f"Upstream API error: {str(e)}")
         return jsonify({
@@ -773,6 +1707,7 @@ def api_chests():
 
 @app.route("/api/player-chests", methods=["POST"])
 @limiter.limit("10 per minute")
+@admission.admit("user")
 def api_player_chests():
     """Get player's owned chests"""
     try:
@@ -799,9 +1734,7 @@ def api_player_chests():
         if page and page > 1:
             payload["page"] = page
         
-        r = requests.post(API_URL, json=payload, timeout=15)
-        r.raise_for_status()
-        return jsonify(r.json())
+        return upstream_passthrough(payload)
     except requests.HTTPError as e:
         logger.error(f"Upstream API error: {str(e)}")
         return jsonify({
@@ -818,6 +1751,7 @@ def api_player_chests():
 
 @app.route("/api/skills", methods=["POST"])
 @limiter.limit("30 per minute")
+@admission.admit("user", cached=_skills_cached)
 def api_skills():
     """Get skills for a class"""
     try:
@@ -858,9 +1792,7 @@ def api_skills():
         if page and page > 1:
             payload["page"] = page
         
-        r = requests.post(API_URL, json=payload, timeout=15)
-        r.raise_for_status()
-        return jsonify(r.json())
+        return upstream_passthrough(payload)
     except requests.HTTPError as e:
         logger.error(f"Upstream API error: {str(e)}")
         return jsonify({
@@ -875,6 +1807,243 @@ def api_skills():
         }), 500
 
 
+# Batch endpoint limits
+BATCH_MAX_REQUESTS = 20
+BATCH_MAX_WORKERS = 8
+
+
+def _run_sub_request(sub, cookie_header, remote_addr):
+    """Dispatch one batch sub-request through the normal route stack (incl. rate limits)."""
+    headers = {"Cookie": cookie_header} if cookie_header else {}
+    kwargs = {"json": sub.get("body") or {}} if sub["method"] == "POST" else {}
+    with app.test_request_context(
+        sub["path"],
+        method=sub["method"],
+        headers=headers,
+        environ_base={"REMOTE_ADDR": remote_addr, BATCH_ENVIRON_KEY: True},
+        **kwargs
+    ):
+        try:
+            response = app.full_dispatch_request()
+            body = response.get_json(silent=True)
+            result = {"status": response.status_code, "body": body}
+            etag = response.get_etag()[0]
+            if etag:
+                # Lets the client persist the body for later conditional requests
+                result["etag"] = etag
+            return result
+        except Exception as e:
+            logger.error(f"Batch sub-request {sub['path']} error: {str(e)}")
+            return {"status": 500, "body": {"status": "error", "message": "An error occurred"}}
+
+
+@app.route("/api/batch", methods=["POST"])
+@limiter.limit("20 per minute")
+def api_batch():
+    """Run several API sub-requests concurrently and return all results at once"""
+    req_data = request.get_json(silent=True) or {}
+    subs = req_data.get("requests")
+    
+    if not isinstance(subs, list) or not subs or len(subs) > BATCH_MAX_REQUESTS:
+        return jsonify({
+            "status": "error",
+            "message": f"Expected 1-{BATCH_MAX_REQUESTS} sub-requests"
+        }), 400
+    
+    normalized = []
+    for sub in subs:
+        if not isinstance(sub, dict):
+            return jsonify({"status": "error", "message": "Invalid sub-request"}), 400
+        path = str(sub.get("path", ""))
+        method = str(sub.get("method", "GET")).upper()
+        if (not path.startswith("/api/") or path.startswith("/api/batch")
+                or path.startswith("/api/token/") or method not in ("GET", "POST")):
+            return jsonify({"status": "error", "message": f"Sub-request not allowed: {path}"}), 400
+        normalized.append({"id": sub.get("id"), "path": path, "method": method, "body": sub.get("body")})
+    
+    cookie_header = request.headers.get("Cookie", "")
+    remote_addr = request.remote_addr
+    
+    # Each sub-request's upstream call still draws from upstream_budget
+    with ThreadPoolExecutor(max_workers=min(BATCH_MAX_WORKERS, len(normalized))) as executor:
+        results = list(executor.map(
+            lambda sub: _run_sub_request(sub, cookie_header, remote_addr), normalized
+        ))
+    
+    return jsonify({
+        "status": "success",
+        "responses": [
+            {"id": sub["id"], "path": sub["path"], **result}
+            for sub, result in zip(normalized, results)
+        ]
+    })
+
+
+@app.route("/api/replication/manifest")
+@limiter.exempt
+def api_replication_manifest():
+    """Newest published snapshot generation (leader host only; ETag "gen-<n>")"""
+    replication = cache.replication
+    if not (replication.publishes_locally and replication.authorized(request)):
+        return jsonify({
+            "status": "error",
+            "message": "Not found"
+        }), 404
+    manifest = replication.load_manifest()
+    if not manifest:
+        return jsonify({
+            "status": "error",
+            "message": "Nothing published yet"
+        }), 503
+    response = jsonify(manifest)
+    response.set_etag(f"gen-{manifest['generation']}")
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
+
+
+@app.route("/api/replication/objects/<name>")
+@limiter.exempt
+def api_replication_object(name):
+    """One published snapshot object (immutable: its name carries its ETag)"""
+    replication = cache.replication
+    if not (replication.publishes_locally and replication.authorized(request)):
+        return jsonify({
+            "status": "error",
+            "message": "Not found"
+        }), 404
+    try:
+        return send_file(replication.object_path(name), mimetype="application/json",
+                         conditional=True, etag=name.rsplit(".", 2)[1], max_age=31536000)
+    except ValueError:
+        return jsonify({
+            "status": "error",
+            "message": "Invalid object name"
+        }), 400
+    except FileNotFoundError:
+        return jsonify({
+            "status": "error",
+            "message": "Object not found"
+        }), 404
+
+
+@app.route("/api/export")
+@limiter.limit("30 per minute")
+def api_export_manifest():
+    """List the current export files (rows, size and ETag per dataset and format)"""
+    files = {}
+    for dataset in EXPORT_DATASETS:
+        for fmt in EXPORT_FORMATS:
+            export = cache.get_export(dataset, fmt)
+            if export:
+                path, entry, generated_at = export
+                files[f"{dataset}.{fmt}"] = {
+                    "url": f"/api/export/{dataset}?format={fmt}",
+                    "rows": entry["rows"],
+                    "size_bytes": entry["size_bytes"],
+                    "etag": entry["etag"],
+                    "generated_at": generated_at
+                }
+    return jsonify({
+        "status": "success",
+        "files": files
+    })
+
+
+@app.route("/api/export/<dataset>")
+@limiter.limit("30 per minute")
+def api_export(dataset):
+    """
+    Download the listings snapshot or item catalog as gzip-compressed CSV or
+    JSONL (?format=csv|jsonl). Files are written once per refresh and sent
+    from disk; Range, If-Range, If-None-Match and If-Modified-Since apply.
+    """
+    fmt = request.args.get("format", "csv").strip().lower()
+    if dataset not in EXPORT_DATASETS or fmt not in EXPORT_FORMATS:
+        return jsonify({
+            "status": "error",
+            "message": f"Unknown export: {dataset} ({fmt})"
+        }), 404
+    
+    export = cache.get_export(dataset, fmt)
+    if not export:
+        return jsonify({
+            "status": "error",
+            "message": "Export not ready"
+        }), 503
+    
+    path, entry, generated_at = export
+    # send_file hands the open file to the server's wsgi.file_wrapper (sendfile
+    # under gunicorn), or to the front proxy when USE_X_SENDFILE is set
+    return send_file(path, mimetype="application/gzip", as_attachment=True,
+                     download_name=f"{dataset}.{fmt}.gz", conditional=True,
+                     etag=entry["etag"], last_modified=generated_at, max_age=60)
+
+
+def _profiles_allowed():
+    return profiler.enabled and profiler.is_admin(request)
+
+
+@app.route("/api/admin/profiles")
+@limiter.limit("30 per minute")
+def api_admin_profiles():
+    """List kept request profiles (admin key in X-Profile required)"""
+    if not _profiles_allowed():
+        return jsonify({
+            "status": "error",
+            "message": "Not found"
+        }), 404
+    return jsonify({
+        "status": "success",
+        "profiler": profiler.stats(),
+        "profiles": profiler.list_profiles()
+    })
+
+
+@app.route("/api/admin/profiles/<name>")
+@limiter.limit("30 per minute")
+def api_admin_profile(name):
+    """Download a kept profile as a pstats file, or as a text report with ?format=text"""
+    if not _profiles_allowed():
+        return jsonify({
+            "status": "error",
+            "message": "Not found"
+        }), 404
+    try:
+        if request.args.get("format") == "text":
+            return Response(profiler.summary(name), mimetype="text/plain")
+        return send_file(profiler.profile_path(name), mimetype="application/octet-stream",
+                         as_attachment=True, download_name=name)
+    except ValueError:
+        return jsonify({
+            "status": "error",
+            "message": "Invalid profile name"
+        }), 400
+    except FileNotFoundError:
+        return jsonify({
+            "status": "error",
+            "message": "Profile not found"
+        }), 404
+
+
+@app.route("/readyz")
+@limiter.exempt
+def readyz():
+    """Readiness probe: 200 once cached data can be served, 503 while cold"""
+    readiness = cache.get_readiness()
+    return jsonify({
+        "status": "ready" if readiness["ready"] else "starting",
+        **readiness
+    }), 200 if readiness["ready"] else 503
+
+
+@app.route("/api/cache/versions")
+@limiter.limit("60 per minute")
+def api_cache_versions():
+    """Current ETag per client-cacheable snapshot (ETag: the generation)"""
+    versions = _snapshot_versions()
+    return _etag_response(versions, versions["generation"])
+
+
 @app.route("/api/cache/status")
 @limiter.limit("10 per minute")
 def api_cache_status():
@@ -884,7 +2053,12 @@ def api_cache_status():
         return jsonify({
             "status": "ok",
             "cache_stats": stats,
-            "refresh_interval_seconds": cache.refresh_interval
+            "refresh_interval_seconds": cache.refresh_interval,
+            "refresh_schedule": cache.get_refresh_schedule(),
+            "memory": cache.get_memory_stats(),
+            "replication": cache.replication.stats(),
+            "snapshot_worker": cache.deriver.stats(),
+            "leaderboard_history": cache.leaderboard_history.stats()
         })
     except Exception as e:
         logger.error(f"Cache status error: {str(e)}")
@@ -894,7 +2068,86 @@ def api_cache_status():
         }), 500
 
 
+@app.route("/api/metrics")
+@limiter.limit("30 per minute")
+def api_metrics():
+    """Admission control, upstream budget and hedging counters for monitoring"""
+    return jsonify({
+        "status": "ok",
+        "admission": admission.stats(),
+        "upstream": {
+            "max_concurrency": UPSTREAM_MAX_CONCURRENCY,
+            "max_relays": RELAY_MAX_CONCURRENCY,
+            "hedging": hedger.stats()
+        }
+    })
+
+
+# Process lifecycle. Under gunicorn (gunicorn.conf.py) the master imports
+# the module and calls create_app(start=False), loading the snapshot once;
+# forked workers share those pages copy-on-write and each starts its own
+# background threads in post_worker_init. Background threads must never run
+# in a process that is about to fork.
+_background_pid = None
+
+
+def load_snapshot():
+    """Load the persisted cache snapshot into memory, if not done yet."""
+    if not cache.warm_started:
+        cache.warm_start()
+
+
+def start_background():
+    """Start this process's background threads (the cache refresh loop); idempotent per process."""
+    global _background_pid
+    if _background_pid == os.getpid():
+        return
+    _background_pid = os.getpid()
+    cache.start()
+    logger.info(f"Background threads started in process {_background_pid} "
+                f"(replication role {cache.replication.role}, node {cache.replication.node_id})")
+
+
+def stop_background():
+    """Stop this process's background threads and snapshot worker processes."""
+    global _background_pid
+    if _background_pid != os.getpid():
+        return
+    cache.stop()
+    cache.deriver.shutdown()
+    _background_pid = None
+
+
+def create_app(start=True):
+    """
+    App factory with explicit lifecycle.
+    
+    Args:
+        start: Start background threads right away. A preloading master
+            passes False and each worker calls start_background() after fork.
+    
+    Returns:
+        The Flask app
+    """
+    load_snapshot()
+    if start:
+        start_background()
+    else:
+        # Everything loaded so far is shared with the forked workers; keep the
+        # collector from writing to those pages when it scans old objects
+        gc.freeze()
+    return app
+
+
+@app.before_request
+def _ensure_background():
+    # Servers that import app:app directly never run the lifecycle hooks
+    if _background_pid != os.getpid():
+        start_background()
+
+
 if __name__ == "__main__":
+    create_app()
     port = int(os.environ.get("PORT", 5000))
     # Only use debug mode in development
     debug_mode = not IS_PRODUCTION
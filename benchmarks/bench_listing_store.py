@@ -0,0 +1,129 @@
+"""
+Benchmark: columnar ListingStore vs. list-of-dicts listings.
+
+Reports memory per 100k listings and the time of a typical marketplace
+filter + aggregate scan for both representations.
+
+Usage:
+    python benchmarks/bench_listing_store.py [--rows 100000]
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from listing_store import ListingStore, PLATINUM_TO_GOLD  # noqa: E402
+
+SLOTS = ['weapon', 'head', 'body', 'hands', 'feet', 'neck', 'ring', 'off_hand']
+CLASSES = ['barbarian', 'mage', 'ranger', 'rogue', 'cleric']
+
+
+def make_catalog(n_items=400):
+    rng = random.Random(1)
+    return {'items': [
+        {
+            'id': i,
+            'slot': SLOTS[i % len(SLOTS)],
+            'item_name': f'Item {i}',
+            'class': json.dumps(rng.sample(CLASSES, rng.randint(1, 3))),
+        }
+        for i in range(n_items)
+    ]}
+
+
+def make_listings(rows, n_items=400, n_sellers=5000):
+    rng = random.Random(2)
+    listings = []
+    for i in range(rows):
+        item_id = rng.randrange(n_items)
+        extra = {'extra': rng.choice(['', 'Crit', 'Lifesteal'])}
+        if SLOTS[item_id % len(SLOTS)] == 'weapon':
+            extra['range'] = rng.randint(1, 12)
+        listings.append({
+            'id': str(i + 1),
+            'base_item_id': str(item_id),
+            'slot': SLOTS[item_id % len(SLOTS)],
+            'username': f'seller{rng.randrange(n_sellers)}',
+            'power': f'{rng.random():.4f}',
+            'platinum_cost': str(rng.randint(0, 50)),
+            'gold_cost': str(rng.randint(0, 999999)),
+            'gem_cost': str(rng.choice([0, 0, 0, rng.randint(1, 500)])),
+            'extra': json.dumps(extra),
+            'time_created': f'2026-10-{rng.randint(1, 28):02d} 12:00:00',
+            'time_expires': f'2026-11-{rng.randint(1, 28):02d} 12:00:00',
+        })
+    # Round-trip through JSON so strings are not shared with the generator
+    return json.loads(json.dumps(listings))
+
+
+def measure(builder):
+    gc.collect()
+    tracemalloc.start()
+    obj = builder()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, current
+
+
+def dict_scan(listings, catalog, slot, item_class, max_power, max_gold):
+    """Equivalent of FilterEngine.applyItemFilters + an aggregate, on dicts."""
+    index = {(str(item['id']), item['slot']): item for item in catalog['items']}
+    matched = []
+    for listing in listings:
+        if listing['slot'] != slot:
+            continue
+        item = index.get((listing['base_item_id'], listing['slot'])) or {}
+        if item_class not in json.loads(item.get('class') or '[]'):
+            continue
+        if float(listing['power']) * 100 > max_power:
+            continue
+        total = int(listing['platinum_cost']) * PLATINUM_TO_GOLD + int(listing['gold_cost'])
+        if total > max_gold:
+            continue
+        matched.append((float(listing['power']), total))
+    if not matched:
+        return 0
+    return len(matched), min(p for p, _ in matched), sum(g for _, g in matched) / len(matched)
+
+
+def timeit(fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000)
+    args = parser.parse_args()
+
+    catalog = make_catalog()
+    raw = json.dumps(make_listings(args.rows))
+
+    listings, dict_bytes = measure(lambda: json.loads(raw))
+    store, store_bytes = measure(lambda: ListingStore.from_listings(json.loads(raw), catalog))
+
+    query = dict(slot='weapon', item_class='mage', max_power=80, max_gold=20 * PLATINUM_TO_GOLD)
+    dict_time = timeit(lambda: dict_scan(listings, catalog, **query))
+    store_time = timeit(lambda: store.aggregate(store.filter(**query)))
+
+    scale = 100000 / args.rows
+    print(f'rows: {args.rows}')
+    print(f'memory per 100k  dicts: {dict_bytes * scale / 1e6:8.1f} MB   '
+          f'columnar: {store_bytes * scale / 1e6:8.1f} MB   ({dict_bytes / store_bytes:.1f}x smaller)')
+    print(f'filter+aggregate dicts: {dict_time * 1000:8.1f} ms   '
+          f'columnar: {store_time * 1000:8.1f} ms   ({dict_time / store_time:.1f}x faster)')
+
+
+if __name__ == '__main__':
+    main()
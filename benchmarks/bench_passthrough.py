@@ -0,0 +1,127 @@
+"""
+Benchmark: raw-bytes passthrough proxying vs. decode + jsonify.
+
+Serves a large gzip-compressed inventory from a local HTTP server standing
+in for the portal API and proxies it both ways, reporting CPU time per
+request and peak Python memory (tracemalloc) for each path.
+
+Usage:
+    python benchmarks/bench_passthrough.py [--items 50000] [--requests 20]
+"""
+
+import argparse
+import gzip
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+logging.disable(logging.CRITICAL)
+
+import app as server  # noqa: E402
+
+
+def make_inventory(n_items):
+    rng = random.Random(3)
+    return {
+        'status': 'success',
+        'total_pages': 1,
+        'player_items': [
+            {
+                'id': str(i + 1),
+                'base_item_id': str(rng.randrange(400)),
+                'slot': rng.choice(['weapon', 'head', 'body', 'hands', 'feet']),
+                'power': f'{rng.random():.4f}',
+                'extra': json.dumps({'extra': rng.choice(['', 'Crit', 'Lifesteal'])}),
+                'time_created': '2026-10-01 12:00:00',
+            }
+            for i in range(n_items)
+        ],
+    }
+
+
+def start_upstream(body):
+    compressed = gzip.compress(body, compresslevel=6)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length') or 0))
+            gzipped = 'gzip' in (self.headers.get('Accept-Encoding') or '')
+            payload = compressed if gzipped else body
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            if gzipped:
+                self.send_header('Content-Encoding', 'gzip')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+
+def decoded(payload):
+    with server.app.test_request_context(headers={'Accept-Encoding': 'gzip'}):
+        r = server.upstream_post(payload)
+        r.raise_for_status()
+        response = server.jsonify(r.json())
+        return sum(len(chunk) for chunk in response.response)
+
+
+def passthrough(payload):
+    with server.app.test_request_context(headers={'Accept-Encoding': 'gzip'}):
+        response = server.upstream_passthrough(payload)
+        try:
+            return sum(len(chunk) for chunk in response.response)
+        finally:
+            response.close()
+
+
+def measure(fn, payload, requests_count):
+    fn(payload)  # warm up connections and imports
+    cpu = time.process_time()
+    wall = time.perf_counter()
+    for _ in range(requests_count):
+        sent = fn(payload)
+    cpu = (time.process_time() - cpu) / requests_count
+    wall = (time.perf_counter() - wall) / requests_count
+
+    tracemalloc.start()
+    fn(payload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cpu, wall, peak, sent
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--items', type=int, default=50000)
+    parser.add_argument('--requests', type=int, default=20)
+    args = parser.parse_args()
+
+    body = json.dumps(make_inventory(args.items)).encode('utf-8')
+    httpd = start_upstream(body)
+    server.API_URL = f'http://127.0.0.1:{httpd.server_address[1]}/'
+    payload = {'route': 'get_inv', 'token': 'bench', 'page': 1}
+
+    print(f'{args.items} inventory items, {len(body) / 1e6:.1f} MB JSON')
+    for name, fn in (('decode + jsonify', decoded), ('passthrough', passthrough)):
+        cpu, wall, peak, sent = measure(fn, payload, args.requests)
+        print(f'{name:18s} cpu {cpu * 1000:7.1f} ms/req  wall {wall * 1000:7.1f} ms/req  '
+              f'peak {peak / 1e6:7.1f} MB  sent {sent / 1e6:.1f} MB')
+    httpd.shutdown()
+
+
+if __name__ == '__main__':
+    main()
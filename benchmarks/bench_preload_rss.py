@@ -0,0 +1,140 @@
+"""
+Benchmark: per-worker memory with and without gunicorn --preload.
+
+Writes a persisted cache snapshot (catalog and listings), then starts
+gunicorn with gunicorn.conf.py and N workers twice: each worker loading
+the snapshot itself (GUNICORN_PRELOAD=0, before) and the master loading it
+once before forking (GUNICORN_PRELOAD=1). After a few requests per worker,
+reports per-worker RSS, PSS (RSS with shared pages split between the
+processes sharing them) and USS (pages private to the worker) from
+/proc/<pid>/smaps_rollup. Workers run as replication followers of an empty
+directory, so nothing calls the portal API. Linux only.
+
+Usage:
+    python benchmarks/bench_preload_rss.py [--workers 8] [--rows 100000]
+"""
+
+import argparse
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bench_listing_store import make_catalog, make_listings  # noqa: E402
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+PATHS = ('/api/items', '/api/listings?page=1', '/api/search/suggest?q=ite',
+         '/api/listings/query?slot=head&sort=price_asc')
+
+
+def write_snapshot(cache_dir, rows):
+    logging.disable(logging.CRITICAL)
+    import data_cache
+    from snapshot_worker import SnapshotDeriver
+
+    catalog = make_catalog()
+    listings = make_listings(rows)
+    cache = data_cache.DataCache(cache_dir=cache_dir, deriver=SnapshotDeriver(workers=0))
+    cache._set_cache('items', catalog)
+    cache._set_cache('listings:page1', {'status': 'success', 'total_pages': -(-rows // 100),
+                                        'listings': listings[:100]})
+    cache._set_listings(listings, catalog)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def children(pid):
+    with open(f'/proc/{pid}/task/{pid}/children') as f:
+        return [int(child) for child in f.read().split()]
+
+
+def memory(pid):
+    """RSS, PSS and USS of a process in MiB."""
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                fields[parts[0][:-1]] = int(parts[1])
+    uss = fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+    return fields['Rss'] / 1024, fields['Pss'] / 1024, uss / 1024
+
+
+def get(url):
+    try:
+        with urllib.request.urlopen(url, timeout=30) as r:
+            return r.status
+    except Exception:
+        return None
+
+
+def run(workdir, workers, preload):
+    port = free_port()
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), GUNICORN_THREADS='2',
+               GUNICORN_PRELOAD='1' if preload else '0', PORT=str(port), RPG_TOKEN='bench',
+               REPLICATION_ROLE='follower', REPLICATION_DIR=os.path.join(workdir, 'replication'),
+               REPLICATION_POLL_SECONDS='3600', SNAPSHOT_WORKERS='0', PYTHONPATH=ROOT)
+    started = time.time()
+    proc = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', os.path.join(ROOT, 'gunicorn.conf.py'),
+                             '--log-level', 'warning', '--timeout', '600'],
+                            cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        base = f'http://127.0.0.1:{port}'
+        while get(f'{base}/readyz') != 200:
+            if proc.poll() is not None:
+                raise RuntimeError('gunicorn exited')
+            time.sleep(0.2)
+        while len(children(proc.pid)) < workers:
+            time.sleep(0.2)
+        boot_seconds = time.time() - started
+        # Spread requests over the workers so each touches the snapshot
+        for _ in range(workers * 4):
+            for path in PATHS:
+                get(base + path)
+        time.sleep(1)
+        master = memory(proc.pid)
+        per_worker = [memory(pid) for pid in children(proc.pid)]
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+    return boot_seconds, master, per_worker
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--rows', type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        write_snapshot(os.path.join(workdir, 'cache_data'), args.rows)
+        print(f'{args.rows} listings, {args.workers} workers')
+        results = {}
+        for name, preload in (('no preload (before)', False), ('preload', True)):
+            boot_seconds, master, per_worker = run(workdir, args.workers, preload)
+            n = len(per_worker)
+            avg = [sum(m[i] for m in per_worker) / n for i in range(3)]
+            results[name] = avg
+            print(f'{name}: ready in {boot_seconds:.1f}s, master RSS {master[0]:.0f} MiB')
+            print(f'  per worker  RSS {avg[0]:6.1f}  PSS {avg[1]:6.1f}  USS {avg[2]:6.1f} MiB   '
+                  f'total PSS (incl. master) {sum(m[1] for m in per_worker) + master[1]:7.1f} MiB')
+        before, after = results.values()
+        print(json.dumps({'uss_saved_per_worker_mib': round(before[2] - after[2], 1),
+                          'pss_saved_per_worker_mib': round(before[1] - after[1], 1)}))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""
+Benchmark: request latency while a listings snapshot is rebuilt.
+
+Client threads call cheap cached routes (/api/search/suggest and
+/api/items) in a loop while the refresh thread rebuilds the listings
+snapshot (store, search index, exports, deal index, watchlists) a few
+times. Reports p50/p99/max latency while idle and while refreshing, with
+the derivations run in the refresh thread (SNAPSHOT_WORKERS=0, the
+default) and in a worker process (SNAPSHOT_WORKERS=1). The worker needs a
+spare core to help: on a single CPU it competes with the request threads,
+so run it on a multi-core host before enabling the pool.
+
+Usage:
+    python benchmarks/bench_refresh_latency.py [--rows 100000] [--clients 2] [--refreshes 3]
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bench_listing_store import make_catalog, make_listings  # noqa: E402
+
+logging.disable(logging.CRITICAL)
+
+import data_cache  # noqa: E402
+
+data_cache.DataCache._background_refresh_loop = lambda self: None
+
+import app as server  # noqa: E402
+from snapshot_worker import SnapshotDeriver  # noqa: E402
+
+PATHS = ('/api/search/suggest?q=sel', '/api/items')
+
+# Pause between a client's requests, so clients don't saturate the GIL themselves
+THINK_SECONDS = 0.002
+
+
+def repriced(listings, seed):
+    """A new snapshot: same listings, a few percent repriced."""
+    rng = random.Random(seed)
+    result = []
+    for listing in listings:
+        if rng.random() < 0.05:
+            listing = dict(listing, gold_cost=str(rng.randint(0, 999999)))
+        result.append(listing)
+    return result
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else float('nan')
+
+
+def run_clients(clients, stop):
+    samples = []
+    lock = threading.Lock()
+
+    def client():
+        http = server.app.test_client()
+        local = []
+        i = 0
+        while not stop.is_set():
+            started = time.perf_counter()
+            http.get(PATHS[i % len(PATHS)])
+            local.append((time.perf_counter() - started) * 1000)
+            i += 1
+            time.sleep(THINK_SECONDS)
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    return threads, samples
+
+
+def measure(cache, listings, catalog, clients, refreshes, idle_seconds):
+    results = {}
+
+    # Idle baseline
+    stop = threading.Event()
+    threads, samples = run_clients(clients, stop)
+    time.sleep(idle_seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    results['idle'] = samples
+
+    # During refreshes
+    stop = threading.Event()
+    threads, samples = run_clients(clients, stop)
+    refresh_times = []
+    for n in range(refreshes):
+        snapshot = repriced(listings, n)
+        started = time.perf_counter()
+        cache._set_listings(snapshot, catalog)
+        refresh_times.append(time.perf_counter() - started)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    results['refresh'] = samples
+    return results, refresh_times
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--clients', type=int, default=2)
+    parser.add_argument('--refreshes', type=int, default=3)
+    parser.add_argument('--idle-seconds', type=float, default=2)
+    args = parser.parse_args()
+
+    server.limiter.enabled = False
+    catalog = make_catalog()
+    listings = make_listings(args.rows)
+    print(f'{args.rows} listings, {args.clients} client threads, {args.refreshes} refreshes, '
+          f'{os.cpu_count()} CPUs')
+
+    for name, workers in (('in refresh thread (default)', 0), ('worker process', 1)):
+        with tempfile.TemporaryDirectory() as workdir:
+            deriver = SnapshotDeriver(workers=workers)
+            cache = data_cache.DataCache(cache_dir=os.path.join(workdir, 'cache_data'), deriver=deriver)
+            cache._set_cache('items', catalog)
+            # First build also starts the worker process
+            cache._set_listings(listings, catalog)
+            server.cache = cache
+            results, refresh_times = measure(cache, listings, catalog, args.clients,
+                                             args.refreshes, args.idle_seconds)
+            deriver.shutdown()
+        print(f'{name}: refresh {sum(refresh_times) / len(refresh_times):.2f} s avg')
+        for phase, samples in results.items():
+            print(f'  {phase:8s} {len(samples):6d} requests  p50 {percentile(samples, 0.5):7.2f} ms  '
+                  f'p99 {percentile(samples, 0.99):7.2f} ms  max {max(samples):8.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+Benchmark: snapshot replication across app processes.
+
+Starts a local HTTP server standing in for the portal API, then several
+node processes sharing one replication directory with REPLICATION_ROLE=auto.
+Each node has its own cache directory. Reports how many upstream requests
+each node made and which snapshot generation and listings ETag every node
+ended up serving: exactly one node (the elected leader) should have called
+upstream, and all nodes should hold the same data. With --failover the
+leader exits halfway and another node takes over.
+
+Usage:
+    python benchmarks/bench_replication.py [--nodes 4] [--rows 5000] [--seconds 8] [--failover]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from bench_listing_store import make_catalog, make_listings  # noqa: E402
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+PAGE_SIZE = 100
+
+CHILD = r'''
+import json, logging, sys, time
+sys.path.insert(0, ROOT)
+logging.disable(logging.CRITICAL)
+import data_cache
+cache = data_cache.get_cache()
+cache.api_url = UPSTREAM
+cache.start()
+started = time.time()
+while time.time() < started + SECONDS:
+    if LEADER_LIFETIME and time.time() >= started + LEADER_LIFETIME:
+        # Only the node leading at this point exits; a promoted one stays
+        if cache.replication.leading:
+            break
+        LEADER_LIFETIME = None
+    time.sleep(0.1)
+print(json.dumps({
+    'leading': cache.replication.leading,
+    'generation': cache.replication.generation,
+    'listings_etag': cache.get_etag(data_cache.LISTINGS_KEY),
+    'rows': len(cache.get_listing_store()),
+    'ready': cache.is_ready(),
+}))
+'''
+
+
+def start_upstream(rows):
+    catalog = make_catalog()
+    listings = make_listings(rows)
+    total_pages = max(1, -(-len(listings) // PAGE_SIZE))
+    calls = Counter()
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+            node = parse_qs(urlparse(self.path).query).get('node', ['?'])[0]
+            with lock:
+                calls[node] += 1
+            route = payload.get('route')
+            if route == 'get_game_items':
+                body = catalog
+            elif route == 'get_listings':
+                page = int(payload.get('page') or 1)
+                body = {'status': 'success', 'total_pages': total_pages,
+                        'listings': listings[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]}
+            elif route == 'get_top_players':
+                body = {'status': 'success', 'top_10': [{'username': 'player1', 'level': 50}]}
+            else:
+                body = {'status': 'success', route.replace('get_', ''): []}
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd, calls
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--nodes', type=int, default=4)
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--seconds', type=float, default=8)
+    parser.add_argument('--failover', action='store_true', help='leader exits halfway through')
+    args = parser.parse_args()
+
+    httpd, calls = start_upstream(args.rows)
+    upstream = f'http://127.0.0.1:{httpd.server_address[1]}/'
+
+    with tempfile.TemporaryDirectory() as workdir:
+        shared = os.path.join(workdir, 'shared')
+        env = dict(os.environ, RPG_TOKEN='bench', REPLICATION_ROLE='auto',
+                   REPLICATION_DIR=shared, REPLICATION_POLL_SECONDS='0.5')
+        procs = []
+        for i in range(args.nodes):
+            node_dir = os.path.join(workdir, f'node{i}')
+            os.mkdir(node_dir)
+            code = (f'ROOT = {ROOT!r}\nUPSTREAM = {upstream + "?node=" + str(i)!r}\n'
+                    f'SECONDS = {args.seconds!r}\n'
+                    f'LEADER_LIFETIME = {args.seconds / 2 if args.failover else None!r}\n' + CHILD)
+            procs.append(subprocess.Popen([sys.executable, '-c', code], cwd=node_dir, env=env,
+                                          stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True))
+
+        results = []
+        for proc in procs:
+            out, _ = proc.communicate()
+            results.append(json.loads(out.strip().splitlines()[-1]))
+    httpd.shutdown()
+
+    print(f'{args.nodes} nodes, {args.rows} listings, {args.seconds:.0f}s'
+          f'{" with leader failover" if args.failover else ""}')
+    for i, result in enumerate(results):
+        print(f"node{i}  upstream requests {calls.get(str(i), 0):5d}  "
+              f"{'leader  ' if result['leading'] else 'follower'}  generation {result['generation']}  "
+              f"ready {result['ready']}  rows {result['rows']}  listings etag {result['listings_etag']}")
+    fetchers = sum(1 for i in range(args.nodes) if calls.get(str(i)))
+    print(f'nodes that called upstream: {fetchers}')
+
+
+if __name__ == '__main__':
+    main()
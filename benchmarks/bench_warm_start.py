@@ -0,0 +1,89 @@
+"""
+Benchmark: startup time to first cached response, warm vs. lazy start.
+
+Writes a synthetic persisted snapshot (catalog, listings page 1 and a full
+listings snapshot) to a temporary cache directory, then starts the app in
+a fresh process twice: once with the warm start, once with the old lazy
+disk loading. Reports import time, /readyz status and the time until the
+first /api/listings/query response, all measured from process start.
+Network refreshes are disabled in the child processes.
+
+Usage:
+    python benchmarks/bench_warm_start.py [--rows 100000]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from bench_listing_store import make_catalog, make_listings  # noqa: E402
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+CHILD = r'''
+import json, logging, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, ROOT)
+logging.disable(logging.CRITICAL)
+import data_cache
+data_cache.DataCache._background_refresh_loop = lambda self: None
+if not WARM:
+    start = data_cache.DataCache.start
+    data_cache.DataCache.start = lambda self, warm=True: start(self, warm=False)
+import app
+t1 = time.perf_counter()
+client = app.app.test_client()
+ready = client.get('/readyz').status_code
+response = client.get('/api/listings/query')
+t2 = time.perf_counter()
+print(json.dumps({'import': t1 - t0, 'readyz': ready, 'first_response': t2 - t0,
+                  'status': response.status_code, 'total': response.get_json().get('total_listings')}))
+'''
+
+
+def write_snapshot(cache_dir, rows):
+    catalog = make_catalog()
+    listings = make_listings(rows)
+    files = {
+        'items': catalog,
+        'listings_page1': {'listings': listings[:100], 'total_pages': rows // 100},
+        'listings_all': {'listings': listings},
+    }
+    for name, data in files.items():
+        with open(os.path.join(cache_dir, f'{name}.json'), 'w') as f:
+            json.dump(data, f)
+
+
+def run(cache_dir, warm):
+    code = f'ROOT = {ROOT!r}\nWARM = {warm!r}\n' + CHILD
+    env = dict(os.environ)
+    env.pop('RPG_TOKEN', None)
+    out = subprocess.run([sys.executable, '-c', code], cwd=cache_dir, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        cache_dir = os.path.join(workdir, 'cache_data')
+        os.mkdir(cache_dir)
+        write_snapshot(cache_dir, args.rows)
+        print(f'{args.rows} persisted listings')
+        for name, warm in (('lazy (before)', False), ('warm start', True)):
+            result = run(workdir, warm)
+            print(f"{name:14s} import {result['import'] * 1000:7.0f} ms  /readyz {result['readyz']}  "
+                  f"first query response {result['first_response'] * 1000:7.0f} ms "
+                  f"({result['total']} rows)")
+
+
+if __name__ == '__main__':
+    main()
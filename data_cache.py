@@ -3,41 +3,203 @@ Data caching service for periodic API data fetching.
 Caches static game data locally and refreshes every hour.
 """
 
+import hashlib
 import json
 import os
+import random
 import time
 import threading
 import logging
+from collections import Counter, OrderedDict
 from pathlib import Path
 from datetime import datetime, timedelta
 import requests
+from listing_store import ListingStore
+from search_index import SearchIndex, build_search_index
+from leaderboard import build_leaderboard
+from leaderboard_history import LeaderboardHistory
+from overview import build_market_summary
+from deals import DealIndex
+from watchlists import Watchlists
+from exports import load_manifest
+from snapshot_worker import SnapshotDeriver
+from replication import Replication
+from timing import span
 
 logger = logging.getLogger(__name__)
 
+# Cache key of the full (all pages) listings snapshot
+LISTINGS_KEY = 'listings:all'
+
+# Keys persisted by the refresh cycle and preloaded by warm_start()
+WARM_KEYS = ('items', 'shaders', 'backs', 'chests', 'top_players', 'leaderboard', 'listings:page1')
+# Keys that must be in memory before the process reports ready
+READY_KEYS = ('items', 'listings:page1')
+
+# Refresh jobs, in run order (items first: other jobs join against the catalog),
+# with the cache keys each one produces
+REFRESH_JOBS = {
+    'items': ('items',),
+    'shaders': ('shaders',),
+    'backs': ('backs',),
+    'chests': ('chests',),
+    'top_players': ('top_players', 'leaderboard'),
+    'listings': ('listings:page1', LISTINGS_KEY),
+}
+
+# Keys a replication leader publishes, in the order followers apply them
+REPLICATED_KEYS = tuple(key for keys in REFRESH_JOBS.values() for key in keys)
+
+# Per-job (min, initial, max) refresh interval in seconds; None = refresh_interval
+REFRESH_BOUNDS = {
+    'items': (900, None, 6 * 3600),
+    'shaders': (900, None, 6 * 3600),
+    'backs': (900, None, 6 * 3600),
+    'chests': (900, None, 6 * 3600),
+    'top_players': (300, None, 3600),
+    'listings': (120, 300, 3600),
+}
+
+# Keys never evicted from memory (core data every page load needs)
+PINNED_KEYS = frozenset(WARM_KEYS)
+
+# Default in-memory budget for cache entries, overridable via CACHE_MEMORY_BUDGET_MB
+DEFAULT_MEMORY_BUDGET_MB = 256
+
+# Eviction policies for unpinned entries once the budget is exceeded
+EVICTION_POLICIES = ('lru', 'lfu')
+
+# Interval multipliers applied after a refresh that changed / didn't change content
+SHORTEN_FACTOR = 0.5
+LENGTHEN_FACTOR = 1.5
+
+
+class _RefreshJob:
+    """Adaptive schedule of one refresh job."""
+    
+    __slots__ = ('name', 'keys', 'min_interval', 'max_interval', 'interval',
+                 'next_due', 'checks', 'changes', 'last_changed_at')
+    
+    def __init__(self, name, keys, min_interval, interval, max_interval):
+        self.name = name
+        self.keys = keys
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min(max(interval, min_interval), max_interval)
+        self.next_due = 0
+        self.checks = 0
+        self.changes = 0
+        self.last_changed_at = None
+    
+    def reschedule(self, changed, now, first=False):
+        """
+        Adapt the interval to the observed change rate: halve it when the
+        content changed, stretch it when it didn't, within the job's bounds.
+        changed is None when the refresh failed (retry at the minimum interval);
+        first marks an initial load, which has nothing to compare against.
+        """
+        if changed is None:
+            self.next_due = now + self.min_interval
+            return
+        if first:
+            self.next_due = now + self.interval
+            return
+        self.checks += 1
+        if changed:
+            self.changes += 1
+            self.last_changed_at = now
+            self.interval = max(self.min_interval, self.interval * SHORTEN_FACTOR)
+        else:
+            self.interval = min(self.max_interval, self.interval * LENGTHEN_FACTOR)
+        self.next_due = now + self.interval
+
 class DataCache:
     """
     Manages cached data with automatic hourly refresh.
     Stores data locally on disk to persist across server restarts.
     """
     
-    def __init__(self, cache_dir='cache_data', refresh_interval=3600):
+    def __init__(self, cache_dir='cache_data', refresh_interval=3600, startup_jitter=30,
+                 memory_budget=None, eviction_policy='lru', replication=None, deriver=None):
         """
         Initialize the data cache.
         
         Args:
             cache_dir: Directory to store cached data files
-            refresh_interval: Time in seconds between refreshes (default: 3600 = 1 hour)
+            refresh_interval: Initial time in seconds between refreshes of jobs
+                without their own initial interval (default: 3600 = 1 hour);
+                each job then adapts within REFRESH_BOUNDS
+            startup_jitter: Max random delay in seconds added to the first refresh
+                after a warm start, so restarted workers don't refresh in lockstep
+            memory_budget: Max bytes of (serialized) entries held in memory
+                (default: CACHE_MEMORY_BUDGET_MB env var, else 256 MB)
+            eviction_policy: 'lru' or 'lfu' for unpinned entries over budget
+            replication: Replication role of this node (default: standalone,
+                refreshing from the API itself)
+            deriver: SnapshotDeriver building listings snapshots (default:
+                inline, in the refresh thread)
         """
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
         self.refresh_interval = refresh_interval
+        self.startup_jitter = startup_jitter
+        self.refresh_jobs = {
+            name: _RefreshJob(name, keys, REFRESH_BOUNDS[name][0],
+                              REFRESH_BOUNDS[name][1] or refresh_interval, REFRESH_BOUNDS[name][2])
+            for name, keys in REFRESH_JOBS.items()
+        }
+        # Catalog ETag the current listing store was built against
+        self.listing_store_items_etag = None
+        
+        # Startup bookkeeping for readiness reporting
+        self.created_at = time.time()
+        self.ready_at = None
+        self.warm_started = False
+        self.warm_start_seconds = None
         
-        # In-memory cache with timestamps
-        self.cache = {}
+        # In-memory cache with timestamps, in least- to most-recently used order
+        self.cache = OrderedDict()
         self.cache_timestamps = {}
+        self.cache_etags = {}
+        
+        # Memory budget: per-entry sizes, access counters and evictions
+        if memory_budget is None:
+            memory_budget = int(os.environ.get('CACHE_MEMORY_BUDGET_MB', DEFAULT_MEMORY_BUDGET_MB)) * 1024 * 1024
+        if eviction_policy not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy: {eviction_policy}")
+        self.memory_budget = memory_budget
+        self.eviction_policy = eviction_policy
+        self.cache_sizes = {}
+        self.cache_hits = Counter()
+        self.cache_misses = Counter()       # Per key, for keys that exist on some tier
+        self.cache_evictions = Counter()
+        self.untracked_misses = 0           # Lookups of keys that exist nowhere
+        
+        # Full listings snapshot, held column-wise rather than as dicts
+        self.listing_store = ListingStore()
+        self.search_index = SearchIndex()
+        self.deal_index = DealIndex()
+        self.market_summary = None          # (store, summary) of the overview tab
+        self.watchlists = Watchlists(self.cache_dir / 'watchlists.json')
+        self.leaderboard_history = LeaderboardHistory(self.cache_dir / 'leaderboard_history')
+        
+        # Compressed CSV/JSONL exports, rewritten after each listings rebuild
+        self.export_dir = (self.cache_dir / 'exports').resolve()
+        self.export_manifest = load_manifest(self.export_dir)
+        
+        # Multi-node replication: only the leader refreshes from upstream
+        self.replication = replication or Replication()
+        
+        # Listings snapshot derivations, optionally in worker processes (SNAPSHOT_WORKERS)
+        self.deriver = deriver or SnapshotDeriver()
         
         # Lock for thread-safe cache access
         self.lock = threading.Lock()
+        # Serializes listings snapshot builds (refresh, follower pull, disk
+        # fallback), so the incremental indexes see snapshots in order
+        self.listings_build_lock = threading.RLock()
+        # The disk fallback of get_listing_store runs once, even if no file exists
+        self.listings_disk_checked = False
         
         # Background refresh thread
         self.refresh_thread = None
@@ -69,14 +231,21 @@ class DataCache:
         return None
     
     def _save_to_disk(self, key, data):
-        """Save cached data to disk."""
+        """
+        Save cached data to disk. Written to a temporary file and renamed
+        into place, so readers never see a partial file and the caller
+        needn't hold the lock while a large payload is serialized.
+        """
         file_path = self._get_cache_file_path(key)
+        tmp_path = file_path.with_name(f".{file_path.name}.{threading.get_ident()}.tmp")
         try:
-            with open(file_path, 'w') as f:
+            with open(tmp_path, 'w') as f:
                 json.dump(data, f)
-                logger.info(f"Saved {key} to disk cache")
+            os.replace(tmp_path, file_path)
+            logger.info(f"Saved {key} to disk cache")
         except Exception as e:
             logger.error(f"Error saving {key} to disk: {e}")
+            tmp_path.unlink(missing_ok=True)
     
     def _fetch_items(self):
         """Fetch game items from API."""
@@ -134,6 +303,20 @@ class DataCache:
             logger.error(f"Error fetching chests: {e}")
             return None
     
+    def _fetch_top_players(self):
+        """Fetch the leaderboard from API."""
+        payload = {
+            "route": "get_top_players",
+            "token": self.token,
+        }
+        try:
+            r = requests.post(self.api_url, json=payload, timeout=15)
+            r.raise_for_status()
+            return r.json()
+        except Exception as e:
+            logger.error(f"Error fetching top players: {e}")
+            return None
+    
     def _fetch_skills(self, class_name):
         """Fetch skills for a specific class from API using admin token."""
         payload = {
@@ -185,6 +368,8 @@ class DataCache:
             payload["slot"] = slot
         if class_:
             payload["class"] = class_
+        if page and page > 1:
+            payload["page"] = page
         
         try:
             r = requests.post(self.api_url, json=payload, timeout=15)
@@ -194,47 +379,132 @@ class DataCache:
             logger.error(f"Error fetching listings: {e}")
             return None
     
-    def _refresh_all_data(self):
-        """Refresh all cached data."""
-        logger.info("Starting data refresh cycle...")
+    def _fetch_all_listings(self, first_page=None):
+        """
+        Fetch every marketplace listings page.
         
-        refreshed = []
+        Args:
+            first_page: Already fetched page 1 payload (fetched if None)
         
-        # Refresh items FIRST - we need this to get the class list
-        items_data = self._fetch_items()
-        if items_data:
-            self._set_cache('items', items_data)
-            refreshed.append('items')
+        Returns:
+            List of listing dicts, or None if page 1 could not be fetched
+        """
+        first_page = first_page or self._fetch_listings(page=1)
+        if not first_page or not first_page.get('listings'):
+            return None
         
-        # Refresh shaders
+        listings = list(first_page['listings'])
+        total_pages = first_page.get('total_pages') or 1
+        for page in range(2, int(total_pages) + 1):
+            data = self._fetch_listings(page=page)
+            if not data or not data.get('listings'):
+                logger.warning(f"Listings page {page}/{total_pages} unavailable, snapshot is partial")
+                break
+            listings.extend(data['listings'])
+        return listings
+    
+    def _refresh_items(self):
+        items_data = self._fetch_items()
+        if not items_data:
+            return None
+        changed = self._set_cache('items', items_data)
+        if changed:
+            # Catalog joins are stale: re-derive the leaderboard, rebuild listings soon
+            top_players = self.get('top_players')
+            if top_players:
+                self._set_cache('leaderboard', build_leaderboard(top_players, items_data))
+            with self.lock:
+                self.refresh_jobs['listings'].next_due = time.time()
+        return changed
+    
+    def _refresh_shaders(self):
         data = self._fetch_shaders()
-        if data:
-            self._set_cache('shaders', data)
-            refreshed.append('shaders')
-        
-        # Refresh backs
+        return self._set_cache('shaders', data) if data else None
+    
+    def _refresh_backs(self):
         data = self._fetch_backs()
-        if data:
-            self._set_cache('backs', data)
-            refreshed.append('backs')
-        
-        # Refresh chests
+        return self._set_cache('backs', data) if data else None
+    
+    def _refresh_chests(self):
         data = self._fetch_chests()
-        if data:
-            self._set_cache('chests', data)
-            refreshed.append('chests')
+        return self._set_cache('chests', data) if data else None
+    
+    def _refresh_top_players(self):
+        # Leaderboard, with its equipment join and meta-stats derived once here
+        data = self._fetch_top_players()
+        if not data or not data.get('top_10'):
+            return None
+        changed = self._set_cache('top_players', data)
+        if changed or self.get('leaderboard') is None:
+            self._set_cache('leaderboard', build_leaderboard(data, self.get('items')))
+        if changed:
+            self._record_leaderboard(data)
+        return changed
+    
+    def _record_leaderboard(self, data, timestamp=None):
+        """Append a changed leaderboard to its history (never fails the refresh)."""
+        try:
+            self.leaderboard_history.record(data, timestamp)
+        except Exception as e:
+            logger.error(f"Error recording leaderboard history: {e}")
+    
+    def _refresh_listings(self):
+        # First page of listings (marketplace overview)
+        data = self._fetch_listings(page=1)
+        if not data:
+            return None
+        changed = self._set_cache('listings:page1', data)
+        # Overview data is in place; don't wait for every listings page to report ready
+        self.is_ready()
+        
+        # Full listings snapshot for server-side filtering; derived structures are
+        # only rebuilt when the listings or the catalog they join against changed
+        listings = self._fetch_all_listings(first_page=data)
+        if listings:
+            items_etag = self.get_etag('items')
+            listings_etag = self.listings_etag(listings)
+            with self.lock:
+                unchanged = (self.cache_etags.get(LISTINGS_KEY) == listings_etag
+                             and self.listing_store_items_etag == items_etag
+                             and len(self.listing_store) > 0)
+                if unchanged:
+                    self.cache_timestamps[LISTINGS_KEY] = time.time()
+                    self._touch_disk(LISTINGS_KEY)
+            if not unchanged:
+                self._set_listings(listings, self.get('items'), self.get('leaderboard'), listings_etag)
+                changed = True
+        return changed
+    
+    def _refresh_all_data(self, jobs=None):
+        """
+        Run refresh jobs and reschedule each from whether its content changed.
+        
+        Args:
+            jobs: Job names to run (all jobs when None)
+        """
+        logger.info("Starting data refresh cycle...")
+        
+        refreshed, unchanged, failed = [], [], []
+        for name in REFRESH_JOBS:
+            if jobs is not None and name not in jobs:
+                continue
+            with self.lock:
+                first = any(key not in self.cache_etags for key in REFRESH_JOBS[name])
+            try:
+                changed = getattr(self, f'_refresh_{name}')()
+            except Exception as e:
+                logger.error(f"Error refreshing {name}: {e}")
+                changed = None
+            with self.lock:
+                self.refresh_jobs[name].reschedule(changed, time.time(), first=first)
+            (failed if changed is None else refreshed if changed else unchanged).append(name)
         
         # NOTE: Skills cannot be cached here because they require user authentication
         # and the API returns 404 when using the admin token. Skills will be fetched
         # on-demand when users request them via the /api/skills endpoint.
         
-        # Optionally refresh first page of listings (marketplace overview)
-        data = self._fetch_listings(page=1)
-        if data:
-            self._set_cache('listings:page1', data)
-            refreshed.append('listings:page1')
-        
-        logger.info(f"Data refresh complete. Refreshed: {', '.join(refreshed)}")
+        logger.info(f"Data refresh complete. Changed: {', '.join(refreshed) or '-'}; "
+                    f"unchanged: {', '.join(unchanged) or '-'}; failed: {', '.join(failed) or '-'}")
     
     def _extract_classes_from_items(self, items_data):
         """
@@ -310,12 +580,89 @@ class DataCache:
         return result
     
     
+    @staticmethod
+    def _encode(data):
+        return json.dumps(data, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    
+    @staticmethod
+    def compute_etag(data):
+        """Compute a stable content hash usable as an HTTP ETag."""
+        return hashlib.sha1(DataCache._encode(data)).hexdigest()[:20]
+    
+    @staticmethod
+    def listings_etag(listings):
+        """
+        Content hash of a full listings snapshot, encoded row by row: one
+        json.dumps of 100k rows holds the GIL for hundreds of milliseconds.
+        """
+        sha = hashlib.sha1()
+        for listing in listings:
+            sha.update(DataCache._encode(listing))
+        return sha.hexdigest()[:20]
+    
+    def _store(self, key, data, timestamp, encoded=None):
+        """
+        Put an entry in memory as most recently used and account for its
+        size, evicting others if over budget (caller holds the lock).
+        """
+        encoded = encoded if encoded is not None else self._encode(data)
+        self.cache[key] = data
+        self.cache.move_to_end(key)
+        self.cache_timestamps[key] = timestamp
+        self.cache_etags[key] = hashlib.sha1(encoded).hexdigest()[:20]
+        self.cache_sizes[key] = len(encoded)
+        self._evict_over_budget(keep=key)
+    
+    def _evict_over_budget(self, keep=None):
+        """
+        Evict unpinned entries until memory use fits the budget (caller holds
+        the lock). Evicted entries spill to the disk tier, so a later get()
+        reloads them. The entry just stored is kept even if it alone is over.
+        """
+        used = sum(self.cache_sizes.values())
+        if used <= self.memory_budget:
+            return
+        candidates = [key for key in self.cache if key not in PINNED_KEYS and key != keep]
+        if self.eviction_policy == 'lfu':
+            # Stable sort: ties keep least-recently-used order
+            candidates.sort(key=lambda k: self.cache_hits[k])
+        for key in candidates:
+            if used <= self.memory_budget:
+                break
+            if not self._get_cache_file_path(key).exists():
+                self._save_to_disk(key, self.cache[key])
+            del self.cache[key]
+            used -= self.cache_sizes.pop(key)
+            self.cache_evictions[key] += 1
+            logger.info(f"Evicted {key} from memory cache")
+    
+    def _touch_disk(self, key):
+        """Mark a key's disk file as current without rewriting it."""
+        try:
+            os.utime(self._get_cache_file_path(key))
+        except OSError:
+            pass
+    
     def _set_cache(self, key, data):
-        """Set cache data with timestamp."""
+        """
+        Set cache data with timestamp.
+        Unchanged content (same hash) only refreshes the timestamp: no disk
+        write, no new ETag.
+        
+        Returns:
+            True if the content changed
+        """
+        encoded = self._encode(data)
+        etag = hashlib.sha1(encoded).hexdigest()[:20]
         with self.lock:
-            self.cache[key] = data
             self.cache_timestamps[key] = time.time()
+            if self.cache_etags.get(key) == etag and (
+                    key in self.cache or self._get_cache_file_path(key).exists()):
+                self._touch_disk(key)
+                return False
+            self._store(key, data, time.time(), encoded)
             self._save_to_disk(key, data)
+            return True
     
     def get(self, key, max_age=None):
         """
@@ -328,51 +675,408 @@ class DataCache:
         Returns:
             Cached data or None if not available/expired
         """
+        with span('cache'), self.lock:
+            return self._get_locked(key, max_age)
+    
+    def _get_locked(self, key, max_age=None):
+        """get() for a caller that holds the lock."""
+        # Check in-memory cache first
+        if key in self.cache:
+            age = time.time() - self.cache_timestamps.get(key, 0)
+            if max_age is None or age <= max_age:
+                self.cache.move_to_end(key)
+                self.cache_hits[key] += 1
+                return self.cache[key]
+        
+        # Try loading from disk if not in memory (evicted entries live there)
+        data = self._load_from_disk(key)
+        if data:
+            self.cache_misses[key] += 1
+            self._store(key, data, time.time())
+            return data
+        
+        self.untracked_misses += 1
+        return None
+    
+    @staticmethod
+    def _player_names(leaderboard):
+        return [p.get('username') for p in (leaderboard or {}).get('players', [])]
+    
+    def _set_listings(self, listings, items_data, leaderboard=None, etag=None, publish=True, timestamp=None):
+        """
+        Build and publish a new columnar listings snapshot.
+        The store, search index and export files are derived by the
+        SnapshotDeriver (in a worker process from the persisted payload
+        when SNAPSHOT_WORKERS is set, see snapshot_worker); the
+        incremental deal index and watchlist matching stay here, as they
+        keep state across snapshots.
+        
+        Args:
+            publish: Write the listings file and the exports. False when
+                they are already on disk (a worker following a leader on
+                the same host, or the snapshot was loaded from disk): only
+                the in-memory structures are built and the export manifest
+                is re-read from disk.
+            timestamp: When the snapshot was fetched (default now)
+        """
+        with self.listings_build_lock:
+            etag = etag or self.listings_etag(listings)
+            if publish:
+                # Only the raw payload goes to disk; memory holds the columns
+                self._save_to_disk(LISTINGS_KEY, {'listings': listings})
+                store, index, manifest = self.deriver.derive(
+                    self._get_cache_file_path(LISTINGS_KEY), listings, items_data,
+                    self._player_names(leaderboard), self.export_dir)
+            else:
+                # The shared file may already hold a newer snapshot: derive from memory
+                store, index, _ = self.deriver.derive(None, listings, items_data, self._player_names(leaderboard))
+                manifest = load_manifest(self.export_dir)
+            # Incremental: only groups touched by changed listings are re-ranked
+            self.deal_index.update(store, items_data)
+            self.watchlists.process_snapshot(store, items_data)
+            market_summary = build_market_summary(store)
+            with self.lock:
+                self.listing_store = store
+                self.market_summary = (store, market_summary)
+                self.search_index = index
+                self.listing_store_items_etag = self.cache_etags.get('items')
+                self.cache_timestamps[LISTINGS_KEY] = timestamp or time.time()
+                self.cache_etags[LISTINGS_KEY] = etag
+                if manifest is not None:
+                    self.export_manifest = manifest
+    
+    def get_export(self, dataset, fmt):
+        """
+        Get the current export file of a dataset.
+        
+        Args:
+            dataset: 'listings' or 'items'
+            fmt: 'csv' or 'jsonl'
+        
+        Returns:
+            (path, manifest entry, generated_at) or None if not exported yet
+        """
+        with self.lock:
+            manifest = self.export_manifest
+        found = self._export_entry(manifest, dataset, fmt)
+        if found is None:
+            # Another process sharing the export directory wrote newer
+            # generations and pruned ours: serve what it published
+            manifest = load_manifest(self.export_dir)
+            found = self._export_entry(manifest, dataset, fmt)
+            if found is not None:
+                with self.lock:
+                    self.export_manifest = manifest
+        return found
+    
+    def _export_entry(self, manifest, dataset, fmt):
+        entry = (manifest or {}).get('files', {}).get(f'{dataset}.{fmt}')
+        if not entry:
+            return None
+        path = self.export_dir / entry['file']
+        if not path.exists():
+            return None
+        return path, entry, manifest['generated_at']
+    
+    def get_listing_store(self):
+        """
+        Get the current columnar listings snapshot.
+        Falls back to the last snapshot on disk if none was fetched yet; it
+        is built outside the cache lock, so readers don't wait for it.
+        """
+        with self.lock:
+            if len(self.listing_store) or LISTINGS_KEY in self.cache_timestamps or self.listings_disk_checked:
+                return self.listing_store
+        with self.listings_build_lock:
+            with self.lock:
+                # Built (or found missing) by another thread while we waited
+                if len(self.listing_store) or LISTINGS_KEY in self.cache_timestamps or self.listings_disk_checked:
+                    return self.listing_store
+                self.listings_disk_checked = True
+                items_data = self.cache.get('items')
+                leaderboard = self.cache.get('leaderboard')
+            data = self._load_from_disk(LISTINGS_KEY)
+            if data and data.get('listings'):
+                self._set_listings(
+                    data['listings'],
+                    items_data or self._load_from_disk('items'),
+                    leaderboard or self._load_from_disk('leaderboard'),
+                    publish=False,
+                    timestamp=self._disk_mtime(LISTINGS_KEY))
+        with self.lock:
+            return self.listing_store
+    
+    def get_search_index(self):
+        """Get the search index matching the current listings snapshot."""
+        self.get_listing_store()
+        with self.lock:
+            return self.search_index
+    
+    def get_deal_index(self):
+        """Get the deal index matching the current listings snapshot."""
+        self.get_listing_store()
+        return self.deal_index
+    
+    def get_market_summary(self):
+        """Get the overview's market figures of the current listings snapshot (computed once per snapshot)."""
+        store = self.get_listing_store()
+        with self.lock:
+            if self.market_summary and self.market_summary[0] is store:
+                return self.market_summary[1]
+        summary = build_market_summary(store)
+        with self.lock:
+            if self.listing_store is store:
+                self.market_summary = (store, summary)
+        return summary
+    
+    def get_etag(self, key):
+        """Get the ETag of the cached data for a key (None if not cached)."""
+        with self.lock:
+            return self.cache_etags.get(key)
+    
+    def has(self, key):
+        """Whether get(key) can be answered without the network (no hit/miss counted)."""
         with self.lock:
-            # Check in-memory cache first
             if key in self.cache:
-                if max_age is None:
-                    return self.cache[key]
-                
-                age = time.time() - self.cache_timestamps.get(key, 0)
-                if age <= max_age:
-                    return self.cache[key]
-            
-            # Try loading from disk if not in memory
+                return True
+        return self._get_cache_file_path(key).exists()
+    
+    def get_snapshot(self, keys):
+        """
+        Get a consistent view of several keys at once.
+        
+        Args:
+            keys: Iterable of cache keys
+        
+        Returns:
+            Dict of key -> {'data': ..., 'etag': ...} for keys that have data
+        """
+        snapshot = {}
+        # One acquisition: a refresh cannot land between two keys, or between data and ETag
+        with span('cache'), self.lock:
+            for key in keys:
+                data = self._get_locked(key)
+                if data:
+                    snapshot[key] = {'data': data, 'etag': self.cache_etags.get(key)}
+        return snapshot
+    
+    def _disk_mtime(self, key):
+        """When a key's disk file was written (now if unknown)."""
+        try:
+            return self._get_cache_file_path(key).stat().st_mtime
+        except OSError:
+            return time.time()
+    
+    def warm_start(self):
+        """
+        Preload the last persisted snapshot from disk before serving, so
+        requests are answered from memory right away instead of waiting for
+        the first network refresh. Entries keep their on-disk age.
+        
+        Returns:
+            List of keys loaded from disk
+        """
+        started = time.time()
+        loaded = []
+        for key in WARM_KEYS:
             data = self._load_from_disk(key)
-            if data:
-                self.cache[key] = data
-                self.cache_timestamps[key] = time.time()
-                return data
+            if not data:
+                continue
+            with self.lock:
+                # A refresh that already landed is newer than the disk copy
+                if key not in self.cache:
+                    self._store(key, data, self._disk_mtime(key))
+            loaded.append(key)
         
-        return None
+        if len(self.get_listing_store()):
+            loaded.append(LISTINGS_KEY)
+        
+        self.warm_started = bool(loaded)
+        self.warm_start_seconds = round(time.time() - started, 3)
+        self.is_ready()
+        logger.info(f"Warm start loaded {len(loaded)} keys in {self.warm_start_seconds}s: {', '.join(loaded)}")
+        return loaded
+    
+    def _init_schedule(self, warm=None):
+        """
+        First due time of every job: now on a cold start; after a warm start
+        (or a follower's promotion to leader), when the job's data is due,
+        plus a random stagger so restarted workers don't refresh in lockstep.
+        """
+        warm = self.warm_started if warm is None else warm
+        now = time.time()
+        with self.lock:
+            for job in self.refresh_jobs.values():
+                timestamps = [self.cache_timestamps.get(key) for key in job.keys]
+                if not warm or None in timestamps:
+                    job.next_due = now
+                else:
+                    job.next_due = min(timestamps) + job.interval + random.uniform(0, self.startup_jitter)
+    
+    def _due_jobs(self):
+        now = time.time()
+        with self.lock:
+            return [name for name, job in self.refresh_jobs.items() if job.next_due <= now]
+    
+    def _seconds_until_next_job(self):
+        with self.lock:
+            next_due = min(job.next_due for job in self.refresh_jobs.values())
+        return max(0, next_due - time.time())
+    
+    def get_refresh_schedule(self):
+        """Per-job adaptive schedule: interval, bounds, next refresh and change rate."""
+        now = time.time()
+        with self.lock:
+            return {
+                name: {
+                    'keys': list(job.keys),
+                    'interval_seconds': round(job.interval, 1),
+                    'min_interval_seconds': job.min_interval,
+                    'max_interval_seconds': job.max_interval,
+                    'next_refresh_at': datetime.fromtimestamp(job.next_due).isoformat() if job.next_due else None,
+                    'next_refresh_in_seconds': round(max(0, job.next_due - now), 1),
+                    'checks': job.checks,
+                    'changes': job.changes,
+                    'last_changed_at': (datetime.fromtimestamp(job.last_changed_at).isoformat()
+                                        if job.last_changed_at else None),
+                }
+                for name, job in self.refresh_jobs.items()
+            }
+    
+    def is_ready(self):
+        """True once every key in READY_KEYS is held in memory."""
+        with self.lock:
+            ready = all(key in self.cache for key in READY_KEYS)
+            if ready and self.ready_at is None:
+                self.ready_at = time.time()
+                logger.info(f"Data cache ready after {self.ready_at - self.created_at:.3f}s")
+        return ready
+    
+    def get_readiness(self):
+        """Readiness details for the /readyz endpoint."""
+        ready = self.is_ready()
+        with self.lock:
+            return {
+                'ready': ready,
+                'warm_started': self.warm_started,
+                'warm_start_seconds': self.warm_start_seconds,
+                'startup_seconds': round(self.ready_at - self.created_at, 3) if self.ready_at else None,
+                'missing': [key for key in READY_KEYS if key not in self.cache],
+            }
     
     def _background_refresh_loop(self):
-        """Background thread loop for periodic data refresh."""
+        """Background thread loop running each refresh job when it is due."""
         logger.info("Background refresh thread started")
         
-        # Do initial refresh immediately
-        try:
-            self._refresh_all_data()
-        except Exception as e:
-            logger.error(f"Error in initial data refresh: {e}")
+        self._init_schedule()
+        if self.warm_started:
+            logger.info(f"Serving warm snapshot, first refresh in {self._seconds_until_next_job():.0f}s")
         
-        # Then refresh every hour
+        leading = None
         while not self.should_stop.is_set():
-            # Wait for the refresh interval (or until stop is signaled)
-            if self.should_stop.wait(timeout=self.refresh_interval):
-                break
+            # Followers pull published snapshots instead of calling upstream
+            if not self.replication.is_leader():
+                leading = False
+                self._pull_snapshot()
+                if self.should_stop.wait(timeout=self.replication.poll_interval):
+                    break
+                continue
+            if leading is False:
+                # Promoted: take over the schedule from the replicated data's age
+                self._init_schedule(warm=True)
+            if not leading:
+                leading = True
+                self._publish_snapshot()
             
-            try:
-                self._refresh_all_data()
-            except Exception as e:
-                logger.error(f"Error in background refresh: {e}")
+            due = self._due_jobs()
+            if due:
+                try:
+                    self._refresh_all_data(due)
+                except Exception as e:
+                    logger.error(f"Error in background refresh: {e}")
+                self._publish_snapshot()
+                self.is_ready()
+                continue
+            
+            # Sleep until the next job is due (or until stop is signaled)
+            if self.should_stop.wait(timeout=self._seconds_until_next_job()):
+                break
         
         logger.info("Background refresh thread stopped")
     
-    def start(self):
-        """Start the background refresh thread."""
+    def _publish_snapshot(self):
+        """Publish the current snapshot as a new generation (leader only)."""
+        if not self.replication.enabled:
+            return
+        entries = {}
+        try:
+            with self.lock:
+                for key in REPLICATED_KEYS:
+                    if key not in self.cache_etags:
+                        continue
+                    # Disk files are replaced atomically: the open file keeps
+                    # the content matching this ETag while the copy runs unlocked
+                    try:
+                        source = open(self._get_cache_file_path(key), 'rb')
+                    except OSError:
+                        continue
+                    entries[key] = (self.cache_etags[key], source, self.cache_timestamps.get(key))
+            self.replication.publish(entries)
+        except Exception as e:
+            logger.error(f"Error publishing snapshot: {e}")
+        finally:
+            for _, source, _ in entries.values():
+                source.close()
+    
+    def _pull_snapshot(self):
+        """
+        Apply the leader's newest generation: only keys whose ETag differs
+        are fetched; the listings snapshot is rebuilt locally from its rows.
+        
+        Returns:
+            Number of keys applied
+        """
+        try:
+            manifest = self.replication.fetch_manifest()
+            if not manifest:
+                return 0
+            applied = 0
+            for key in REPLICATED_KEYS:
+                entry = manifest['keys'].get(key)
+                if not entry or self.get_etag(key) == entry['etag']:
+                    continue
+                data = self.replication.fetch_object(entry)
+                if key == LISTINGS_KEY:
+                    # Workers of the leader host share its cache directory, files and exports
+                    self._set_listings(data.get('listings') or [], self.get('items'), self.get('leaderboard'),
+                                       entry['etag'], publish=not self.replication.publishes_locally)
+                else:
+                    self._set_cache(key, data)
+                if key == 'top_players':
+                    # Same leader timestamp everywhere: a shared history directory dedupes it
+                    self._record_leaderboard(data, entry['timestamp'])
+                with self.lock:
+                    self.cache_timestamps[key] = entry['timestamp'] or time.time()
+                applied += 1
+            self.replication.applied(manifest)
+            logger.info(f"Applied snapshot generation {manifest['generation']} ({applied} keys changed)")
+            self.is_ready()
+            return applied
+        except Exception as e:
+            self.replication.last_error = str(e)
+            logger.error(f"Error pulling snapshot: {e}")
+            return 0
+    
+    def start(self, warm=True):
+        """
+        Start the background refresh thread.
+        
+        Args:
+            warm: Preload the persisted snapshot first (see warm_start)
+        """
         if self.refresh_thread is None or not self.refresh_thread.is_alive():
+            if warm and not self.warm_started:
+                self.warm_start()
             self.should_stop.clear()
             self.refresh_thread = threading.Thread(
                 target=self._background_refresh_loop,
@@ -400,7 +1104,59 @@ class DataCache:
                     'age_minutes': round(age / 60, 2),
                     'has_data': bool(self.cache.get(key))
                 }
-            return stats
+            # Memory accounting, including entries currently spilled to disk
+            for key in set(self.cache) | set(self.cache_evictions):
+                entry = stats.setdefault(key, {'has_data': False})
+                hits, misses = self.cache_hits[key], self.cache_misses[key]
+                entry.update({
+                    'in_memory': key in self.cache,
+                    'pinned': key in PINNED_KEYS,
+                    'size_bytes': self.cache_sizes.get(key, 0),
+                    'hits': hits,
+                    'misses': misses,
+                    'hit_rate': round(hits / (hits + misses), 3) if hits + misses else None,
+                    'evictions': self.cache_evictions[key],
+                })
+            if LISTINGS_KEY in self.cache_timestamps:
+                age = time.time() - self.cache_timestamps[LISTINGS_KEY]
+                stats[LISTINGS_KEY] = {
+                    'age_seconds': round(age, 2),
+                    'age_minutes': round(age / 60, 2),
+                    'has_data': len(self.listing_store) > 0,
+                    'rows': len(self.listing_store),
+                    'pinned': True,
+                }
+            for job in self.refresh_jobs.values():
+                for key in job.keys:
+                    if key in stats:
+                        stats[key]['next_refresh_in_seconds'] = round(max(0, job.next_due - time.time()), 1)
+                        stats[key]['refresh_interval_seconds'] = round(job.interval, 1)
+            store = self.listing_store
+        # A published store is never mutated: measure it (O(rows)) without the lock
+        if LISTINGS_KEY in stats:
+            stats[LISTINGS_KEY]['size_bytes'] = store.nbytes()
+        return stats
+    
+    def get_memory_stats(self):
+        """Totals of the memory budget: usage, hit rate and evictions."""
+        with self.lock:
+            hits = sum(self.cache_hits.values())
+            misses = sum(self.cache_misses.values()) + self.untracked_misses
+            store = self.listing_store
+            stats = {
+                'budget_bytes': self.memory_budget,
+                'used_bytes': sum(self.cache_sizes.values()),
+                'entries': len(self.cache),
+                'policy': self.eviction_policy,
+                'pinned_keys': sorted(PINNED_KEYS),
+                'hits': hits,
+                'misses': misses,
+                'hit_rate': round(hits / (hits + misses), 3) if hits + misses else None,
+                'evictions': sum(self.cache_evictions.values()),
+            }
+        # Measured without the lock, as in get_cache_stats
+        stats['listing_store_bytes'] = store.nbytes()
+        return stats
 
 
 # Global cache instance
@@ -410,5 +1166,5 @@ def get_cache():
     """Get the global cache instance."""
     global _cache_instance
     if _cache_instance is None:
-        _cache_instance = DataCache()
+        _cache_instance = DataCache(replication=Replication.from_env(), deriver=SnapshotDeriver.from_env())
     return _cache_instance
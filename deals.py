@@ -0,0 +1,274 @@
+"""
+Underpriced-listing ("deal finder") index.
+Keeps a robust price baseline (median and quartiles of total gold per
+power point) per analysis group and a ranked index of listings priced
+well below their group's median, updated incrementally per snapshot.
+"""
+
+import bisect
+import json
+import logging
+import threading
+
+from listing_store import build_catalog_index
+
+logger = logging.getLogger(__name__)
+
+# A listing is a deal when its gold-per-power is at most this share of the group median
+DEAL_RATIO = 0.6
+# Groups smaller than this have no trustworthy baseline
+MIN_GROUP_SIZE = 5
+
+# Same innate stats as CONFIG.innateStats in config.js
+INNATE_STATS = {
+    'weapon': 'Damage',
+    'head': 'HP',
+    'hands': 'Attack Speed',
+    'body': 'HP',
+    'feet': 'Movement Speed',
+}
+
+
+def _normalize_stat(stat):
+    return 'Attack Speed' if stat == 'A_Speed' else stat
+
+
+def listing_group(base_item_id, slot, extra, catalog_item):
+    """
+    Analysis group of a listing, as built by Analysis.calculateItemAnalysis:
+    base item + slot + actual stat combination + two-handedness.
+
+    Returns:
+        (group_key, stats list, is_two_handed)
+    """
+    try:
+        extra_data = json.loads(extra or '{}')
+        if not isinstance(extra_data, dict):
+            extra_data = {}
+    except ValueError:
+        extra_data = {}
+
+    stats = set()
+    if slot in INNATE_STATS:
+        stats.add(INNATE_STATS[slot])
+    listing_extra = str(extra_data.get('extra') or '').strip()
+    catalog_extras = [e.strip() for e in str(catalog_item.get('extra') or '').split(',') if e.strip()]
+    if listing_extra:
+        stats.add(_normalize_stat(listing_extra))
+    else:
+        stats.update(_normalize_stat(e) for e in catalog_extras)
+
+    two_handed = bool(extra_data.get('Two_handed') or extra_data.get('two_handed')
+                      or 'Two_handed' in catalog_extras or 'two_handed' in catalog_extras)
+    stats = sorted(stats)
+    key = f"{base_item_id}_{slot}_{'+'.join(stats) or 'No Stats'}_{two_handed}"
+    return key, stats, two_handed
+
+
+def _percentile(values, fraction):
+    """Linear-interpolated percentile of an already sorted list."""
+    if not values:
+        return None
+    position = (len(values) - 1) * fraction
+    low = int(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+class _Group:
+    """Sorted gold-per-power values and members of one analysis group."""
+
+    __slots__ = ('values', 'members', 'info')
+
+    def __init__(self, info):
+        self.values = []
+        self.members = set()
+        self.info = info
+
+    def baseline(self):
+        return {
+            'count': len(self.values),
+            'median': _percentile(self.values, 0.5),
+            'p25': _percentile(self.values, 0.25),
+            'p75': _percentile(self.values, 0.75),
+        }
+
+
+class DealIndex:
+    """
+    Incrementally maintained deal index.
+
+    update() diffs a new ListingStore against the previous snapshot by
+    listing id; only groups touched by added, removed or repriced listings
+    get their baseline and deal membership recomputed.
+    """
+
+    def __init__(self, deal_ratio=DEAL_RATIO, min_group_size=MIN_GROUP_SIZE):
+        self.deal_ratio = deal_ratio
+        self.min_group_size = min_group_size
+        self.lock = threading.Lock()
+        self._groups = {}        # group key -> _Group
+        self._listings = {}      # listing id -> (group key, gold per power, fingerprint)
+        self._deals = {}         # listing id -> deal record
+        self._group_deals = {}   # group key -> listing ids that are deals
+        self._ranked = []        # sorted (ratio, listing id) of current deals
+        self._rank_keys = {}     # listing id -> its exact entry in _ranked
+        self._group_memo = {}    # (base_item_id, slot, extra) -> (key, stats, two_handed)
+        self._memo_items = None  # items_data the memo was built from
+
+    def _group_of(self, base_item_id, slot, extra, catalog, memo):
+        """Group of a listing, reusing the previous snapshot's memo; records it in memo."""
+        memo_key = (base_item_id, slot, extra)
+        group = memo.get(memo_key) or self._group_memo.get(memo_key)
+        if group is None:
+            catalog_item = catalog.get((str(base_item_id), slot)) or {}
+            group = listing_group(base_item_id, slot, extra, catalog_item)
+        memo[memo_key] = group
+        return group
+
+    def update(self, store, items_data=None):
+        """
+        Apply a new listings snapshot.
+
+        Returns:
+            Dict with counts of added, removed and changed listings and touched groups
+        """
+        catalog = build_catalog_index(items_data)
+        if items_data is not self._memo_items:
+            # Another catalog may name or classify items differently
+            self._group_memo = {}
+        memo = {}
+        current = {}
+        rows = {}
+        for i in range(len(store)):
+            power = store.power[i] * 100
+            gold = store.total_gold[i]
+            # Gem-only or powerless listings have no gold-per-power price
+            if power <= 0 or gold <= 0:
+                continue
+            slot = store.slots.values[store.slot_codes[i]]
+            key, stats, two_handed = self._group_of(store.base_item_ids[i], slot, store.extra[i], catalog, memo)
+            listing_id = store.ids[i]
+            current[listing_id] = (key, gold / power, (power, gold, key))
+            rows[listing_id] = (i, stats, two_handed)
+        # Only groups of listings in this snapshot are kept
+        self._group_memo, self._memo_items = memo, items_data
+
+        with self.lock:
+            removed = [lid for lid in self._listings if lid not in current]
+            changed = [lid for lid, entry in current.items()
+                       if lid in self._listings and self._listings[lid][2] != entry[2]]
+            added = [lid for lid in current if lid not in self._listings]
+
+            touched = set()
+            for lid in removed + changed:
+                key, value, _ = self._listings.pop(lid)
+                group = self._groups[key]
+                del group.values[bisect.bisect_left(group.values, value)]
+                group.members.discard(lid)
+                touched.add(key)
+
+            for lid in changed + added:
+                key, value, _ = current[lid]
+                i, stats, two_handed = rows[lid]
+                group = self._groups.get(key)
+                if group is None:
+                    group = self._groups[key] = _Group({
+                        'name': store.item_names.values[store.item_name_codes[i]] or 'Unknown Item',
+                        'slot': store.slots.values[store.slot_codes[i]],
+                        'classes': store.classes.values[store.class_codes[i]].split(','),
+                        'stats': stats,
+                        'is_two_handed': two_handed,
+                    })
+                bisect.insort(group.values, value)
+                group.members.add(lid)
+                self._listings[lid] = current[lid]
+                touched.add(key)
+
+            for key in touched:
+                self._rerank_group(key, store, rows)
+
+        summary = {'added': len(added), 'removed': len(removed), 'changed': len(changed),
+                   'groups_touched': len(touched), 'deals': len(self._deals)}
+        logger.info(f"Deal index updated: {summary}")
+        return summary
+
+    def _rerank_group(self, key, store, rows):
+        """Recompute deal membership of one group (caller holds the lock)."""
+        for lid in self._group_deals.pop(key, ()):
+            self._drop_deal(lid)
+        group = self._groups[key]
+        if not group.members:
+            del self._groups[key]
+            return
+
+        baseline = group.baseline()
+        if baseline['count'] < self.min_group_size or not baseline['median']:
+            return
+
+        group_info = dict(group.info, **{k: (round(v, 2) if isinstance(v, float) else v)
+                                         for k, v in baseline.items()})
+        deals = self._group_deals[key] = set()
+        for lid in group.members:
+            value = self._listings[lid][1]
+            ratio = value / baseline['median']
+            if ratio > self.deal_ratio:
+                continue
+            self._deals[lid] = {
+                'ratio': round(ratio, 4),
+                'discount_percent': round((1 - ratio) * 100, 1),
+                'gold_per_power': round(value, 2),
+                'group': group_info,
+                'listing': store.row(rows[lid][0]),
+            }
+            deals.add(lid)
+            self._rank_keys[lid] = (ratio, lid)
+            bisect.insort(self._ranked, (ratio, lid))
+
+    def _drop_deal(self, lid):
+        self._deals.pop(lid, None)
+        entry = self._rank_keys.pop(lid, None)
+        if entry is not None:
+            del self._ranked[bisect.bisect_left(self._ranked, entry)]
+
+    def top(self, limit=20, slot=None, item_class=None, max_ratio=None):
+        """
+        Best deals first, optionally filtered.
+        Walks the pre-ranked list and stops after limit matches.
+        """
+        result = []
+        with self.lock:
+            for ratio, lid in self._ranked:
+                if max_ratio is not None and ratio > max_ratio:
+                    break
+                deal = self._deals[lid]
+                if slot and deal['group']['slot'] != slot:
+                    continue
+                if item_class and item_class not in deal['group']['classes']:
+                    continue
+                result.append(deal)
+                if len(result) >= limit:
+                    break
+        return result
+
+    def groups(self, slot=None, item_class=None):
+        """
+        Per-group price baselines (the server-side analysis output).
+        Copies summaries under the lock so callers can stream them freely.
+        """
+        with self.lock:
+            summaries = []
+            for key, group in self._groups.items():
+                if slot and group.info['slot'] != slot:
+                    continue
+                if item_class and item_class not in group.info['classes']:
+                    continue
+                baseline = {k: (round(v, 2) if isinstance(v, float) else v)
+                            for k, v in group.baseline().items()}
+                summaries.append(dict(group.info, key=key, deals=len(self._group_deals.get(key, ())),
+                                      **baseline))
+        return summaries
+
+    def stats(self):
+        with self.lock:
+            return {'groups': len(self._groups), 'listings': len(self._listings), 'deals': len(self._deals)}
@@ -0,0 +1,261 @@
+"""
+Bulk snapshot exports.
+After each listings refresh the listings snapshot and the item catalog are
+written once as gzip-compressed CSV and JSONL files. File names carry a
+content hash, so a download resumed with Range + If-Range never splices two
+generations together; the previous generation is kept for in-flight
+downloads and older ones are deleted.
+
+Usage:
+    python exports.py build [--cache-dir cache_data] [--out DIR]
+    python exports.py fetch URL [--dataset listings] [--format csv] [--out DIR]
+"""
+
+import argparse
+import csv
+import gzip
+import hashlib
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import requests
+
+from listing_store import ListingStore
+
+logger = logging.getLogger(__name__)
+
+DATASETS = ('listings', 'items')
+FORMATS = ('csv', 'jsonl')
+
+# CSV columns of the listings export (JSONL rows carry every upstream field)
+LISTING_COLUMNS = (
+    'id', 'base_item_id', 'item_name', 'classes', 'slot', 'username', 'power',
+    'platinum_cost', 'gold_cost', 'gem_cost', 'total_gold', 'extra',
+    'time_created', 'time_expires',
+)
+
+MANIFEST_FILE = 'manifest.json'
+
+# Generations kept on disk per dataset and format (current + previous)
+KEEP_GENERATIONS = 2
+
+
+def listing_rows(store):
+    """Listings snapshot rows with catalog name, classes and total gold price."""
+    for i in range(len(store)):
+        row = store.row(i)
+        row['item_name'] = store.item_names.values[store.item_name_codes[i]]
+        row['classes'] = store.classes.values[store.class_codes[i]]
+        row['total_gold'] = store.total_gold[i]
+        yield row
+
+
+def catalog_rows(items_data):
+    items = (items_data or {}).get('items', []) if isinstance(items_data, dict) else (items_data or [])
+    return [item for item in items if isinstance(item, dict)]
+
+
+def _catalog_columns(items):
+    """Union of catalog fields, in first-seen order."""
+    columns = {}
+    for item in items:
+        columns.update(dict.fromkeys(item))
+    return tuple(columns)
+
+
+def _cell(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(',', ':'))
+    return '' if value is None else value
+
+
+class _HashingWriter(io.RawIOBase):
+    """File wrapper hashing everything written through it."""
+
+    def __init__(self, f):
+        self.f = f
+        self.sha = hashlib.sha256()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.sha.update(data)
+        return self.f.write(data)
+
+
+def _write_gzip(out_dir, stem, fmt, rows, columns):
+    """
+    Write rows to <stem>.<hash>.<fmt>.gz atomically.
+
+    Returns:
+        (path, etag, row count)
+    """
+    fd, tmp = tempfile.mkstemp(dir=out_dir, prefix=f'.{stem}.', suffix='.tmp')
+    count = 0
+    try:
+        with os.fdopen(fd, 'wb') as raw:
+            hashed = _HashingWriter(raw)
+            # mtime=0 keeps the output (and its hash) deterministic
+            with gzip.GzipFile(fileobj=hashed, mode='wb', compresslevel=6, mtime=0) as gz:
+                text = io.TextIOWrapper(gz, encoding='utf-8', newline='')
+                if fmt == 'csv':
+                    writer = csv.writer(text)
+                    writer.writerow(columns)
+                    for row in rows:
+                        writer.writerow([_cell(row.get(column)) for column in columns])
+                        count += 1
+                else:
+                    for row in rows:
+                        text.write(json.dumps(row, separators=(',', ':')))
+                        text.write('\n')
+                        count += 1
+                text.flush()
+                text.detach()
+        etag = hashed.sha.hexdigest()[:16]
+        path = Path(out_dir) / f'{stem}.{etag}.{fmt}.gz'
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return path, etag, count
+
+
+def _prune(out_dir, stem, fmt, current):
+    """Delete all but the current and the newest previous generations of one export."""
+    files = sorted(Path(out_dir).glob(f'{stem}.*.{fmt}.gz'), key=lambda p: p.stat().st_mtime, reverse=True)
+    older = [path for path in files if path.name != current]
+    for path in older[KEEP_GENERATIONS - 1:]:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+def write_exports(out_dir, store, items_data):
+    """
+    Write every dataset in every format and publish a new manifest.
+
+    Args:
+        out_dir: Export directory (created if missing)
+        store: Current ListingStore
+        items_data: Item catalog payload
+
+    Returns:
+        Manifest dict: {'generated_at': ..., 'files': {'<dataset>.<fmt>': {...}}}
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
+    items = catalog_rows(items_data)
+    sources = {
+        'listings': (lambda: listing_rows(store), LISTING_COLUMNS),
+        'items': (lambda: iter(items), _catalog_columns(items)),
+    }
+
+    files = {}
+    for dataset, (rows, columns) in sources.items():
+        for fmt in FORMATS:
+            path, etag, count = _write_gzip(out_dir, dataset, fmt, rows(), columns)
+            files[f'{dataset}.{fmt}'] = {
+                'file': path.name,
+                'etag': etag,
+                'rows': count,
+                'size_bytes': path.stat().st_size,
+            }
+            _prune(out_dir, dataset, fmt, path.name)
+
+    manifest = {'generated_at': time.time(), 'files': files}
+    fd, tmp = tempfile.mkstemp(dir=out_dir, prefix='.manifest.', suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp, out_dir / MANIFEST_FILE)
+    logger.info(f"Wrote exports ({len(store)} listings, {len(items)} items) "
+                f"in {(time.perf_counter() - started) * 1000:.0f} ms")
+    return manifest
+
+
+def load_manifest(out_dir):
+    """Last published manifest (None if no export was written yet)."""
+    try:
+        with open(Path(out_dir) / MANIFEST_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _build(args):
+    cache_dir = Path(args.cache_dir)
+    with open(cache_dir / 'listings_all.json') as f:
+        listings = json.load(f).get('listings', [])
+    items_data = None
+    if (cache_dir / 'items.json').exists():
+        with open(cache_dir / 'items.json') as f:
+            items_data = json.load(f)
+    store = ListingStore.from_listings(listings, items_data)
+    manifest = write_exports(args.out or cache_dir / 'exports', store, items_data)
+    for name, entry in manifest['files'].items():
+        print(f"{name:15s} {entry['rows']:8d} rows {entry['size_bytes'] / 1e6:8.2f} MB  {entry['file']}")
+
+
+def _fetch(args):
+    """Download an export, skipping it if unchanged and resuming a partial download."""
+    name = f'{args.dataset}.{args.format}.gz'
+    out_dir = Path(args.out or '.')
+    target = out_dir / name
+    partial = out_dir / (name + '.part')
+    etag_file = out_dir / (name + '.etag')
+    url = f"{args.url.rstrip('/')}/api/export/{args.dataset}"
+    headers = {}
+
+    etag = etag_file.read_text().strip() if etag_file.exists() else None
+    if partial.exists() and etag:
+        # Resume only if the server still has the same generation
+        headers['Range'] = f'bytes={partial.stat().st_size}-'
+        headers['If-Range'] = f'"{etag}"'
+    elif target.exists() and etag:
+        headers['If-None-Match'] = f'"{etag}"'
+
+    with requests.get(url, params={'format': args.format}, headers=headers, stream=True, timeout=60) as r:
+        if r.status_code == 304:
+            print(f"{target} is up to date")
+            return
+        r.raise_for_status()
+        mode = 'ab' if r.status_code == 206 else 'wb'
+        with open(partial, mode) as f:
+            etag_file.write_text(r.headers.get('ETag', '').strip('"'))
+            for chunk in r.iter_content(64 * 1024):
+                f.write(chunk)
+    os.replace(partial, target)
+    print(f"Saved {target} ({target.stat().st_size / 1e6:.2f} MB)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Listings and catalog snapshot exports')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help='write exports from the persisted snapshot on disk')
+    build.add_argument('--cache-dir', default='cache_data')
+    build.add_argument('--out', help='export directory (default: <cache-dir>/exports)')
+    build.set_defaults(run=_build)
+
+    fetch = commands.add_parser('fetch', help='download an export from a running server')
+    fetch.add_argument('url', help='server base URL, e.g. http://localhost:5000')
+    fetch.add_argument('--dataset', choices=DATASETS, default='listings')
+    fetch.add_argument('--format', choices=FORMATS, default='csv')
+    fetch.add_argument('--out', help='download directory (default: current directory)')
+    fetch.set_defaults(run=_fetch)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args.run(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,40 @@
+"""
+Gunicorn settings: gunicorn -c gunicorn.conf.py
+
+The master preloads the app (create_app(start=False)): the persisted cache
+snapshot is parsed once and the forked workers share it copy-on-write
+instead of each loading its own copy. No thread runs in the master; every
+worker starts its background threads after the fork (post_worker_init).
+
+With several workers, REPLICATION_ROLE=auto is the recommended setting:
+the workers elect a leader in a shared directory (see replication.py), so
+only one of them refreshes from the portal API and writes the snapshot
+files and exports, and the others follow its published snapshots. Without
+it every worker refreshes on its own (role standalone).
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1').lower() in ('1', 'true', 'yes')
+wsgi_app = 'app:create_app(start=False)'
+
+
+def on_starting(server):
+    role = os.environ.get('REPLICATION_ROLE', 'standalone').lower()
+    server.log.info(f"Replication role: {role}")
+    if workers > 1 and role == 'standalone':
+        server.log.warning(f"{workers} workers with REPLICATION_ROLE=standalone: each worker refreshes "
+                           f"from the portal API; set REPLICATION_ROLE=auto to elect one")
+
+
+def post_worker_init(worker):
+    import app
+    app.start_background()
+
+
+def worker_exit(server, worker):
+    import app
+    app.stop_background()
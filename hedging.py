@@ -0,0 +1,253 @@
+"""
+Hedged upstream requests for idempotent portal reads.
+Most portal_api.php calls answer quickly but a few sit far in the tail.
+When a call to a hedgeable read route has not answered (response headers)
+within that route's observed p95, a duplicate is sent; the first good
+response wins and the other one is closed when it arrives (a blocking
+socket read cannot be interrupted, so the loser is abandoned and its
+connection dropped rather than read). Hedges draw a slot from the shared
+upstream budget without waiting (none free, no hedge) and are capped at
+a fraction of calls, so hedging cannot multiply upstream load.
+"""
+
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+logger = logging.getLogger(__name__)
+
+# Read-only portal routes a duplicate call is safe for
+DEFAULT_ROUTES = (
+    'get_game_items', 'get_listings', 'get_udata', 'get_inv', 'get_skills',
+    'get_top_players', 'get_shaders', 'get_backs', 'get_chests',
+    'my_listings', 'get_friend_list', 'get_player_chest',
+)
+
+# Latency samples kept per route, and the fewest before a route is hedged
+SAMPLE_WINDOW = 200
+MIN_SAMPLES = 20
+
+# Hedge delay bounds in seconds (the p95 is clamped into them)
+MIN_DELAY = 0.05
+MAX_DELAY = 10.0
+
+# Hedges allowed per hedgeable call (token bucket), and the burst allowance
+MAX_HEDGE_RATIO = 0.1
+MAX_HEDGE_BURST = 5
+
+
+def _env_flag(name, default):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+
+def _good(future):
+    """A finished attempt worth returning: a response below 500."""
+    return future.exception() is None and future.result().status_code < 500
+
+
+class RouteLatency:
+    """Recent time-to-response samples and hedge counters of one portal route (thread-safe)."""
+
+    def __init__(self, route, percentile):
+        self.route = route
+        self.percentile = percentile
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=SAMPLE_WINDOW)
+        self._threshold = None
+        self._stale = 0
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.suppressed_ratio = 0
+        self.suppressed_budget = 0
+        self.failures = 0
+
+    def count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def observe(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+            self._stale += 1
+
+    def threshold(self):
+        """The route's observed percentile in seconds, or None until MIN_SAMPLES calls."""
+        with self._lock:
+            if len(self._samples) < MIN_SAMPLES:
+                return None
+            # Re-sorting the window on every call would cost more than it saves
+            if self._threshold is None or self._stale >= 10:
+                ordered = sorted(self._samples)
+                index = min(len(ordered) - 1, math.ceil(self.percentile * len(ordered)) - 1)
+                self._threshold = ordered[index]
+                self._stale = 0
+            return self._threshold
+
+    def stats(self):
+        threshold = self.threshold()
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'hedged': self.hedged,
+                'hedge_wins': self.hedge_wins,
+                'suppressed_ratio': self.suppressed_ratio,
+                'suppressed_budget': self.suppressed_budget,
+                'failures': self.failures,
+                'samples': len(self._samples),
+                'threshold_ms': round(threshold * 1000, 1) if threshold is not None else None,
+            }
+
+
+class Hedger:
+    """Sends a duplicate of slow idempotent upstream calls; the first good response wins."""
+
+    def __init__(self, enabled=False, routes=DEFAULT_ROUTES, percentile=0.95,
+                 max_ratio=MAX_HEDGE_RATIO, max_workers=16):
+        self.enabled = enabled
+        self.routes = frozenset(routes)
+        self.percentile = percentile
+        self.max_ratio = max_ratio
+        self._lock = threading.Lock()
+        self._routes = {}
+        self._tokens = float(MAX_HEDGE_BURST)
+        # Threads start on first submit, so a preloading master never runs one
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='hedge')
+
+    @classmethod
+    def from_env(cls, max_workers=16):
+        """
+        Settings from HEDGE_ENABLED (off by default), HEDGE_ROUTES (comma
+        separated portal routes), HEDGE_PERCENTILE and HEDGE_MAX_RATIO.
+        """
+        routes = os.environ.get('HEDGE_ROUTES')
+        return cls(
+            enabled=_env_flag('HEDGE_ENABLED', False),
+            routes=[r.strip() for r in routes.split(',') if r.strip()] if routes else DEFAULT_ROUTES,
+            percentile=float(os.environ.get('HEDGE_PERCENTILE', 0.95)),
+            max_ratio=float(os.environ.get('HEDGE_MAX_RATIO', MAX_HEDGE_RATIO)),
+            max_workers=max_workers,
+        )
+
+    def applies(self, route):
+        return self.enabled and route in self.routes
+
+    def _route(self, route):
+        with self._lock:
+            latency = self._routes.get(route)
+            if latency is None:
+                latency = self._routes[route] = RouteLatency(route, self.percentile)
+            return latency
+
+    def _earn(self):
+        """Every hedgeable call earns max_ratio of a hedge."""
+        with self._lock:
+            self._tokens = min(MAX_HEDGE_BURST, self._tokens + self.max_ratio)
+
+    def _take_token(self):
+        """Spend a whole hedge, if earned."""
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def _attempt(self, latency, send):
+        started = time.perf_counter()
+        try:
+            response = send()
+        except Exception:
+            latency.count('failures')
+            raise
+        latency.observe(time.perf_counter() - started)
+        return response
+
+    def _discard(self, budget):
+        """Done callback of an attempt that lost: drop its connection and return its budget slot."""
+        def callback(future):
+            try:
+                if future.exception() is None:
+                    future.result().close()
+            finally:
+                budget.release()
+        return callback
+
+    def call(self, route, send, budget):
+        """
+        Run one upstream call, hedged if it outlives the route's p95.
+
+        Args:
+            route: Portal route name
+            send: Callable performing one attempt; returns a requests.Response
+                whose body has not been read (stream=True)
+            budget: The upstream budget semaphore. The caller holds one slot
+                for the call and releases it after reading the returned
+                response; a hedge takes (and this releases) one more.
+
+        Returns:
+            The winning response
+
+        Raises:
+            requests.RequestException: if every attempt failed
+        """
+        latency = self._route(route)
+        latency.count('calls')
+        self._earn()
+        delay = latency.threshold()
+        if delay is None:
+            return self._attempt(latency, send)
+
+        primary = self._executor.submit(self._attempt, latency, send)
+        done, _ = wait([primary], timeout=min(MAX_DELAY, max(MIN_DELAY, delay)))
+        if done:
+            return primary.result()
+
+        if not self._take_token():
+            latency.count('suppressed_ratio')
+            return primary.result()
+        if not budget.acquire(blocking=False):
+            latency.count('suppressed_budget')
+            return primary.result()
+
+        try:
+            hedge = self._executor.submit(self._attempt, latency, send)
+        except RuntimeError:
+            budget.release()
+            return primary.result()
+        latency.count('hedged')
+
+        pending = {primary, hedge}
+        winner = None
+        while pending and winner is None:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            # Prefer the primary when both finish together
+            winner = next((f for f in (primary, hedge) if f in done and _good(f)), None)
+        if winner is None:
+            # Nothing good: return the primary's outcome, drop the hedge
+            winner = primary
+        loser = hedge if winner is primary else primary
+        if winner is hedge:
+            latency.count('hedge_wins')
+        # The slots are interchangeable: the loser gives back the hedge's
+        loser.add_done_callback(self._discard(budget))
+        return winner.result()
+
+    def stats(self):
+        with self._lock:
+            routes = dict(self._routes)
+        per_route = {name: latency.stats() for name, latency in sorted(routes.items())}
+        return {
+            'enabled': self.enabled,
+            'percentile': self.percentile,
+            'max_ratio': self.max_ratio,
+            'hedged': sum(r['hedged'] for r in per_route.values()),
+            'hedge_wins': sum(r['hedge_wins'] for r in per_route.values()),
+            'routes': per_route,
+        }
@@ -0,0 +1,226 @@
+"""
+Server-side inventory join.
+Attaches equipped character, listed status and catalog data (name,
+classes, stats) to each inventory item with hash-map lookups, and applies
+the inventory tab's filters and sorts.
+"""
+
+import json
+import logging
+import math
+
+from deals import listing_group
+from listing_store import PLATINUM_TO_GOLD, build_catalog_index, item_classes
+
+logger = logging.getLogger(__name__)
+
+# Status values, as returned by Utils.getItemStatus
+STATUSES = ('available', 'listed', 'equipped', 'equipped-listed')
+
+
+def _to_int(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _to_float(value, default=None):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _total_gold(item):
+    return _to_int(item.get('platinum_cost')) * PLATINUM_TO_GOLD + _to_int(item.get('gold_cost'))
+
+
+def _item_range(extra):
+    """Numeric range from an item's extra JSON (None if absent), like Utils.getRange."""
+    try:
+        value = json.loads(extra or '{}').get('range')
+    except (ValueError, AttributeError):
+        return None
+    value = _to_float(value)
+    return None if value is None or math.isnan(value) else value
+
+
+# Sort keys accepted by filter_items (same options as the inventory tab)
+SORT_KEYS = {
+    'time_newest': (lambda item: (str(item.get('time_created') or ''), _to_int(item.get('id'))), True),
+    'time_oldest': (lambda item: (str(item.get('time_created') or ''), _to_int(item.get('id'))), False),
+    'power_high': (lambda item: _to_float(item.get('power'), 0.0), True),
+    'power_low': (lambda item: _to_float(item.get('power'), 0.0), False),
+    'price_low': (_total_gold, False),
+    'price_high': (_total_gold, True),
+    'name': (lambda item: item['item_name'].lower(), False),
+}
+
+
+def equipped_map(characters):
+    """
+    Map item id -> where it is equipped, as Utils.buildEquippedItemMap does.
+    The first character (in order) wearing an item wins.
+    """
+    equipped = {}
+    for character in characters or []:
+        if not isinstance(character, dict):
+            continue
+        for slot_key, value in character.items():
+            # back_equip is cosmetic, not equipment
+            if not slot_key.endswith('_equip') or slot_key == 'back_equip':
+                continue
+            item_id = str(value if value is not None else '')
+            if item_id in ('', '-1', '0') or item_id in equipped:
+                continue
+            equipped[item_id] = {
+                'class': character.get('class'),
+                'character_slot': character.get('slot'),
+                'slot_key': slot_key,
+                'slot_name': slot_key[:-len('_equip')],
+            }
+    return equipped
+
+
+def listed_ids(my_listings):
+    """Ids of inventory items that are listed, as Utils.buildListedItemMap does."""
+    ids = set()
+    for listing in my_listings or []:
+        if not isinstance(listing, dict):
+            continue
+        for field in ('player_item_id', 'item_id', 'inventory_item_id', 'playerItemId', 'id'):
+            if listing.get(field) is not None:
+                ids.add(str(listing[field]))
+                break
+    return ids
+
+
+def enrich_items(items, characters=None, my_listings=None, items_data=None):
+    """
+    Join inventory items with equipment, listings and the item catalog.
+
+    Args:
+        items: Inventory items (player_items of every get_inv page)
+        characters: Characters from get_udata
+        my_listings: The user's marketplace listings
+        items_data: Item catalog payload
+
+    Returns:
+        List of item dicts with item_name, classes, stats, is_two_handed,
+        range, status, is_equipped, is_listed and equipped_by attached
+    """
+    catalog = build_catalog_index(items_data)
+    equipped = equipped_map(characters)
+    listed = listed_ids(my_listings)
+
+    enriched = []
+    for item in items or []:
+        if not isinstance(item, dict):
+            continue
+        item_id = str(item.get('id', ''))
+        slot = item.get('slot')
+        catalog_item = catalog.get((str(item.get('base_item_id')), slot)) or {}
+        _, stats, two_handed = listing_group(item.get('base_item_id'), slot, item.get('extra'), catalog_item)
+
+        is_equipped = item_id in equipped
+        is_listed = item_id in listed
+        if is_equipped and is_listed:
+            status = 'equipped-listed'
+        elif is_listed:
+            status = 'listed'
+        elif is_equipped:
+            status = 'equipped'
+        else:
+            status = 'available'
+
+        enriched.append(dict(
+            item,
+            item_name=catalog_item.get('item_name') or 'Unknown Item',
+            classes=item_classes(catalog_item) if catalog_item else ['Unknown'],
+            stats=stats,
+            is_two_handed=two_handed,
+            range=_item_range(item.get('extra')),
+            status=status,
+            is_equipped=is_equipped,
+            is_listed=is_listed,
+            equipped_by=equipped.get(item_id),
+        ))
+    return enriched
+
+
+def normalize_inventory_filters(filters):
+    """
+    Typed inventory filters (same fields as FilterEngine.getInventoryFilters).
+
+    Raises:
+        ValueError: on a non-numeric bound or unknown status
+    """
+    filters = filters if isinstance(filters, dict) else {}
+    normalized = {}
+    for field in ('itemName', 'slot', 'itemClass', 'extraProp', 'twoHanded', 'status'):
+        value = str(filters.get(field) or '').strip()
+        if value:
+            normalized[field] = value
+    for field in ('minPower', 'maxPower', 'minRange', 'maxRange'):
+        value = filters.get(field)
+        if value in (None, ''):
+            continue
+        number = _to_float(value)
+        if number is None or math.isnan(number):
+            raise ValueError(f"Invalid value for {field}")
+        normalized[field] = number
+    if normalized.get('status') and normalized['status'] not in STATUSES[:3]:
+        raise ValueError("Invalid value for status")
+    return normalized
+
+
+def filter_items(items, filters=None, sort_by='time_newest'):
+    """Filter and sort enriched items the way Inventory.applyFilters does."""
+    filters = filters or {}
+    status = filters.get('status')
+    min_power = filters.get('minPower', float('-inf'))
+    max_power = filters.get('maxPower', float('inf'))
+
+    def keep(item):
+        if 'itemName' in filters and item['item_name'] != filters['itemName']:
+            return False
+        if 'slot' in filters and item.get('slot') != filters['slot']:
+            return False
+        if 'itemClass' in filters and filters['itemClass'] not in item['classes']:
+            return False
+        if 'extraProp' in filters and filters['extraProp'] not in item['stats']:
+            return False
+        if filters.get('twoHanded') == 'yes' and not item['is_two_handed']:
+            return False
+        if filters.get('twoHanded') == 'no' and item['is_two_handed']:
+            return False
+        power = _to_float(item.get('power'), 0.0) * 100
+        if power < min_power or power > max_power:
+            return False
+        # Items without a range never match an explicit range bound
+        if 'minRange' in filters and not (item['range'] and item['range'] >= filters['minRange']):
+            return False
+        if 'maxRange' in filters and not (item['range'] and item['range'] <= filters['maxRange']):
+            return False
+        if status == 'available' and item['status'] != 'available':
+            return False
+        if status == 'listed' and not item['is_listed']:
+            return False
+        if status == 'equipped' and not item['is_equipped']:
+            return False
+        return True
+
+    key, reverse = SORT_KEYS.get(sort_by, SORT_KEYS['time_newest'])
+    return sorted((item for item in items if keep(item)), key=key, reverse=reverse)
+
+
+def summarize(items, filtered):
+    """Counts shown in the inventory tab header."""
+    return {
+        'total_items': len(items),
+        'filtered_items': len(filtered),
+        'unique_items': len({(item['item_name'], item.get('slot'), tuple(item['stats'])) for item in filtered}),
+        'equipped_count': sum(1 for item in items if item['is_equipped']),
+        'listed_count': sum(1 for item in items if item['is_listed']),
+    }
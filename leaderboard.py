@@ -0,0 +1,122 @@
+"""
+Leaderboard derivations computed once per cache refresh.
+Joins each top player with their equipped items and precomputes the
+meta-statistics the leaderboard tab shows (classes, weapons, skins, backs).
+"""
+
+import logging
+from collections import Counter
+
+from listing_store import build_catalog_index
+
+logger = logging.getLogger(__name__)
+
+# Sort keys accepted by filter_players (same options as the leaderboard tab)
+SORT_KEYS = {
+    'rank': (lambda p: p.get('rank') or 0, False),
+    'level': (lambda p: _to_int(p.get('level')), True),
+    'experience': (lambda p: _to_int(p.get('experience')), True),
+    'playtime': (lambda p: _to_int(p.get('game_time')), True),
+}
+
+
+def _to_int(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _power(item):
+    """Power on the UI scale (power * 100); 0 when upstream sends none or garbage."""
+    try:
+        return float(item.get('power') or 0) * 100
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _equip_slots(player):
+    """Equipment slot fields of a player (back_equip is cosmetic, not equipment)."""
+    return [key for key in player if key.endswith('_equip') and key != 'back_equip']
+
+
+def equipment_ids(player):
+    """Equipped item id per equipment slot of a raw top_10 player."""
+    return {slot: str(player[slot]) for slot in _equip_slots(player) if player.get(slot)}
+
+
+def build_leaderboard(data, items_data=None):
+    """
+    Derive the joined leaderboard and its meta-statistics.
+
+    Args:
+        data: Raw get_top_players payload ({'top_10': [...], 'equipped_items': [...]})
+        items_data: Item catalog payload used to name equipped items
+
+    Returns:
+        Dict with 'players' (each with 'equipment' and 'avg_power') and 'meta'
+    """
+    catalog = build_catalog_index(items_data)
+    equipped = {
+        str(item.get('id')): item
+        for item in (data or {}).get('equipped_items') or [] if isinstance(item, dict)
+    }
+
+    players = []
+    class_counts = Counter()
+    weapon_counts = Counter()
+    skin_counts = Counter()
+    back_counts = Counter()
+
+    for position, player in enumerate((data or {}).get('top_10') or []):
+        if not isinstance(player, dict):
+            continue
+        equipment = {}
+        for slot_key in _equip_slots(player):
+            item = equipped.get(str(player.get(slot_key)))
+            if not item:
+                continue
+            catalog_item = catalog.get((str(item.get('base_item_id')), item.get('slot'))) or {}
+            equipment[slot_key] = dict(item, item_name=catalog_item.get('item_name') or 'Unknown')
+
+        powers = [_power(item) for item in equipment.values()]
+        players.append(dict(
+            player,
+            rank=player.get('rank') or position + 1,
+            equipment=equipment,
+            avg_power=round(sum(powers) / len(powers), 1) if powers else 0.0,
+        ))
+
+        if player.get('class'):
+            class_counts[str(player['class']).lower()] += 1
+        if player.get('character_skin'):
+            skin_counts[player['character_skin']] += 1
+        if player.get('back_item'):
+            back_counts[player['back_item']] += 1
+        if 'weapon_equip' in equipment:
+            weapon_counts[equipment['weapon_equip']['item_name']] += 1
+
+    logger.info(f"Built leaderboard: {len(players)} players, {len(equipped)} equipped items")
+    return {
+        'players': players,
+        'meta': {
+            'class_counts': dict(class_counts.most_common()),
+            'weapon_counts': dict(weapon_counts.most_common()),
+            'skin_counts': dict(skin_counts.most_common()),
+            'back_counts': dict(back_counts.most_common()),
+        },
+    }
+
+
+def filter_players(players, class_=None, username=None, min_level=None, max_level=None, sort_by='rank'):
+    """Filter and sort joined players the way Leaderboard.applyFilters does."""
+    username = (username or '').lower()
+    result = [
+        player for player in players
+        if (not class_ or str(player.get('class', '')).lower() == class_.lower())
+        and (not username or username in str(player.get('username', '')).lower())
+        and (min_level is None or _to_int(player.get('level')) >= min_level)
+        and (max_level is None or _to_int(player.get('level')) <= max_level)
+    ]
+    key, reverse = SORT_KEYS.get(sort_by, SORT_KEYS['rank'])
+    return sorted(result, key=key, reverse=reverse)
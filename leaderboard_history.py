@@ -0,0 +1,420 @@
+"""
+Leaderboard history: every changed top_players snapshot, kept compactly.
+Each snapshot is one JSON line in a monthly segment file (closed months
+are gzipped): the standings as [username, level, experience, class] in
+rank order, the equipment of players whose equipment changed (or who just
+entered), and the events against the previous snapshot (rank moves, new
+entrants, players dropping out, equipment swaps), computed once at record
+time. In memory, per-player series and a time-sorted event list answer
+history and time-window queries by bisection, so they stay fast as months
+of snapshots accumulate. Other processes sharing the directory pick up
+appended lines incrementally.
+"""
+
+import gzip
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from pathlib import Path
+
+from leaderboard import equipment_ids
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; appends are then unlocked
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_RE = re.compile(r'^(\d{4}-\d{2})\.jsonl(\.gz)?$')
+
+# Time window shorthands accepted by parse_window: 90m, 24h, 7d, 4w
+WINDOW_RE = re.compile(r'^(\d+)([mhdw])$')
+WINDOW_UNITS = {'m': 60, 'h': 3600, 'd': 86400, 'w': 7 * 86400}
+
+
+def parse_window(value):
+    """
+    Seconds in a window shorthand like '24h' or '7d'.
+
+    Raises:
+        ValueError: if value is not a window shorthand
+    """
+    match = WINDOW_RE.match((value or '').strip().lower())
+    if not match:
+        raise ValueError("Invalid window (use e.g. 24h, 7d, 4w)")
+    return int(match.group(1)) * WINDOW_UNITS[match.group(2)]
+
+
+def _to_int(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _month(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m')
+
+
+class _Series:
+    """One player's ranked appearances, as parallel typed arrays."""
+
+    __slots__ = ('times', 'ranks', 'levels', 'experience', 'event_times', 'events')
+
+    def __init__(self):
+        self.times = array('d')
+        self.ranks = array('H')
+        self.levels = array('l')
+        self.experience = array('q')
+        self.event_times = array('d')
+        self.events = []          # events of this player, parallel to event_times
+
+
+class LeaderboardHistory:
+    """Append-only leaderboard snapshot log with per-player indexes."""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.lock = threading.Lock()
+        self._read = {}              # month -> bytes of its uncompressed segment applied
+        self._closed = set()         # compressed months read to the end (never change again)
+        self._times = array('d')     # snapshot timestamps, ascending
+        self._standings = []         # usernames in rank order, per snapshot
+        self._event_times = array('d')
+        self._events = []
+        self._players = {}           # username -> _Series
+        self._equipment = {}         # username -> last known {slot: item id}
+        self._classes = {}           # username -> last known class
+        self._caught_up = False      # segments read at least once
+        self._movement = None        # movement() of the latest snapshot, None when stale
+        self.recorded = 0
+        self.skipped = 0
+
+    # Store
+
+    def _segments(self):
+        """(month, path) of every segment file, oldest first."""
+        if not self.directory.exists():
+            return []
+        found = {}
+        for path in self.directory.iterdir():
+            match = SEGMENT_RE.match(path.name)
+            if match:
+                # A month briefly has both files while it is being compressed
+                found.setdefault(match.group(1), path)
+                if not match.group(2):
+                    found[match.group(1)] = path
+        return sorted(found.items())
+
+    def _catch_up(self):
+        """Apply lines appended since the last call (by this or another process); caller holds the lock."""
+        for month, path in self._segments():
+            if month in self._closed:
+                continue
+            offset = self._read.get(month, 0)
+            try:
+                opener = gzip.open if path.suffix == '.gz' else open
+                with opener(path, 'rb') as f:
+                    if offset:
+                        f.seek(offset)
+                    data = f.read()
+            except OSError:
+                continue
+            # Only complete lines: a writer may be mid-append
+            end = data.rfind(b'\n') + 1
+            for line in data[:end].splitlines():
+                try:
+                    self._apply(json.loads(line))
+                except (ValueError, KeyError, TypeError) as e:
+                    logger.error(f"Skipping bad leaderboard history line in {path.name}: {e}")
+            self._read[month] = offset + end
+            if path.suffix == '.gz':
+                self._closed.add(month)
+        self._caught_up = True
+
+    def _compress_closed(self, current_month):
+        """Gzip segments of months before current_month."""
+        for month, path in self._segments():
+            if month >= current_month or path.suffix == '.gz':
+                continue
+            target = path.with_name(path.name + '.gz')
+            tmp = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+            try:
+                with open(path, 'rb') as src, gzip.open(tmp, 'wb') as dst:
+                    dst.write(src.read())
+                os.replace(tmp, target)
+                path.unlink()
+                logger.info(f"Compressed leaderboard history segment {month}")
+            except OSError as e:
+                logger.error(f"Error compressing leaderboard history {month}: {e}")
+                try:
+                    tmp.unlink()
+                except OSError:
+                    pass
+
+    # In-memory indexes
+
+    def _apply(self, record):
+        timestamp = float(record['t'])
+        names = []
+        for rank, (name, level, experience, class_) in enumerate(record['r'], 1):
+            name = sys.intern(name)
+            names.append(name)
+            self._classes[name] = class_
+            series = self._players.get(name)
+            if series is None:
+                series = self._players[name] = _Series()
+            series.times.append(timestamp)
+            series.ranks.append(rank)
+            series.levels.append(level)
+            series.experience.append(experience)
+        self._times.append(timestamp)
+        self._standings.append(tuple(names))
+        self._movement = None
+        for name, equipment in (record.get('e') or {}).items():
+            self._equipment[sys.intern(name)] = equipment
+        for event in record.get('ev') or []:
+            self._event_times.append(timestamp)
+            self._events.append(event)
+            series = self._players.get(event[1])
+            if series is not None:
+                series.event_times.append(timestamp)
+                series.events.append(event)
+
+    def _standing_rows(self, data):
+        rows = []
+        equipment = {}
+        for player in (data or {}).get('top_10') or []:
+            if not isinstance(player, dict) or not player.get('username'):
+                continue
+            name = str(player['username'])
+            rows.append([name, _to_int(player.get('level')), _to_int(player.get('experience')),
+                         str(player.get('class') or '').lower()])
+            equipment[name] = equipment_ids(player)
+        return rows, equipment
+
+    def _diff(self, rows, equipment):
+        """Events and changed equipment against the latest snapshot."""
+        previous = {name: rank for rank, name in enumerate(self._standings[-1], 1)} if self._standings else {}
+        events = []
+        changed_equipment = {}
+        for rank, (name, _, _, _) in enumerate(rows, 1):
+            if name not in previous:
+                # The first snapshot has nothing to move against
+                if previous:
+                    events.append(['new', name, rank])
+            elif previous[name] != rank:
+                events.append(['rank', name, previous[name], rank])
+            before = self._equipment.get(name)
+            after = equipment[name]
+            if before != after:
+                changed_equipment[name] = after
+                if before is not None:
+                    for slot in sorted(set(before) | set(after)):
+                        if before.get(slot) != after.get(slot):
+                            events.append(['equip', name, slot, before.get(slot), after.get(slot)])
+        current = {row[0] for row in rows}
+        for name, rank in previous.items():
+            if name not in current:
+                events.append(['out', name, rank])
+        return events, changed_equipment
+
+    def record(self, data, timestamp=None):
+        """
+        Store a top_players snapshot if the standings or equipment changed.
+
+        Args:
+            data: Raw get_top_players payload
+            timestamp: When it was fetched (default now)
+
+        Returns:
+            List of events against the previous snapshot, or None if nothing changed
+        """
+        rows, equipment = self._standing_rows(data)
+        if not rows:
+            return None
+        timestamp = timestamp or time.time()
+        month = _month(timestamp)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self.lock:
+            with open(self.directory / f'{month}.jsonl', 'ab') as f:
+                if fcntl is not None:
+                    # Serializes catch-up and append with other processes
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                self._catch_up()
+                if self._times and timestamp < self._times[-1]:
+                    timestamp = self._times[-1]
+                last = self._last_rows()
+                events, changed_equipment = self._diff(rows, equipment)
+                if rows == last and not changed_equipment:
+                    self.skipped += 1
+                    return None
+                record = {'t': round(timestamp, 3), 'r': rows, 'ev': events}
+                if changed_equipment:
+                    record['e'] = changed_equipment
+                line = json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n'
+                f.write(line)
+                f.flush()
+                self._apply(record)
+                self._read[month] = self._read.get(month, 0) + len(line)
+            self.recorded += 1
+            if len(self._segments()) > 1:
+                self._compress_closed(month)
+        if events:
+            logger.info(f"Leaderboard history: {len(events)} changes recorded")
+        return events
+
+    def _last_rows(self):
+        """Standings of the latest snapshot as stored rows (caller holds the lock)."""
+        if not self._standings:
+            return None
+        rows = []
+        for name in self._standings[-1]:
+            series = self._players[name]
+            rows.append([name, series.levels[-1], series.experience[-1], self._classes.get(name, '')])
+        return rows
+
+    # Queries
+
+    def _refresh(self):
+        with self.lock:
+            self._catch_up()
+
+    def movement(self):
+        """
+        Rank movement of the latest snapshot against the one before it,
+        computed once per snapshot. Snapshots appended by other processes
+        show up once this one catches up: every worker records each
+        leaderboard it applies, and the other queries catch up too.
+
+        Returns:
+            {username: {'rank', 'previous_rank' (None if new), 'change' (+ = up), 'new'}}
+        """
+        with self.lock:
+            if not self._caught_up:
+                self._catch_up()
+            if self._movement is None:
+                self._movement = self._compute_movement()
+            return self._movement
+
+    def _compute_movement(self):
+        """Caller holds the lock."""
+        if not self._standings:
+            return {}
+        # Against the last different standings: equipment-only snapshots don't move anyone
+        latest = self._standings[-1]
+        earlier = next((names for names in reversed(self._standings) if names != latest), None)
+        previous = {name: rank for rank, name in enumerate(earlier, 1)} if earlier else {}
+        result = {}
+        for rank, name in enumerate(latest, 1):
+            before = previous.get(name)
+            result[name] = {
+                'rank': rank,
+                'previous_rank': before,
+                'change': (before - rank) if before else 0,
+                'new': bool(previous) and before is None,
+            }
+        return result
+
+    def window(self, since=None, until=None, limit=100, events_limit=500):
+        """
+        Snapshots and events in a time window (newest last).
+
+        Args:
+            since, until: Unix timestamps bounding the window (None = open)
+            limit: Most recent snapshots to return
+            events_limit: Most recent events to return
+
+        Returns:
+            Dict with 'snapshots' ({'at', 'players'}), 'events' and window totals
+        """
+        self._refresh()
+        with self.lock:
+            lo = bisect_left(self._times, since) if since is not None else 0
+            hi = bisect_right(self._times, until) if until is not None else len(self._times)
+            start = max(lo, hi - limit)
+            snapshots = [{'at': self._times[i], 'players': list(self._standings[i])}
+                         for i in range(start, hi)]
+            elo = bisect_left(self._event_times, since) if since is not None else 0
+            ehi = bisect_right(self._event_times, until) if until is not None else len(self._event_times)
+            estart = max(elo, ehi - events_limit)
+            events = [self._event_dict(self._event_times[i], self._events[i]) for i in range(estart, ehi)]
+            return {
+                'total_snapshots': hi - lo,
+                'total_events': ehi - elo,
+                'snapshots': snapshots,
+                'events': events,
+            }
+
+    def player(self, username, since=None, until=None, limit=500):
+        """
+        Rank history of one player (case-insensitive username).
+
+        Returns:
+            Dict with the player's ranked points, events and a summary, or
+            None if the player never appeared on the leaderboard
+        """
+        self._refresh()
+        with self.lock:
+            name = username if username in self._players else next(
+                (n for n in self._players if n.lower() == username.lower()), None)
+            if name is None:
+                return None
+            series = self._players[name]
+            lo = bisect_left(series.times, since) if since is not None else 0
+            hi = bisect_right(series.times, until) if until is not None else len(series.times)
+            start = max(lo, hi - limit)
+            points = [{
+                'at': series.times[i],
+                'rank': series.ranks[i],
+                'level': series.levels[i],
+                'experience': series.experience[i],
+            } for i in range(start, hi)]
+            elo = bisect_left(series.event_times, since) if since is not None else 0
+            ehi = bisect_right(series.event_times, until) if until is not None else len(series.event_times)
+            current = self._standings[-1] if self._standings else ()
+            return {
+                'username': name,
+                'current_rank': current.index(name) + 1 if name in current else None,
+                'best_rank': min(series.ranks[lo:hi]) if hi > lo else None,
+                'first_seen': series.times[0],
+                'last_seen': series.times[-1],
+                'total_points': hi - lo,
+                'equipment': self._equipment.get(name, {}),
+                'points': points,
+                'events': [self._event_dict(series.event_times[i], series.events[i]) for i in range(elo, ehi)],
+            }
+
+    @staticmethod
+    def _event_dict(timestamp, event):
+        kind, name = event[0], event[1]
+        if kind == 'rank':
+            return {'at': timestamp, 'type': kind, 'username': name, 'from': event[2], 'to': event[3]}
+        if kind == 'new':
+            return {'at': timestamp, 'type': kind, 'username': name, 'to': event[2]}
+        if kind == 'out':
+            return {'at': timestamp, 'type': kind, 'username': name, 'from': event[2]}
+        return {'at': timestamp, 'type': kind, 'username': name, 'slot': event[2],
+                'from': event[3], 'to': event[4]}
+
+    def stats(self):
+        self._refresh()
+        with self.lock:
+            return {
+                'snapshots': len(self._times),
+                'players': len(self._players),
+                'events': len(self._events),
+                'segments': len(self._read),
+                'recorded': self.recorded,
+                'skipped': self.skipped,
+                'first_at': self._times[0] if self._times else None,
+                'last_at': self._times[-1] if self._times else None,
+            }
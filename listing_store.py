@@ -0,0 +1,407 @@
+"""
+Columnar (struct-of-arrays) store for marketplace listings.
+Numeric fields are parsed once into typed arrays and string fields are
+interned and dictionary-encoded, so filters and aggregates run as tight
+scans over arrays instead of re-parsing upstream strings per listing.
+"""
+
+import json
+import math
+import sys
+import logging
+from array import array
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+PLATINUM_TO_GOLD = 1000000
+
+# Listing fields that are held in dedicated columns
+_COLUMN_FIELDS = (
+    'id', 'base_item_id', 'slot', 'username', 'power', 'platinum_cost',
+    'gold_cost', 'gem_cost', 'extra', 'time_created', 'time_expires',
+)
+
+# Same field precedence as Utils.getItemClass in utils.js
+_CLASS_FIELDS = (
+    'class', 'item_class', 'Class', 'classes', 'wearable',
+    'wearable_by', 'usable_by', 'restricted_to',
+)
+
+
+def _to_int(value):
+    """Parse an integer the way parseInt(...) || 0 does on the client."""
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _to_float(value, default=math.nan):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _to_timestamp(value):
+    """Convert an upstream time value (epoch or datetime string) to epoch seconds."""
+    if value is None or value == '':
+        return math.nan
+    number = _to_float(value)
+    if not math.isnan(number):
+        return number
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return math.nan
+
+
+def _parse_range(extra):
+    """Extract the numeric range from a listing's extra JSON (NaN if absent)."""
+    if not extra:
+        return math.nan
+    try:
+        value = json.loads(extra).get('range')
+    except (ValueError, AttributeError):
+        return math.nan
+    return math.nan if value is None else _to_float(value)
+
+
+def item_classes(item):
+    """
+    Get the class list of a catalog item.
+    Mirrors Utils.getItemClass: the first populated class field wins.
+    """
+    for field in (item.get(name) for name in _CLASS_FIELDS):
+        if not field:
+            continue
+        if isinstance(field, list):
+            return [str(cls) for cls in field if cls] or ['Unknown']
+        if isinstance(field, str):
+            try:
+                parsed = json.loads(field)
+                if isinstance(parsed, list):
+                    return [str(cls) for cls in parsed if cls] or ['Unknown']
+                if parsed and isinstance(parsed, str):
+                    return [parsed]
+            except ValueError:
+                classes = [
+                    cls.strip() for cls in
+                    field.replace('[', '').replace(']', '').replace('"', '').replace("'", '').split(',')
+                    if cls.strip()
+                ]
+                if classes:
+                    return classes
+    return ['Unknown']
+
+
+def build_catalog_index(items_data):
+    """Index catalog items by (base_item_id, slot) for O(1) lookups."""
+    items = (items_data or {}).get('items', []) if isinstance(items_data, dict) else (items_data or [])
+    return {
+        (str(item.get('id')), item.get('slot')): item
+        for item in items if isinstance(item, dict)
+    }
+
+
+class StringDictionary:
+    """Interned string dictionary mapping values to dense integer codes."""
+
+    def __init__(self):
+        self.values = []
+        self._codes = {}
+
+    def encode(self, value):
+        value = '' if value is None else str(value)
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            value = sys.intern(value)
+            self.values.append(value)
+            self._codes[value] = code
+        return code
+
+    def code_of(self, value):
+        """Get the code of a value, or None if it never occurs."""
+        return self._codes.get(value)
+
+    def codes_where(self, predicate):
+        """Get the set of codes whose value satisfies predicate."""
+        return {code for code, value in enumerate(self.values) if predicate(value)}
+
+    def __len__(self):
+        return len(self.values)
+
+
+class ListingStore:
+    """
+    Immutable struct-of-arrays snapshot of marketplace listings.
+
+    Build with ListingStore.from_listings(); query with filter(), which
+    returns a selection vector (array of row indices), then aggregate()
+    or rows() on that selection.
+    """
+
+    def __init__(self):
+        self.size = 0
+        self.ids = array('q')
+        self.base_item_ids = array('q')
+        self.power = array('d')           # Raw upstream power (0-1 scale)
+        self.platinum_cost = array('q')
+        self.gold_cost = array('q')
+        self.gem_cost = array('q')
+        self.total_gold = array('q')      # platinum * PLATINUM_TO_GOLD + gold
+        self.range = array('d')           # NaN when the listing has no range
+        self.expires_at = array('d')      # Epoch seconds, NaN when unknown
+
+        self.slots = StringDictionary()
+        self.classes = StringDictionary()   # Comma-joined class list per catalog item
+        self.usernames = StringDictionary()
+        self.item_names = StringDictionary()
+        self.slot_codes = array('I')
+        self.class_codes = array('I')
+        self.username_codes = array('I')
+        self.item_name_codes = array('I')
+
+        # Opaque strings passed through untouched (interned, shared across rows)
+        self.extra = []
+        self.time_created = []
+        self.time_expires = []
+        # Upstream fields without a column, kept sparsely by row index
+        self.residual = {}
+
+    @classmethod
+    def from_listings(cls, listings, items_data=None):
+        """
+        Build a store from upstream listing dicts.
+
+        Args:
+            listings: List of listing dicts as returned by get_listings
+            items_data: Item catalog payload used to resolve names and classes
+        """
+        store = cls()
+        catalog = build_catalog_index(items_data)
+
+        for listing in listings or []:
+            if not isinstance(listing, dict):
+                continue
+            store._append(listing, catalog)
+
+        logger.info(f"Built columnar listing store: {store.size} rows, "
+                    f"{len(store.usernames)} sellers, {len(store.classes)} class groups")
+        return store
+
+    def _append(self, listing, catalog):
+        slot = listing.get('slot')
+        catalog_item = catalog.get((str(listing.get('base_item_id')), slot)) or {}
+        platinum = _to_int(listing.get('platinum_cost'))
+        gold = _to_int(listing.get('gold_cost'))
+        extra = listing.get('extra') or ''
+
+        self.ids.append(_to_int(listing.get('id')))
+        self.base_item_ids.append(_to_int(listing.get('base_item_id')))
+        self.power.append(_to_float(listing.get('power'), 0.0))
+        self.platinum_cost.append(platinum)
+        self.gold_cost.append(gold)
+        self.gem_cost.append(_to_int(listing.get('gem_cost')))
+        self.total_gold.append(platinum * PLATINUM_TO_GOLD + gold)
+        self.range.append(_parse_range(extra))
+        self.expires_at.append(_to_timestamp(listing.get('time_expires')))
+
+        self.slot_codes.append(self.slots.encode(slot))
+        self.class_codes.append(self.classes.encode(','.join(item_classes(catalog_item))))
+        self.username_codes.append(self.usernames.encode(listing.get('username')))
+        self.item_name_codes.append(self.item_names.encode(catalog_item.get('item_name') or ''))
+
+        self.extra.append(sys.intern(extra))
+        self.time_created.append(sys.intern(str(listing.get('time_created') or '')))
+        self.time_expires.append(sys.intern(str(listing.get('time_expires') or '')))
+
+        residual = {k: v for k, v in listing.items() if k not in _COLUMN_FIELDS}
+        if residual:
+            self.residual[self.size] = residual
+        self.size += 1
+
+    def __len__(self):
+        return self.size
+
+    def nbytes(self):
+        """Approximate memory held by the store (columns plus distinct strings)."""
+        total = 0
+        for column in (self.ids, self.base_item_ids, self.power, self.platinum_cost, self.gold_cost,
+                       self.gem_cost, self.total_gold, self.range, self.expires_at, self.slot_codes,
+                       self.class_codes, self.username_codes, self.item_name_codes):
+            total += column.buffer_info()[1] * column.itemsize
+        for dictionary in (self.slots, self.classes, self.usernames, self.item_names):
+            total += sum(sys.getsizeof(value) for value in dictionary.values)
+        for strings in (self.extra, self.time_created, self.time_expires):
+            # Strings are interned, so each distinct object is counted once
+            total += sys.getsizeof(strings)
+            total += sum(sys.getsizeof(value) for value in {id(v): v for v in strings}.values())
+        return total
+
+    @staticmethod
+    def _matching_codes(dictionary, kind, needle, search_index):
+        """Codes of dictionary values containing needle (case-insensitive)."""
+        if search_index is not None:
+            matches = search_index.search(kind, needle)
+            return {code for code in map(dictionary.code_of, matches) if code is not None}
+        needle = needle.lower()
+        return dictionary.codes_where(lambda value: needle in value.lower())
+
+    def filter(self, slot=None, item_class=None, username=None, item_name=None,
+               min_power=None, max_power=None, min_range=None, max_range=None,
+               max_platinum=None, max_gold=None, max_gems=None, selection=None,
+               search_index=None):
+        """
+        Scan the columns and return the indices of matching rows.
+
+        Power bounds use the UI scale (power * 100), as in FilterEngine.
+        username and item_name are case-insensitive substring matches,
+        resolved through search_index when one is given.
+        Each predicate narrows the selection vector from the previous one,
+        cheapest (dictionary-code) predicates first.
+
+        Returns:
+            array('I') of row indices in snapshot order
+        """
+        rows = range(self.size) if selection is None else selection
+
+        if slot:
+            code = self.slots.code_of(slot)
+            if code is None:
+                return array('I')
+            codes = self.slot_codes
+            rows = [i for i in rows if codes[i] == code]
+
+        if item_class:
+            wanted = self.classes.codes_where(lambda value: item_class in value.split(','))
+            codes = self.class_codes
+            rows = [i for i in rows if codes[i] in wanted]
+
+        if username:
+            wanted = self._matching_codes(self.usernames, 'seller', username, search_index)
+            codes = self.username_codes
+            rows = [i for i in rows if codes[i] in wanted]
+
+        if item_name:
+            wanted = self._matching_codes(self.item_names, 'item', item_name, search_index)
+            codes = self.item_name_codes
+            rows = [i for i in rows if codes[i] in wanted]
+
+        if min_power is not None or max_power is not None:
+            low = -math.inf if min_power is None else min_power / 100.0
+            high = math.inf if max_power is None else max_power / 100.0
+            power = self.power
+            rows = [i for i in rows if low <= power[i] <= high]
+
+        # Listings without a range never match an explicit range bound
+        if min_range is not None:
+            ranges = self.range
+            rows = [i for i in rows if ranges[i] >= min_range]
+        if max_range is not None:
+            ranges = self.range
+            rows = [i for i in rows if ranges[i] <= max_range]
+
+        if max_platinum is not None:
+            platinum = self.platinum_cost
+            rows = [i for i in rows if platinum[i] <= max_platinum]
+        if max_gold is not None:
+            total_gold = self.total_gold
+            rows = [i for i in rows if total_gold[i] <= max_gold]
+        if max_gems is not None:
+            gems = self.gem_cost
+            rows = [i for i in rows if gems[i] <= max_gems]
+
+        return array('I', rows)
+
+    def aggregate(self, selection=None):
+        """
+        Aggregate power and price over a selection in a single pass.
+
+        Returns:
+            Dict with count, min/max/avg power (UI scale) and min/max/avg total gold
+        """
+        rows = range(self.size) if selection is None else selection
+        power = [self.power[i] for i in rows]
+        gold = [self.total_gold[i] for i in rows]
+        if not power:
+            return {'count': 0}
+        return {
+            'count': len(power),
+            'min_power': round(min(power) * 100, 2),
+            'max_power': round(max(power) * 100, 2),
+            'avg_power': round(sum(power) * 100 / len(power), 2),
+            'min_total_gold': min(gold),
+            'max_total_gold': max(gold),
+            'avg_total_gold': round(sum(gold) / len(gold), 2),
+        }
+
+    def sort(self, selection, sort_by):
+        """Order a selection using the same sort keys as FilterEngine.sortItems."""
+        keys = {
+            'power_high': (lambda i: self.power[i], True),
+            'power_low': (lambda i: self.power[i], False),
+            'price_low': (lambda i: self.total_gold[i], False),
+            'price_high': (lambda i: self.total_gold[i], True),
+            'time_newest': (lambda i: (self.time_created[i], self.ids[i]), True),
+            'time_oldest': (lambda i: (self.time_created[i], self.ids[i]), False),
+            'name': (lambda i: self.item_names.values[self.item_name_codes[i]], False),
+        }
+        if sort_by not in keys:
+            return selection
+        key, reverse = keys[sort_by]
+        return array('I', sorted(selection, key=key, reverse=reverse))
+
+    def fingerprint(self, i):
+        """Values whose change makes a listing count as changed between snapshots."""
+        return (self.power[i], self.platinum_cost[i], self.gold_cost[i], self.gem_cost[i])
+
+    def diff(self, previous):
+        """
+        Compare against the fingerprints of a previous snapshot.
+
+        Args:
+            previous: Dict of listing id -> fingerprint (from an earlier diff)
+
+        Returns:
+            (changed_rows, removed_ids, fingerprints) where changed_rows are
+            row indices of new or repriced listings and fingerprints is the
+            mapping to pass as previous next time
+        """
+        fingerprints = {}
+        changed_rows = []
+        for i in range(self.size):
+            listing_id = self.ids[i]
+            fingerprint = self.fingerprint(i)
+            fingerprints[listing_id] = fingerprint
+            if previous.get(listing_id) != fingerprint:
+                changed_rows.append(i)
+        removed_ids = [listing_id for listing_id in previous if listing_id not in fingerprints]
+        return changed_rows, removed_ids, fingerprints
+
+    def row(self, i):
+        """Materialize one row back into the upstream listing shape."""
+        listing = {
+            'id': self.ids[i],
+            'base_item_id': self.base_item_ids[i],
+            'slot': self.slots.values[self.slot_codes[i]],
+            'username': self.usernames.values[self.username_codes[i]],
+            'power': repr(self.power[i]),
+            'platinum_cost': str(self.platinum_cost[i]),
+            'gold_cost': str(self.gold_cost[i]),
+            'gem_cost': str(self.gem_cost[i]),
+            'extra': self.extra[i],
+            'time_created': self.time_created[i],
+            'time_expires': self.time_expires[i],
+        }
+        residual = self.residual.get(i)
+        if residual:
+            listing.update(residual)
+        return listing
+
+    def rows(self, selection=None):
+        """Materialize a selection into listing dicts."""
+        indices = range(self.size) if selection is None else selection
+        return [self.row(i) for i in indices]
@@ -0,0 +1,326 @@
+"""
+Overview tab summaries computed server-side.
+The market summary is derived once per listings snapshot; the account
+summary (quick stats, active character, equipment by character, inventory
+status and recent listings) is assembled per request from the user's data
+with the same rules Overview.render applied in the browser, so the tab
+renders from one small response instead of the full inventory, listings
+and character payloads.
+"""
+
+import json
+import logging
+import math
+from array import array
+
+from inventory import enrich_items, equipped_map
+from listing_store import PLATINUM_TO_GOLD, build_catalog_index
+
+logger = logging.getLogger(__name__)
+
+# Most recent listings shown, and inventory slots listed by item count
+RECENT_LISTINGS = 3
+SUMMARY_SLOTS = 8
+
+# Power type of fixed-stat slots, as Utils.getPowerType (others read extra)
+SLOT_POWER_TYPES = {
+    'weapon': 'Damage',
+    'head': 'HP',
+    'hands': 'Attack Speed',
+    'body': 'HP',
+    'feet': 'Movement Speed',
+}
+EXTRA_POWER_FALLBACK = {'neck': 'Placeholder', 'ring': 'Stat', 'off_hand': 'Stat'}
+
+
+def _to_int(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _power(item):
+    """Power on the UI scale (power * 100)."""
+    try:
+        return float(item.get('power')) * 100
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _is_set(value):
+    """An equipment slot value that holds something (not empty or -1)."""
+    return bool(value) and str(value) != '-1'
+
+
+def power_type(item):
+    """Stat an item's power applies to, as Utils.getPowerType."""
+    slot = item.get('slot')
+    if slot in SLOT_POWER_TYPES:
+        return SLOT_POWER_TYPES[slot]
+    if slot in EXTRA_POWER_FALLBACK:
+        try:
+            attr = json.loads(item.get('extra') or '{}').get('extra')
+        except (ValueError, AttributeError):
+            attr = None
+        return attr or EXTRA_POWER_FALLBACK[slot]
+    return 'Power'
+
+
+def active_slot(user):
+    """Active character slot as a string, as Utils.getActiveSlot on normalized user data."""
+    user = user if isinstance(user, dict) else {}
+    raw = next((user[key] for key in ('active_slot', 'activeSlot', 'active_character_slot', 'active_character')
+                if user.get(key) is not None), '0')
+    try:
+        number = float(raw)
+    except (TypeError, ValueError):
+        return str(raw)
+    if not math.isfinite(number) or not str(raw).strip():
+        return str(raw)
+    return str(int(number)) if number.is_integer() else repr(number)
+
+
+def find_active(user, characters):
+    """The active character: the one in the active slot, else the first."""
+    characters = [c for c in characters or [] if isinstance(c, dict)]
+    slot = active_slot(user) if user else None
+    return next((c for c in characters if str(c.get('slot')) == slot), characters[0] if characters else None)
+
+
+def _cosmetics(user):
+    """(owned shaders, owned back items), as Utils.normalizeUserData reads them."""
+    cosmetics = (user or {}).get('cosmetics')
+    if isinstance(cosmetics, str):
+        try:
+            cosmetics = json.loads(cosmetics)
+        except ValueError:
+            cosmetics = None
+    cosmetics = cosmetics if isinstance(cosmetics, dict) else {}
+    shaders = cosmetics.get('shaders')
+    backs = cosmetics.get('back_items')
+    if not isinstance(backs, list):
+        backs = cosmetics.get('backs')
+    return (shaders if isinstance(shaders, list) else []), (backs if isinstance(backs, list) else [])
+
+
+def _stat_totals(items):
+    """Total power and item count per power type, sorted by type."""
+    totals = {}
+    for item in items:
+        entry = totals.setdefault(power_type(item), {'total': 0.0, 'count': 0})
+        entry['total'] += _power(item)
+        entry['count'] += 1
+    return {name: {'total': round(entry['total'], 1), 'count': entry['count']}
+            for name, entry in sorted(totals.items())}
+
+
+def _equip_keys(character):
+    # back_equip holds a cosmetic id, not an inventory item
+    return [key for key in character if key.endswith('_equip') and key != 'back_equip']
+
+
+def _equipped_item(item, catalog):
+    catalog_item = catalog.get((str(item.get('base_item_id')), item.get('slot'))) or {}
+    return {
+        'id': item.get('id'),
+        'base_item_id': item.get('base_item_id'),
+        'slot': item.get('slot'),
+        'item_name': catalog_item.get('item_name') or 'Unknown',
+        'power': round(_power(item), 1),
+        'power_type': power_type(item),
+    }
+
+
+def _skill_names(character, skills):
+    names = []
+    for key in ('skill1', 'skill2', 'skill3', 'skill4', 'skill5'):
+        skill_id = character.get(key)
+        if not _is_set(skill_id):
+            continue
+        skill = next((s for s in skills if isinstance(s, dict) and str(s.get('id')) == str(skill_id)), None)
+        if skill:
+            names.append(skill.get('name') or skill.get('skill_name') or skill.get('display_name')
+                         or f'Skill {skill_id}')
+    return names
+
+
+def _active_character(character, by_id, player_items, catalog, skills):
+    equipment = []
+    items = []
+    for key in _equip_keys(character):
+        value = character[key]
+        item = by_id.get(str(value)) if _is_set(value) else None
+        if item is not None:
+            items.append(item)
+        elif _is_set(value) and str(value) != '0':
+            # Not in the inventory pages: the udata player_items may still have it
+            item = player_items.get(str(value))
+        equipment.append({'slot_key': key, 'item': _equipped_item(item, catalog) if item else None})
+    return {
+        'slot': character.get('slot'),
+        'class': character.get('class'),
+        'level': _to_int(character.get('level')),
+        'experience': _to_int(character.get('experience')),
+        'game_time': _to_int(character.get('game_time')),
+        'target_type': character.get('target_type') or None,
+        'character_skin': character.get('character_skin') or None,
+        'equipment': equipment,
+        'skills': _skill_names(character, skills),
+        'stat_totals': _stat_totals(items),
+    }
+
+
+def _equipment_breakdown(characters, by_id, active):
+    breakdown = []
+    for character in characters:
+        keys = _equip_keys(character)
+        filled = [character[key] for key in keys if _is_set(character[key])]
+        items = [by_id[str(value)] for value in filled if str(value) in by_id]
+        breakdown.append({
+            'slot': character.get('slot'),
+            'class': character.get('class'),
+            'level': _to_int(character.get('level')),
+            'is_active': active is not None and str(character.get('slot')) == active,
+            'equipped_count': len(filled),
+            'total_slots': len(keys),
+            'total_power': round(sum(_power(item) for item in items), 1),
+            'stat_powers': _stat_totals(items),
+        })
+    # Active first, then by level
+    breakdown.sort(key=lambda entry: (not entry['is_active'], -entry['level']))
+    return breakdown
+
+
+def _recent_listings(my_listings, catalog):
+    def created(listing):
+        return str(listing.get('time_created') or listing.get('created_at') or listing.get('createdAt') or '')
+
+    recent = []
+    for listing in sorted(my_listings, key=created, reverse=True)[:RECENT_LISTINGS]:
+        catalog_item = catalog.get((str(listing.get('base_item_id')), listing.get('slot'))) or {}
+        recent.append({
+            'id': listing.get('id'),
+            'base_item_id': listing.get('base_item_id'),
+            'item_name': catalog_item.get('item_name') or f"Item {listing.get('base_item_id')}",
+            'slot': catalog_item.get('slot') or listing.get('slot') or 'unknown',
+            'power': round(_power(listing)),
+            'power_type': power_type(listing),
+            'platinum_cost': _to_int(listing.get('platinum_cost')),
+            'gold_cost': _to_int(listing.get('gold_cost')),
+            'total_gold': _to_int(listing.get('platinum_cost')) * PLATINUM_TO_GOLD + _to_int(listing.get('gold_cost')),
+            'time_expires': listing.get('time_expires') or listing.get('expiry') or listing.get('expires_at'),
+        })
+    return {'total': len(my_listings), 'listings': recent}
+
+
+def _inventory_summary(enriched):
+    statuses = {'available': 0, 'equipped': 0, 'listed': 0, 'equipped-listed': 0}
+    slots = {}
+    for item in enriched:
+        statuses[item['status']] += 1
+        slots[item.get('slot')] = slots.get(item.get('slot'), 0) + 1
+    return {
+        'total': len(enriched),
+        'statuses': statuses,
+        'slots': sorted(slots.items(), key=lambda entry: -entry[1])[:SUMMARY_SLOTS],
+    }
+
+
+def build_overview(user, characters, inventory, my_listings, friends, items_data=None, skills=None,
+                   seller_rows=None):
+    """
+    Account summary of the overview tab.
+
+    Args:
+        user: The 'user' object of get_udata
+        characters: Characters from get_udata
+        inventory: Inventory items (player_items of every get_inv page)
+        my_listings: The user's marketplace listings
+        friends: The user's friend list
+        items_data: Item catalog payload used to name items
+        skills: Skill definitions of the active character's class
+        seller_rows: The user's rows in the marketplace snapshot, shown as
+            recent listings when my_listings is empty
+
+    Returns:
+        Dict with 'quick_stats', 'active_character' (None without
+        characters), 'equipment_breakdown', 'inventory_summary' and
+        'recent_listings'
+    """
+    characters = [c for c in characters or [] if isinstance(c, dict)]
+    inventory = [item for item in inventory or [] if isinstance(item, dict)]
+    my_listings = [listing for listing in my_listings or [] if isinstance(listing, dict)]
+    catalog = build_catalog_index(items_data)
+    by_id = {str(item.get('id')): item for item in inventory}
+    player_items = {str(item.get('id')): item for item in (user or {}).get('player_items') or []
+                    if isinstance(item, dict)}
+
+    slot = active_slot(user) if user else None
+    active = find_active(user, characters)
+
+    shaders, backs = _cosmetics(user)
+    quick_stats = {
+        'characters': len(characters),
+        'inventory_items': len(inventory),
+        'equipped_items': len(equipped_map(characters)),
+        'listings': len(my_listings),
+        'cosmetics': len(shaders) + len(backs) if user else 0,
+        'shaders_in_use': len({c['character_skin'] for c in characters if c.get('character_skin')}),
+        'backs_in_use': len({c['back_equip'] for c in characters if c.get('back_equip') and c['back_equip'] != '-1'}),
+        'friends': len(friends or []),
+    }
+
+    return {
+        'quick_stats': quick_stats,
+        'active_character': _active_character(active, by_id, player_items, catalog, skills or []) if active else None,
+        'equipment_breakdown': _equipment_breakdown(characters, by_id, slot),
+        'inventory_summary': _inventory_summary(enrich_items(inventory, characters, my_listings, items_data)),
+        'recent_listings': _recent_listings(my_listings or list(seller_rows or []), catalog),
+    }
+
+
+def build_market_summary(store):
+    """
+    Market-wide figures of a listings snapshot, in one pass over its columns.
+
+    Returns:
+        Dict with total listings, sellers and per-slot count, lowest total
+        gold price (None if the slot only has gem listings) and average
+        power (UI scale), shown next to the user's recent listings
+    """
+    slots = len(store.slots)
+    counts = array('q', [0]) * slots
+    power = array('d', [0.0]) * slots
+    floor = [None] * slots
+    for i in range(store.size):
+        code = store.slot_codes[i]
+        counts[code] += 1
+        power[code] += store.power[i]
+        price = store.total_gold[i]
+        # Gem-only listings have no gold price to undercut
+        if price > 0 and (floor[code] is None or price < floor[code]):
+            floor[code] = price
+    return {
+        'total_listings': store.size,
+        'sellers': len(store.usernames),
+        'slots': {
+            store.slots.values[code]: {
+                'count': counts[code],
+                'min_total_gold': floor[code],
+                'avg_power': round(power[code] * 100 / counts[code], 2),
+            }
+            for code in range(slots) if counts[code]
+        },
+    }
+
+
+def seller_listings(store, username):
+    """Listings of one seller (case-insensitive) in a snapshot."""
+    username = (username or '').lower()
+    if not username:
+        return []
+    codes = store.usernames.codes_where(lambda value: value.lower() == username)
+    if not codes:
+        return []
+    return store.rows([i for i in range(store.size) if store.username_codes[i] in codes])
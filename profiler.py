@@ -0,0 +1,175 @@
+"""
+Opt-in per-request profiler.
+When PROFILING_ENABLED is set, requests carrying the admin key in the
+X-Profile header (always kept) or picked by PROFILING_SAMPLE_RATE (kept
+only when slower than PROFILING_SLOW_MS) run under cProfile. Kept
+profiles are written as pstats dumps to a rotating directory that admins
+can list and download.
+"""
+
+import cProfile
+import hmac
+import io
+import logging
+import os
+import pstats
+import random
+import re
+import threading
+import time
+from pathlib import Path
+
+from flask import g, request
+
+logger = logging.getLogger(__name__)
+
+# Profile file names: <epoch ms>-<METHOD>-<path slug>-<duration>ms.prof
+PROFILE_NAME_RE = re.compile(r'^\d+-[A-Z]+-[\w.-]*-\d+ms\.prof$')
+
+# URL prefix of the profile listing/download routes, which are never profiled
+PROFILES_PATH = '/api/admin/profiles'
+
+
+def _env_flag(name):
+    return os.environ.get(name, '').lower() in ('1', 'true', 'yes', 'on')
+
+
+class RequestProfiler:
+    """Decides which requests to profile and keeps the resulting profiles."""
+
+    def __init__(self, enabled=False, admin_key=None, sample_rate=0.0, slow_ms=1000,
+                 profile_dir='profiles', max_files=50):
+        self.enabled = enabled
+        self.admin_key = admin_key
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.profile_dir = Path(profile_dir).resolve()
+        self.max_files = max_files
+        # Only one request is profiled at a time: cProfile is costly, and on
+        # newer Pythons only one profiler may be active per process
+        self._busy = threading.Lock()
+        self.kept = 0
+        self.discarded = 0
+        if enabled:
+            self.profile_dir.mkdir(exist_ok=True)
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            enabled=_env_flag('PROFILING_ENABLED'),
+            admin_key=os.environ.get('PROFILING_ADMIN_KEY') or None,
+            sample_rate=float(os.environ.get('PROFILING_SAMPLE_RATE', 0)),
+            slow_ms=float(os.environ.get('PROFILING_SLOW_MS', 1000)),
+            profile_dir=os.environ.get('PROFILING_DIR', 'profiles'),
+            max_files=int(os.environ.get('PROFILING_MAX_FILES', 50)),
+        )
+
+    def is_admin(self, req):
+        """True if the request carries the admin key in X-Profile."""
+        supplied = req.headers.get('X-Profile', '')
+        return bool(self.admin_key and supplied and hmac.compare_digest(supplied, self.admin_key))
+
+    def init_app(self, app):
+        if not self.enabled:
+            return
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.teardown_request(self._abandon)
+        logger.info(f"Request profiling enabled (sample rate {self.sample_rate}, "
+                    f"slow threshold {self.slow_ms} ms, dir {self.profile_dir})")
+
+    def _start(self):
+        # Browsing profiles shouldn't rotate the ones being looked at
+        if request.path.startswith(PROFILES_PATH):
+            return
+        forced = self.is_admin(request)
+        if not forced and (self.sample_rate <= 0 or random.random() >= self.sample_rate):
+            return
+        if not self._busy.acquire(blocking=False):
+            return
+        g.profile = (cProfile.Profile(), time.perf_counter(), forced)
+        g.profile[0].enable()
+
+    def _finish(self, response):
+        state = g.pop('profile', None)
+        if state is None:
+            return response
+        profile, started, forced = state
+        try:
+            profile.disable()
+            duration_ms = (time.perf_counter() - started) * 1000
+            if forced or duration_ms >= self.slow_ms:
+                name = self._save(profile, duration_ms)
+                if forced:
+                    response.headers['X-Profile-Id'] = name
+            else:
+                self.discarded += 1
+        except Exception as e:
+            logger.error(f"Error saving profile: {e}")
+        finally:
+            self._busy.release()
+        return response
+
+    def _abandon(self, exc=None):
+        """Release the profiler if the request ended without _finish running."""
+        state = g.pop('profile', None)
+        if state is not None:
+            state[0].disable()
+            self._busy.release()
+
+    def _save(self, profile, duration_ms):
+        slug = re.sub(r'[^\w.-]+', '_', request.path.strip('/'))[:60]
+        name = f"{int(time.time() * 1000)}-{request.method}-{slug}-{int(duration_ms)}ms.prof"
+        profile.dump_stats(str(self.profile_dir / name))
+        self.kept += 1
+        self._rotate()
+        logger.info(f"Kept profile {name}")
+        return name
+
+    def _rotate(self):
+        """Delete the oldest profiles beyond max_files."""
+        files = sorted(self.profile_dir.glob('*.prof'))
+        for path in files[:max(0, len(files) - self.max_files)]:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def list_profiles(self):
+        """Kept profiles, newest first."""
+        profiles = []
+        for path in sorted(self.profile_dir.glob('*.prof'), reverse=True):
+            stat = path.stat()
+            profiles.append({'name': path.name, 'size_bytes': stat.st_size, 'created_at': stat.st_mtime})
+        return profiles
+
+    def profile_path(self, name):
+        """
+        Path of a kept profile.
+
+        Raises:
+            ValueError: if name is not a profile file name
+            FileNotFoundError: if the profile no longer exists
+        """
+        if not PROFILE_NAME_RE.match(name or ''):
+            raise ValueError("Invalid profile name")
+        path = self.profile_dir / name
+        if not path.exists():
+            raise FileNotFoundError(name)
+        return path
+
+    def summary(self, name, limit=40):
+        """Text report of a kept profile, sorted by cumulative time."""
+        out = io.StringIO()
+        stats = pstats.Stats(str(self.profile_path(name)), stream=out)
+        stats.sort_stats('cumulative').print_stats(limit)
+        return out.getvalue()
+
+    def stats(self):
+        return {
+            'enabled': self.enabled,
+            'sample_rate': self.sample_rate,
+            'slow_ms': self.slow_ms,
+            'kept': self.kept,
+            'discarded': self.discarded,
+        }
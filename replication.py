@@ -0,0 +1,293 @@
+"""
+Snapshot replication between app nodes.
+One node (designated with REPLICATION_ROLE=leader, or elected through a
+lock file in a shared directory with REPLICATION_ROLE=auto) refreshes
+from the portal API and publishes each changed snapshot as a numbered
+generation: content-addressed object files plus a manifest mapping cache
+keys to ETags. Followers never call upstream; they poll the manifest,
+from the shared directory or over HTTP from the leader, and fetch only
+the objects whose ETag differs from what they hold.
+"""
+
+import hmac
+import json
+import logging
+import os
+import re
+import shutil
+import socket
+import tempfile
+import time
+from pathlib import Path
+
+import requests
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; election needs it
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+ROLES = ('standalone', 'leader', 'follower', 'auto')
+
+MANIFEST_FILE = 'manifest.json'
+OBJECTS_DIR = 'objects'
+LOCK_FILE = 'leader.lock'
+
+# Object file names: <safe key>.<etag>.json
+OBJECT_NAME_RE = re.compile(r'^[\w.-]+\.[0-9a-f]+\.json$')
+
+
+def _object_name(key, etag):
+    return f"{key.replace('/', '_').replace(':', '_')}.{etag}.json"
+
+
+class Replication:
+    """Replication role of this node and the publish/pull transport."""
+
+    def __init__(self, role='standalone', directory=None, leader_url=None,
+                 poll_interval=15, key=None, node_id=None):
+        if role not in ROLES:
+            raise ValueError(f"Unknown replication role: {role}")
+        if role == 'auto' and fcntl is None:
+            raise ValueError("Leader election needs fcntl (POSIX)")
+        self.role = role
+        self.directory = Path(directory).resolve() if directory else None
+        self.leader_url = leader_url.rstrip('/') if leader_url else None
+        self.poll_interval = poll_interval
+        self.key = key
+        self._node_id = node_id
+        self.leading = role == 'leader'
+        self._lock_file = None
+        self.generation = None          # Last published (leader) or applied (follower)
+        self.published = 0
+        self.pulls = 0
+        self.objects_fetched = 0
+        self.last_pull_at = None
+        self.last_error = None
+        self.promoted_at = None
+        if self.directory and role in ('leader', 'auto'):
+            (self.directory / OBJECTS_DIR).mkdir(parents=True, exist_ok=True)
+        if role in ('leader', 'auto') and not key:
+            logger.info("Replication: no REPLICATION_KEY set, HTTP snapshot routes disabled")
+        if leader_url and not key:
+            logger.warning("Replication: REPLICATION_LEADER_URL needs REPLICATION_KEY (the leader refuses keyless pulls)")
+
+    @classmethod
+    def from_env(cls, default_dir='cache_data/replication'):
+        return cls(
+            role=os.environ.get('REPLICATION_ROLE', 'standalone').lower(),
+            directory=os.environ.get('REPLICATION_DIR') or default_dir,
+            leader_url=os.environ.get('REPLICATION_LEADER_URL') or None,
+            poll_interval=float(os.environ.get('REPLICATION_POLL_SECONDS', 15)),
+            key=os.environ.get('REPLICATION_KEY') or None,
+        )
+
+    @property
+    def node_id(self):
+        """
+        This process's id in manifests and the leader lock. Derived when
+        read, so workers forked from a preloading master get their own pid.
+        """
+        return self._node_id or f"{socket.gethostname()}:{os.getpid()}"
+
+    @property
+    def enabled(self):
+        return self.role != 'standalone'
+
+    @property
+    def publishes_locally(self):
+        """
+        Whether this node's replication directory holds the published
+        snapshots: with role leader or auto, every worker on the leader host
+        shares it, whichever of them holds the leader lock.
+        """
+        return self.role in ('leader', 'auto') and self.directory is not None
+
+    def is_leader(self):
+        """
+        Whether this node refreshes from upstream. In auto mode a follower
+        takes over as soon as it can lock the leader file, i.e. when the
+        previous leader's process is gone.
+        """
+        if self.role == 'auto' and not self.leading:
+            self.leading = self._try_lock()
+            if self.leading:
+                self.promoted_at = time.time()
+                logger.info(f"Replication: {self.node_id} elected leader")
+        return self.role == 'standalone' or self.leading
+
+    def _try_lock(self):
+        f = open(self.directory / LOCK_FILE, 'a+')
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        f.seek(0)
+        f.truncate()
+        f.write(self.node_id)
+        f.flush()
+        # Held (and the lock with it) for the life of the process
+        self._lock_file = f
+        return True
+
+    def authorized(self, req):
+        """
+        True if the request may read published snapshots over HTTP: it must
+        carry X-Replication-Key, and the routes stay closed while no
+        REPLICATION_KEY is configured (the objects are whole snapshots).
+        """
+        if not self.key:
+            return False
+        supplied = req.headers.get('X-Replication-Key', '')
+        return bool(supplied and hmac.compare_digest(supplied, self.key))
+
+    # Leader side
+
+    def load_manifest(self):
+        """Last manifest in the local directory (None if nothing was published)."""
+        try:
+            with open(self.directory / MANIFEST_FILE) as f:
+                return json.load(f)
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def publish(self, entries):
+        """
+        Publish a new generation if any key's ETag changed.
+
+        Args:
+            entries: {key: (etag, source, timestamp)}; source is a file path
+                or a binary file opened on it, copied only when its object
+                doesn't exist yet
+
+        Returns:
+            New manifest, or None if nothing changed
+        """
+        if not entries:
+            return None
+        previous = self.load_manifest() or {'generation': 0, 'keys': {}}
+        if previous.get('keys') and all(
+                previous['keys'].get(key, {}).get('etag') == etag for key, (etag, _, _) in entries.items()):
+            self.generation = previous['generation']
+            return None
+
+        objects = self.directory / OBJECTS_DIR
+        keys = {}
+        for key, (etag, source, timestamp) in entries.items():
+            name = _object_name(key, etag)
+            if not (objects / name).exists():
+                fd, tmp = tempfile.mkstemp(dir=objects, prefix='.', suffix='.tmp')
+                if hasattr(source, 'read'):
+                    with os.fdopen(fd, 'wb') as dst:
+                        shutil.copyfileobj(source, dst)
+                else:
+                    os.close(fd)
+                    shutil.copyfile(source, tmp)
+                os.replace(tmp, objects / name)
+            keys[key] = {'etag': etag, 'object': name, 'timestamp': timestamp}
+
+        manifest = {
+            'generation': previous['generation'] + 1,
+            'published_at': time.time(),
+            'leader': self.node_id,
+            'previous_objects': sorted(entry['object'] for entry in previous.get('keys', {}).values()),
+            'keys': keys,
+        }
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix='.manifest.', suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp, self.directory / MANIFEST_FILE)
+        self._prune(manifest)
+        self.generation = manifest['generation']
+        self.published += 1
+        logger.info(f"Replication: published generation {manifest['generation']} "
+                    f"({sum(1 for key in keys if previous['keys'].get(key, {}).get('etag') != keys[key]['etag'])} "
+                    f"changed keys)")
+        return manifest
+
+    def _prune(self, manifest):
+        """Delete objects of older generations; the previous one stays for followers mid-pull."""
+        keep = {entry['object'] for entry in manifest['keys'].values()}
+        keep.update(manifest.get('previous_objects', ()))
+        for path in (self.directory / OBJECTS_DIR).glob('*.json'):
+            if path.name not in keep:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def object_path(self, name):
+        """
+        Path of a published object.
+
+        Raises:
+            ValueError: if name is not an object file name
+            FileNotFoundError: if the object was pruned
+        """
+        if not OBJECT_NAME_RE.match(name or ''):
+            raise ValueError("Invalid object name")
+        path = self.directory / OBJECTS_DIR / name
+        if not path.exists():
+            raise FileNotFoundError(name)
+        return path
+
+    # Follower side
+
+    def _headers(self):
+        return {'X-Replication-Key': self.key} if self.key else {}
+
+    def fetch_manifest(self):
+        """
+        Newest manifest if it's a generation this node hasn't applied yet,
+        else None. Over HTTP the last applied generation is sent as
+        If-None-Match, so an unchanged leader answers 304 without a body.
+        """
+        self.pulls += 1
+        self.last_pull_at = time.time()
+        if self.leader_url:
+            headers = self._headers()
+            if self.generation is not None:
+                headers['If-None-Match'] = f'"gen-{self.generation}"'
+            r = requests.get(f"{self.leader_url}/api/replication/manifest", headers=headers, timeout=15)
+            if r.status_code == 304:
+                return None
+            r.raise_for_status()
+            manifest = r.json()
+        else:
+            manifest = self.load_manifest()
+        if not manifest or manifest.get('generation') == self.generation:
+            return None
+        return manifest
+
+    def fetch_object(self, entry):
+        """Decoded data of one manifest entry."""
+        self.objects_fetched += 1
+        if self.leader_url:
+            r = requests.get(f"{self.leader_url}/api/replication/objects/{entry['object']}",
+                             headers=self._headers(), timeout=60)
+            r.raise_for_status()
+            return r.json()
+        with open(self.object_path(entry['object'])) as f:
+            return json.load(f)
+
+    def applied(self, manifest):
+        self.generation = manifest['generation']
+        self.last_error = None
+
+    def stats(self):
+        return {
+            'role': self.role,
+            'node_id': self.node_id,
+            'leading': self.role == 'standalone' or self.leading,
+            'source': self.leader_url or (str(self.directory) if self.directory else None),
+            'generation': self.generation,
+            'published': self.published,
+            'pulls': self.pulls,
+            'objects_fetched': self.objects_fetched,
+            'last_pull_at': self.last_pull_at,
+            'last_error': self.last_error,
+            'promoted_at': self.promoted_at,
+        }
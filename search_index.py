@@ -0,0 +1,141 @@
+"""
+N-gram search index over seller usernames, item names and player names.
+Rebuilt with each listings snapshot; backs autocomplete and substring
+filtering without scanning every listing.
+"""
+
+import bisect
+import heapq
+import logging
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+# Grams of length 1..GRAM_SIZE are indexed, so queries of any length
+# resolve through postings lookups (short queries hit their gram directly)
+GRAM_SIZE = 3
+
+# Term kinds held by the index
+KINDS = ('seller', 'item', 'player')
+
+
+def _grams(text):
+    """All distinct substrings of length 1..GRAM_SIZE of text."""
+    grams = set()
+    for n in range(1, GRAM_SIZE + 1):
+        for i in range(len(text) - n + 1):
+            grams.add(text[i:i + n])
+    return grams
+
+
+class SearchIndex:
+    """
+    Immutable n-gram index of distinct terms per kind.
+    Postings map a gram to the ids of the terms containing it.
+    """
+
+    def __init__(self):
+        self.terms = {kind: [] for kind in KINDS}
+        self._folded = {kind: [] for kind in KINDS}
+        self._postings = {kind: defaultdict(set) for kind in KINDS}
+        self._seen = {kind: set() for kind in KINDS}
+        self._sorted = {}
+
+    def add(self, kind, term):
+        """Add a term (ignored if empty or already present)."""
+        if not term or term in self._seen[kind]:
+            return
+        self._seen[kind].add(term)
+        term_id = len(self.terms[kind])
+        folded = term.lower()
+        self.terms[kind].append(term)
+        self._folded[kind].append(folded)
+        self._sorted.pop(kind, None)
+        postings = self._postings[kind]
+        for gram in _grams(folded):
+            postings[gram].add(term_id)
+
+    def _candidates(self, kind, needle):
+        postings = self._postings[kind]
+        if len(needle) <= GRAM_SIZE:
+            return postings.get(needle, set())
+        sets = []
+        for i in range(len(needle) - GRAM_SIZE + 1):
+            posting = postings.get(needle[i:i + GRAM_SIZE])
+            if not posting:
+                return set()
+            sets.append(posting)
+        sets.sort(key=len)
+        return set.intersection(*sets)
+
+    def search(self, kind, query):
+        """
+        Get every term of a kind containing query (case-insensitive).
+
+        Returns:
+            Set of matching terms
+        """
+        needle = (query or '').strip().lower()
+        if not needle or kind not in self.terms:
+            return set()
+        folded = self._folded[kind]
+        terms = self.terms[kind]
+        # Grams can match out of order for long needles, so verify candidates
+        return {terms[i] for i in self._candidates(kind, needle) if needle in folded[i]}
+
+    def _prefix_matches(self, kind, needle, limit):
+        """Up to limit terms starting with needle, in alphabetical order."""
+        if kind not in self._sorted:
+            self._sorted[kind] = sorted(zip(self._folded[kind], self.terms[kind]))
+        entries = self._sorted[kind]
+        start = bisect.bisect_left(entries, (needle, ''))
+        return [term for folded, term in entries[start:start + limit] if folded.startswith(needle)]
+
+    def suggest(self, query, kinds=KINDS, limit=10):
+        """
+        Autocomplete suggestions for query.
+        Prefix matches (alphabetical, found by binary search) rank ahead of
+        inner matches (shortest first).
+
+        Returns:
+            List of {'type': kind, 'value': term} dicts
+        """
+        needle = (query or '').strip().lower()
+        if not needle:
+            return []
+        ranked = []
+        for kind in kinds:
+            prefixed = self._prefix_matches(kind, needle, limit)
+            ranked.extend((False, 0, term.lower(), kind, term) for term in prefixed)
+            if len(prefixed) < limit:
+                inner = (term for term in self.search(kind, needle) if not term.lower().startswith(needle))
+                ranked.extend((True, len(term), term.lower(), kind, term)
+                              for term in heapq.nsmallest(limit, inner, key=lambda t: (len(t), t.lower())))
+        ranked.sort()
+        return [{'type': kind, 'value': term} for *_, kind, term in ranked[:limit]]
+
+    def stats(self):
+        return {kind: len(self.terms[kind]) for kind in KINDS}
+
+
+def build_search_index(listing_store=None, items_data=None, players=None):
+    """
+    Build a search index for one snapshot.
+
+    Args:
+        listing_store: ListingStore whose seller dictionary is indexed
+        items_data: Item catalog payload ({'items': [...]})
+        players: Iterable of leaderboard player names
+    """
+    index = SearchIndex()
+    if listing_store is not None:
+        for username in listing_store.usernames.values:
+            index.add('seller', username)
+    items = (items_data or {}).get('items', []) if isinstance(items_data, dict) else (items_data or [])
+    for item in items:
+        if isinstance(item, dict):
+            index.add('item', item.get('item_name'))
+    for name in players or []:
+        index.add('player', name)
+    logger.info(f"Built search index: {index.stats()}")
+    return index
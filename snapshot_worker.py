@@ -0,0 +1,145 @@
+"""
+Process-pool offload for listings snapshot derivations.
+Building the columnar store (parsing, class extraction, dictionary
+encoding), the search index and the export files is CPU-bound. Run in the
+refresh thread it holds the GIL against request threads, so each refresh
+shows up as a latency spike. A worker process does that work from the
+persisted listings file and hands back one pickled blob (typed arrays and
+interned strings, so it is compact and cheap to load); the refresh thread
+only unpickles it and publishes the result under the cache lock.
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from exports import write_exports
+from listing_store import ListingStore
+from search_index import build_search_index
+
+logger = logging.getLogger(__name__)
+
+# Opt-in: a worker only pays off with a spare core (on one CPU it timeslices
+# with request threads and measured worse), so the default derives inline
+DEFAULT_WORKERS = 0
+
+
+def derive_snapshot(listings, items_data, players, export_dir=None):
+    """
+    Build the derived structures of one listings snapshot.
+
+    Args:
+        listings: Listing dicts, or the path of a JSON file with {'listings': [...]}
+        items_data: Item catalog payload
+        players: Leaderboard player names for the search index
+        export_dir: Directory to write the export files to (None = skip)
+
+    Returns:
+        (ListingStore, SearchIndex, export manifest or None)
+    """
+    if isinstance(listings, (str, os.PathLike)):
+        with open(listings) as f:
+            listings = json.load(f).get('listings') or []
+    store = ListingStore.from_listings(listings, items_data)
+    index = build_search_index(store, items_data, players)
+    manifest = None
+    if export_dir is not None:
+        try:
+            manifest = write_exports(export_dir, store, items_data)
+        except Exception as e:
+            logger.error(f"Error writing exports: {e}")
+    return store, index, manifest
+
+
+def _init_worker(nice):
+    """Lower the worker's CPU priority, so request threads win on a busy host."""
+    if nice and hasattr(os, 'nice'):
+        os.nice(nice)
+
+
+def _derive_pickled(*args):
+    """Worker entry point: derive_snapshot() as a single pickled blob."""
+    return pickle.dumps(derive_snapshot(*args), protocol=pickle.HIGHEST_PROTOCOL)
+
+
+class SnapshotDeriver:
+    """Runs derive_snapshot in a worker process, or inline when disabled or broken."""
+
+    def __init__(self, workers=DEFAULT_WORKERS, nice=10):
+        self.workers = workers
+        self.nice = nice
+        self._pool = None
+        self.runs = 0
+        self.offloaded = 0
+        self.failures = 0
+        self.last_seconds = None
+        self.last_transfer_bytes = None
+
+    @classmethod
+    def from_env(cls):
+        """
+        SNAPSHOT_WORKERS worker processes (default 0: derive in the refresh
+        thread), at SNAPSHOT_WORKER_NICE niceness.
+        """
+        return cls(workers=int(os.environ.get('SNAPSHOT_WORKERS', DEFAULT_WORKERS)),
+                   nice=int(os.environ.get('SNAPSHOT_WORKER_NICE', 10)))
+
+    def _executor(self):
+        if self._pool is None:
+            # spawn: forking a process that runs request threads can copy held locks
+            self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                             mp_context=multiprocessing.get_context('spawn'),
+                                             initializer=_init_worker, initargs=(self.nice,))
+        return self._pool
+
+    def derive(self, listings_path, listings, items_data, players, export_dir=None):
+        """
+        Derive a snapshot, preferring the worker process.
+
+        Args:
+            listings_path: Persisted listings file the worker reads
+            listings: The same listings in memory, for inline derivation
+            items_data, players, export_dir: As for derive_snapshot
+
+        Returns:
+            (ListingStore, SearchIndex, export manifest or None)
+        """
+        started = time.perf_counter()
+        self.runs += 1
+        result = None
+        if self.workers > 0 and listings_path is not None:
+            try:
+                blob = self._executor().submit(
+                    _derive_pickled, str(listings_path), items_data, list(players or []), export_dir
+                ).result()
+                self.last_transfer_bytes = len(blob)
+                result = pickle.loads(blob)
+                self.offloaded += 1
+            except Exception as e:
+                # Broken pool (worker killed, unpicklable data): derive inline, retry the pool next time
+                self.failures += 1
+                logger.error(f"Snapshot worker failed, deriving in-process: {e}")
+                self.shutdown()
+        if result is None:
+            result = derive_snapshot(listings, items_data, players, export_dir)
+        self.last_seconds = round(time.perf_counter() - started, 3)
+        return result
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self):
+        return {
+            'workers': self.workers,
+            'runs': self.runs,
+            'offloaded': self.offloaded,
+            'failures': self.failures,
+            'last_seconds': self.last_seconds,
+            'last_transfer_bytes': self.last_transfer_bytes,
+        }
@@ -115,107 +115,111 @@ const Analysis = {
     },
     
     renderAnalysis(items) {
-        const container = document.getElementById('analysisContainer');
+        // Always a card grid, whatever the global grid/list view
+        UIListRenderer.render('analysisContainer', items, {
+            emptyIcon: '📊',
+            emptyText: 'No items match your filters',
+            emptyClassName: 'items-grid',
+            card: (item) => this.renderAnalysisCard(item),
+            row: (item) => this.renderAnalysisCard(item),
+            listClassName: 'items-grid',
+            key: (item) => `${item.base_item_id}_${item.slot}_${item.statsDisplay}_${item.isTwoHanded}`
+        });
+    },
+    
+    renderAnalysisCard(item) {
+        const statTypes = item.statsDisplay;
+        const avgPower = (item.powerValues.reduce((a,b) => a+b, 0) / item.powerValues.length).toFixed(1);
+        const minPowerForPrice = (parseFloat(item.minPriceListing.power) * 100).toFixed(1);
+        const maxPowerForPrice = (parseFloat(item.maxPriceListing.power) * 100).toFixed(1);
         
-        if (!items || items.length === 0) {
-            container.innerHTML = UIComponents.renderEmptyState('📊', 'No items match your filters');
-            return;
-        }
+        // Calculate tier based on max power for this item
+        const powerRange = item.maxPower - item.minPower;
+        const powerPercentile = powerRange > 0 ? ((item.maxPower - item.minPower) / powerRange * 100) : 100;
+        const tier = Utils.getTierFromPercentile(powerPercentile >= 90 ? 100 : item.maxPower, item.count);
         
-        container.innerHTML = items.map((item, idx) => {
-            const statTypes = item.statsDisplay;
-            const avgPower = (item.powerValues.reduce((a,b) => a+b, 0) / item.powerValues.length).toFixed(1);
-            const minPowerForPrice = (parseFloat(item.minPriceListing.power) * 100).toFixed(1);
-            const maxPowerForPrice = (parseFloat(item.maxPriceListing.power) * 100).toFixed(1);
-            
-            // Calculate tier based on max power for this item
-            const powerRange = item.maxPower - item.minPower;
-            const powerPercentile = powerRange > 0 ? ((item.maxPower - item.minPower) / powerRange * 100) : 100;
-            const tier = Utils.getTierFromPercentile(powerPercentile >= 90 ? 100 : item.maxPower, item.count);
-            
-            // Escape all values properly for onclick handler (JavaScript context)
-            const escapedName = Utils.escapeJs(item.name);
-            const escapedSlot = Utils.escapeJs(item.slot);
-            const escapedClass = Utils.escapeJs(item.class);
-            const escapedStats = item.stats.map(s => Utils.escapeJs(s)).join(',');
-            
-            return `
-                <div class="analysis-card-new clickable" style="animation-delay: ${idx * 0.05}s" onclick="navigateToMarketplace('${escapedName}', '${escapedSlot}', '${escapedClass}', '${escapedStats}')">
-                    <div class="analysis-card-header">
-                        <div class="analysis-card-title-row">
-                            <h3 class="analysis-card-name">${Utils.escapeHtml(item.name)}</h3>
-                            <div class="analysis-tier-badge" style="background: ${tier.color};">
-                                ${Utils.escapeHtml(tier.tier)}
-                            </div>
+        // Escape all values properly for onclick handler (JavaScript context)
+        const escapedName = Utils.escapeJs(item.name);
+        const escapedSlot = Utils.escapeJs(item.slot);
+        const escapedClass = Utils.escapeJs(item.class);
+        const escapedStats = item.stats.map(s => Utils.escapeJs(s)).join(',');
+        
+        return `
+            <div class="analysis-card-new clickable" onclick="navigateToMarketplace('${escapedName}', '${escapedSlot}', '${escapedClass}', '${escapedStats}')">
+                <div class="analysis-card-header">
+                    <div class="analysis-card-title-row">
+                        <h3 class="analysis-card-name">${Utils.escapeHtml(item.name)}</h3>
+                        <div class="analysis-tier-badge" style="background: ${tier.color};">
+                            ${Utils.escapeHtml(tier.tier)}
+                        </div>
+                    </div>
+                    <div class="analysis-card-badges">
+                        <span class="slot-badge-new ${Utils.escapeHtml(item.slot)}">
+                            ${CONFIG.slotIcons[item.slot] || ''} ${Utils.escapeHtml(Utils.formatSlot(item.slot))}
+                        </span>
+                        ${item.isTwoHanded ? '<span class="two-handed-badge">✋ Two Handed</span>' : ''}
+                        <span class="listings-badge">${item.count} listing${item.count !== 1 ? 's' : ''}</span>
+                    </div>
+                </div>
+                
+                <div class="analysis-card-body">
+                    <div class="analysis-info-grid">
+                        <div class="analysis-info-item">
+                            <span class="info-label">Stats</span>
+                            <span class="info-value ${Utils.getStatClass(statTypes)}">${Utils.escapeHtml(statTypes)}</span>
                         </div>
-                        <div class="analysis-card-badges">
-                            <span class="slot-badge-new ${Utils.escapeHtml(item.slot)}">
-                                ${CONFIG.slotIcons[item.slot] || ''} ${Utils.escapeHtml(Utils.formatSlot(item.slot))}
-                            </span>
-                            ${item.isTwoHanded ? '<span class="two-handed-badge">✋ Two Handed</span>' : ''}
-                            <span class="listings-badge">${item.count} listing${item.count !== 1 ? 's' : ''}</span>
+                        <div class="analysis-info-item">
+                            <span class="info-label">Class</span>
+                            <span class="info-value">${Utils.escapeHtml(item.class)}</span>
                         </div>
                     </div>
                     
-                    <div class="analysis-card-body">
-                        <div class="analysis-info-grid">
-                            <div class="analysis-info-item">
-                                <span class="info-label">Stats</span>
-                                <span class="info-value ${Utils.getStatClass(statTypes)}">${Utils.escapeHtml(statTypes)}</span>
-                            </div>
-                            <div class="analysis-info-item">
-                                <span class="info-label">Class</span>
-                                <span class="info-value">${Utils.escapeHtml(item.class)}</span>
+                    <div class="analysis-stats-grid">
+                        <div class="stat-card">
+                            <div class="stat-card-label">Power Range</div>
+                            <div class="stat-card-values">
+                                <div class="stat-row">
+                                    <span class="stat-key">Min</span>
+                                    <span class="stat-val">${item.minPower.toFixed(1)}%</span>
+                                </div>
+                                <div class="stat-row">
+                                    <span class="stat-key">Avg</span>
+                                    <span class="stat-val">${avgPower}%</span>
+                                </div>
+                                <div class="stat-row">
+                                    <span class="stat-key">Max</span>
+                                    <span class="stat-val">${item.maxPower.toFixed(1)}%</span>
+                                </div>
                             </div>
                         </div>
                         
-                        <div class="analysis-stats-grid">
-                            <div class="stat-card">
-                                <div class="stat-card-label">Power Range</div>
-                                <div class="stat-card-values">
-                                    <div class="stat-row">
-                                        <span class="stat-key">Min</span>
-                                        <span class="stat-val">${item.minPower.toFixed(1)}%</span>
-                                    </div>
-                                    <div class="stat-row">
-                                        <span class="stat-key">Avg</span>
-                                        <span class="stat-val">${avgPower}%</span>
-                                    </div>
-                                    <div class="stat-row">
-                                        <span class="stat-key">Max</span>
-                                        <span class="stat-val">${item.maxPower.toFixed(1)}%</span>
-                                    </div>
+                        <div class="stat-card">
+                            <div class="stat-card-label">Price Range</div>
+                            <div class="stat-card-values">
+                                <div class="stat-row">
+                                    <span class="stat-key">Cheapest</span>
+                                    <span class="stat-val price-low">${Utils.escapeHtml(Utils.formatPriceBreakdown(item.minPrice))}</span>
                                 </div>
-                            </div>
-                            
-                            <div class="stat-card">
-                                <div class="stat-card-label">Price Range</div>
-                                <div class="stat-card-values">
-                                    <div class="stat-row">
-                                        <span class="stat-key">Cheapest</span>
-                                        <span class="stat-val price-low">${Utils.escapeHtml(Utils.formatPriceBreakdown(item.minPrice))}</span>
-                                    </div>
-                                    <div class="stat-row small-text">
-                                        <span class="stat-key">${minPowerForPrice}% power</span>
-                                    </div>
-                                    <div class="stat-row">
-                                        <span class="stat-key">Most Expensive</span>
-                                        <span class="stat-val price-high">${Utils.escapeHtml(Utils.formatPriceBreakdown(item.maxPrice))}</span>
-                                    </div>
-                                    <div class="stat-row small-text">
-                                        <span class="stat-key">${maxPowerForPrice}% power</span>
-                                    </div>
+                                <div class="stat-row small-text">
+                                    <span class="stat-key">${minPowerForPrice}% power</span>
+                                </div>
+                                <div class="stat-row">
+                                    <span class="stat-key">Most Expensive</span>
+                                    <span class="stat-val price-high">${Utils.escapeHtml(Utils.formatPriceBreakdown(item.maxPrice))}</span>
+                                </div>
+                                <div class="stat-row small-text">
+                                    <span class="stat-key">${maxPowerForPrice}% power</span>
                                 </div>
                             </div>
                         </div>
                     </div>
-                    
-                    <div class="analysis-card-footer">
-                        <span class="view-marketplace-link">🔍 Click to view in marketplace</span>
-                    </div>
                 </div>
-            `;
-        }).join('');
+                
+                <div class="analysis-card-footer">
+                    <span class="view-marketplace-link">🔍 Click to view in marketplace</span>
+                </div>
+            </div>
+        `;
     }
 };
 
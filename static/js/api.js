@@ -5,8 +5,8 @@ const API = {
     return await DataService.loadGameItems();
   },
 
-  async loadAllListings() {
-    return await DataService.loadAllListings();
+  async loadAllListings(options = {}) {
+    return await DataService.loadAllListings(options);
   },
 
   async getInventory(token, page = 1) {
@@ -124,7 +124,10 @@ document.addEventListener('DOMContentLoaded', async () => {
         
         console.log('Step 4: Loading all listings...');
         UIStatus.setGlobalStatus('Loading...');
-        const listingsResult = await API.loadAllListings();
+        const listingsResult = await API.loadAllListings({
+            // Paint the first page right away (served inline by the server when cached)
+            onFirstPage: () => Marketplace.applyFilters()
+        });
         UIStatus.setTotalListings(listingsResult.total_listings);
         UIStatus.setGlobalStatus('Live');
         
@@ -354,6 +354,9 @@ const AuthManager = {
         State.myListings = [];
         State.friends = [];
         State.playerChests = [];
+        if (typeof Overview !== 'undefined' && Overview.reset) {
+            Overview.reset();
+        }
         
         this.updateAuthUI();
         
@@ -11,27 +11,25 @@ const Characters = {
         
         console.log('🎯 Loading skills for classes:', uniqueClasses);
         
-        for (const className of uniqueClasses) {
-            try {
-                const response = await fetch('/api/skills', {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json',
-                    },
-                    credentials: 'include',
-                    body: JSON.stringify({ class: className })
-                });
-                
-                if (response.ok) {
-                    const data = await response.json();
-                    if (data.skills) {
-                        State.allSkills[className] = data.skills;
-                        console.log(`  ✓ Loaded ${data.skills.length} skills for ${className}`);
-                    }
+        // All classes in one batch round trip instead of one request per class
+        try {
+            const responses = await ApiClient.batch(uniqueClasses.map(className => ({
+                path: '/api/skills',
+                method: 'POST',
+                body: { class: className }
+            })));
+            
+            responses.forEach((res, idx) => {
+                const className = uniqueClasses[idx];
+                if (res.status === 200 && res.body && res.body.skills) {
+                    State.allSkills[className] = res.body.skills;
+                    console.log(`  ✓ Loaded ${res.body.skills.length} skills for ${className}`);
+                } else {
+                    console.error(`Failed to load skills for ${className}: HTTP ${res.status}`);
                 }
-            } catch (e) {
-                console.error(`Failed to load skills for ${className}:`, e);
-            }
+            });
+        } catch (e) {
+            console.error('Failed to load skills:', e);
         }
         
         console.log('✓ Skills loaded for all classes');
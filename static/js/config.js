@@ -50,6 +50,7 @@ const State = {
     myListings: [],
     topPlayers: [],
     topPlayersEquipment: [],
+    leaderboardMeta: null,  // precomputed by /api/leaderboard
     friends: [],
     pendingFriendsIn: [],
     pendingFriendsOut: [],
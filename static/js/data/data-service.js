@@ -1,40 +1,167 @@
 // Data layer: orchestrates ApiClient + Store (no UI)
 window.DataService = {
+  // Persisted copy of the full listings set (same key as the server snapshot)
+  LISTINGS_KEY: 'listings:all',
+
+  _versions: null,
+
+  /**
+   * Revalidate a bootstrapped or persisted resource once the page is idle.
+   * onChange(data) is only called when the server copy differs; with a key
+   * the newer copy is persisted too.
+   */
+  scheduleRevalidation(url, etag, onChange, key = null) {
+    const run = () => {
+      ApiClient.revalidate(url, etag)
+        .then((fresh) => {
+          if (!fresh) return;
+          if (key) ApiClient.putLocal(key, fresh.data, fresh.etag);
+          onChange(fresh.data);
+        })
+        .catch((e) => console.warn(`⚠ Revalidation failed for ${url}:`, e.message));
+    };
+    if (window.requestIdleCallback) {
+      window.requestIdleCallback(run, { timeout: 5000 });
+    } else {
+      setTimeout(run, 1000);
+    }
+  },
+
+  /**
+   * Server snapshot versions ({ generation, keys }), from the page when it
+   * embedded them, else from /api/cache/versions. Resolves to null if unknown.
+   */
+  getVersions() {
+    if (!this._versions) {
+      const boot = ApiClient.takeBootstrap('versions');
+      this._versions = boot
+        ? Promise.resolve(boot.data)
+        : ApiClient.getVersions().catch((e) => {
+            console.warn('⚠ Could not load cache versions:', e.message);
+            return null;
+          });
+    }
+    return this._versions;
+  },
+
+  /**
+   * Apply a resource without waiting on a full download: the copy embedded
+   * in the page, else the copy persisted in IndexedDB. Copies that aren't
+   * the server's current version are revalidated in the background and
+   * apply(data) runs again with the newer data.
+   * Returns false when there is no local copy (the caller fetches it).
+   */
+  async loadLocal(key, url, apply) {
+    const versions = await this.getVersions();
+    const generation = versions ? versions.generation : null;
+
+    const boot = ApiClient.takeBootstrap(key);
+    if (boot) {
+      apply(boot.data);
+      ApiClient.putLocal(key, boot.data, boot.etag, generation);
+      this.scheduleRevalidation(url, boot.etag, apply, key);
+      return true;
+    }
+
+    const local = await ApiClient.getLocal(key);
+    if (!local) return false;
+    apply(local.data);
+    if (LocalCache.isCurrent(key, versions)) {
+      if (local.generation !== generation) ApiClient.putLocal(key, local.data, local.etag, generation);
+    } else {
+      this.scheduleRevalidation(url, local.etag, apply, key);
+    }
+    return true;
+  },
+
   async loadGameItems() {
-    const data = await ApiClient.getItems();
+    let revalidated = false;
+    const apply = (data) => {
+      Store.set('gameItems', data.items || []);
+      if (revalidated) console.log('✓ Game items revalidated:', Store.get('gameItems').length);
+      revalidated = true;
+    };
+    if (await this.loadLocal('items', '/api/items', apply)) {
+      console.log('✓ Game items loaded from page/local cache:', Store.get('gameItems').length);
+      return Store.get('gameItems');
+    }
+
+    const { data } = await ApiClient.fetchCached('/api/items', 'items');
     Store.set('gameItems', data.items || []);
     console.log('✓ Game items loaded:', Store.get('gameItems').length);
     return Store.get('gameItems');
   },
 
-  async loadAllListings() {
-    Store.resetArray('allListings');
+  /**
+   * Load every listings page into the Store.
+   * options.onFirstPage(listings) is called as soon as listings are
+   * available to paint: the persisted full set, or page 1 (immediate when
+   * the server embedded it in the page). A persisted set that matches the
+   * server's current snapshot is used as-is, without fetching any page.
+   */
+  async loadAllListings(options = {}) {
+    const versions = await this.getVersions();
+    const local = await ApiClient.getLocal(this.LISTINGS_KEY);
+    const localListings = local && local.data && local.data.listings;
+    if (localListings) {
+      Store.set('allListings', localListings);
+      if (options.onFirstPage) options.onFirstPage(Store.get('allListings'));
+      if (LocalCache.isCurrent(this.LISTINGS_KEY, versions)) {
+        console.log('✓ Listings loaded from local cache:', localListings.length);
+        return {
+          total_listings: local.data.total_listings || localListings.length,
+          total_pages: local.data.total_pages || 1,
+          listings: localListings
+        };
+      }
+    } else {
+      Store.resetArray('allListings');
+    }
 
-    // Load first page
-    const firstPage = await ApiClient.getListingsPage(1);
+    // Load first page (from the bootstrap payload when available)
+    const boot = ApiClient.takeBootstrap('listings:page1');
+    const firstPage = boot ? boot.data : await ApiClient.getListingsPage(1);
     if (!firstPage.listings) throw new Error('No listings found');
 
-    Store.set('allListings', firstPage.listings || []);
+    // With a persisted copy on screen, swap in the fresh set only once it's complete
+    let listings = firstPage.listings || [];
     const totalPages = firstPage.total_pages || 1;
+    if (!localListings) {
+      Store.set('allListings', listings);
+      if (options.onFirstPage) options.onFirstPage(Store.get('allListings'));
+    }
 
-    // Load remaining pages in parallel
+    // Load remaining pages in parallel; a bootstrapped page 1 is revalidated alongside
+    const revalidation = boot
+      ? ApiClient.revalidate('/api/listings?page=1', boot.etag).catch(() => null)
+      : Promise.resolve(null);
     const remaining = [];
     for (let p = 2; p <= totalPages; p++) {
       remaining.push(ApiClient.getListingsPage(p));
     }
 
-    if (remaining.length > 0) {
-      const results = await Promise.all(remaining);
-      results.forEach((data) => {
-        if (data && data.listings) Store.pushMany('allListings', data.listings);
-      });
+    const [freshFirst, ...results] = await Promise.all([revalidation, ...remaining]);
+    if (freshFirst && freshFirst.data.listings) {
+      listings = freshFirst.data.listings;
     }
+    listings = listings.slice();
+    results.forEach((data) => {
+      if (data && data.listings) listings.push(...data.listings);
+    });
+    Store.set('allListings', listings);
 
-    return {
-      total_listings: firstPage.total_listings || Store.get('allListings').length,
+    const result = {
+      total_listings: firstPage.total_listings || listings.length,
       total_pages: totalPages,
       listings: Store.get('allListings')
     };
+    // Tagged with the snapshot version seen before the pages were fetched: if it
+    // moved meanwhile, the next visit just refetches
+    const etag = versions && versions.keys ? versions.keys[this.LISTINGS_KEY] : null;
+    if (etag) {
+      ApiClient.putLocal(this.LISTINGS_KEY, result, etag, versions.generation);
+    }
+    return result;
   },
 
   async getInventory(token, page = 1) {
@@ -191,6 +191,31 @@ const Filters = {
             });
         });
         
+        // Seller autocomplete (served from the server-side search index)
+        const usernameInput = document.getElementById('filterUsername');
+        const usernameList = document.getElementById('filterUsernameSuggestions');
+        if (usernameInput && usernameList) {
+            let debounce = null;
+            usernameInput.addEventListener('input', () => {
+                clearTimeout(debounce);
+                const query = usernameInput.value.trim();
+                if (!query) {
+                    usernameList.innerHTML = '';
+                    return;
+                }
+                debounce = setTimeout(async () => {
+                    try {
+                        const suggestions = await ApiClient.getSuggestions(query, 'seller');
+                        usernameList.innerHTML = suggestions
+                            .map(s => `<option value="${Utils.escapeHtml(s.value)}"></option>`)
+                            .join('');
+                    } catch (e) {
+                        console.warn('⚠ Seller suggestions unavailable:', e.message);
+                    }
+                }, 150);
+            });
+        }
+        
         // Marketplace sort
         const marketplaceSort = document.getElementById('marketplaceSortBy');
         if (marketplaceSort) {
@@ -231,23 +231,26 @@ const Inventory = {
         Store.resetArray('inventoryItems');
         State.inventoryItems = [];
         try {
-            const fetchPage = async (page) => {
-                const r = await fetch('/api/inventory', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    credentials: 'include',
-                    body: JSON.stringify({ page })
-                });
-                if (!r.ok) throw new Error('Failed to load inventory (HTTP ' + r.status + ')');
-                return r.json();
-            };
-            const first = await fetchPage(1);
-            const items = Array.isArray(first.player_items) ? first.player_items.slice() : [];
-            const totalPages = parseInt(first.total_pages || 1);
-            if (totalPages > 1) {
-                const rest = await Promise.all(Array.from({length: totalPages-1}, (_,i)=>fetchPage(i+2)));
-                rest.forEach(d => { if (Array.isArray(d.player_items)) items.push(...d.player_items); });
-            }
+            // Rows arrive progressively; render as they come in when the tab is visible
+            const items = [];
+            let renderQueued = false;
+            const { meta } = await ApiClient.streamNdjson('/api/inventory/stream', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                credentials: 'include',
+                body: JSON.stringify({})
+            }, (rows) => {
+                items.push(...rows);
+                State.inventoryItems = items;
+                if (State.currentTab === 'inventory' && !renderQueued) {
+                    renderQueued = true;
+                    requestAnimationFrame(() => {
+                        renderQueued = false;
+                        this.applyFilters();
+                    });
+                }
+            });
+            const first = meta || {};
             State.inventoryItems = items;
             Store.set('inventoryItems', items);
             if (first.user) {
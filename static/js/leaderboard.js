@@ -2,35 +2,70 @@
 const Leaderboard = {
     async loadLeaderboard() {
         try {
-            const response = await fetch('/api/top-players');
-            
-            if (!response.ok) {
-                const errorData = await response.json();
-                throw new Error(errorData.message || 'Failed to load leaderboard');
+            // Joined players + meta-stats precomputed by the server cache
+            const response = await fetch('/api/leaderboard');
+            if (response.ok) {
+                const data = await response.json();
+                if (data.players) {
+                    State.topPlayers = data.players;
+                    State.leaderboardMeta = data.meta || null;
+                    State.topPlayersEquipment = data.players.flatMap(p => Object.values(p.equipment || {}));
+                    this.indexEquipment();
+                    console.log('✓ Leaderboard loaded:', State.topPlayers.length, 'players');
+                    return true;
+                }
             }
             
-            const data = await response.json();
-            
-            if (data.top_10) {
-                State.topPlayers = data.top_10;
-                State.topPlayersEquipment = data.equipped_items || [];
-                console.log('✓ Leaderboard loaded:', State.topPlayers.length, 'players');
-                return true;
-            }
-            
-            throw new Error('No leaderboard data found');
+            return await this.loadRawLeaderboard();
         } catch (e) {
             console.error('✗ Error loading leaderboard:', e);
             return false;
         }
     },
     
+    async loadRawLeaderboard() {
+        const response = await fetch('/api/top-players');
+        
+        if (!response.ok) {
+            const errorData = await response.json();
+            throw new Error(errorData.message || 'Failed to load leaderboard');
+        }
+        
+        const data = await response.json();
+        
+        if (data.top_10) {
+            State.topPlayers = data.top_10;
+            State.topPlayersEquipment = data.equipped_items || [];
+            State.leaderboardMeta = null;
+            this.indexEquipment();
+            console.log('✓ Leaderboard loaded:', State.topPlayers.length, 'players');
+            return true;
+        }
+        
+        throw new Error('No leaderboard data found');
+    },
+    
+    indexEquipment() {
+        this._equipmentById = new Map(State.topPlayersEquipment.map(i => [String(i.id), i]));
+    },
+    
     getEquippedItem(itemId) {
         if (!itemId || itemId === '-1') return null;
-        return State.topPlayersEquipment.find(i => i.id === itemId);
+        if (!this._equipmentById) this.indexEquipment();
+        return this._equipmentById.get(String(itemId)) || null;
     },
     
     calculateMetaStats() {
+        const meta = State.leaderboardMeta;
+        if (meta) {
+            return {
+                weaponCounts: meta.weapon_counts || {},
+                classCounts: meta.class_counts || {},
+                skinCounts: meta.skin_counts || {},
+                backCounts: meta.back_counts || {}
+            };
+        }
+        
         const weaponCounts = {};
         const classCounts = {};
         const skinCounts = {};
@@ -2,20 +2,28 @@
 const Shop = {
     async loadShopData() {
         try {
-            // Shop endpoints are public (use admin token on backend)
-            const [shadersRes, backsRes, chestsRes] = await Promise.all([
-                fetch('/api/shaders'),
-                fetch('/api/backs'),
-                fetch('/api/chests')
-            ]);
+            const apply = {
+                shaders: data => { State.shaders = data.shaders || []; },
+                backs: data => { State.backs = data.back_items || []; },
+                chests: data => { State.chests = data.chests || []; }
+            };
+            const keys = Object.keys(apply);
             
-            const shadersData = await shadersRes.json();
-            const backsData = await backsRes.json();
-            const chestsData = await chestsRes.json();
+            // Prefer the copies embedded in the page or persisted locally, revalidating them later
+            const local = await Promise.all(keys.map(key => DataService.loadLocal(key, `/api/${key}`, apply[key])));
+            const missing = keys.filter((key, i) => !local[i]);
+            if (missing.length === 0) {
+                console.log('✓ Shop data loaded from page/local cache:', State.shaders.length, 'shaders,', State.backs.length, 'backs,', State.chests.length, 'chests');
+                return true;
+            }
             
-            State.shaders = shadersData.shaders || [];
-            State.backs = backsData.back_items || [];
-            State.chests = chestsData.chests || [];
+            // Shop endpoints are public (use admin token on backend); one round trip for the rest
+            const responses = await ApiClient.batch(missing.map(key => ({ path: `/api/${key}` })));
+            responses.forEach((res, i) => {
+                const body = res.body || {};
+                apply[missing[i]](body);
+                if (res.status === 200 && res.etag) ApiClient.putLocal(missing[i], body, res.etag);
+            });
             
             console.log('✓ Shop data loaded:', State.shaders.length, 'shaders,', State.backs.length, 'backs,', State.chests.length, 'chests');
             return true;
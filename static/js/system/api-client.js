@@ -1,5 +1,152 @@
 // System layer: raw API calls only (no UI, no State mutations)
 window.ApiClient = {
+  _bootstrap: null,
+
+  /**
+   * Take (once) a bootstrap entry embedded in the index page by the server.
+   * Returns { data, etag } or null when the server had nothing cached, or
+   * left the entry out because our persisted copy is current.
+   */
+  takeBootstrap(key) {
+    if (this._bootstrap === null) {
+      this._bootstrap = {};
+      const el = document.getElementById('bootstrapData');
+      if (el) {
+        try {
+          this._bootstrap = JSON.parse(el.textContent || '{}') || {};
+        } catch (e) {
+          console.warn('⚠ Could not parse bootstrap data:', e.message);
+        }
+      }
+    }
+
+    const entry = this._bootstrap[key];
+    delete this._bootstrap[key];
+    return entry && entry.data ? entry : null;
+  },
+
+  /**
+   * Conditional GET: resolves to null when the server answers 304 (our copy
+   * is current), otherwise to { data, etag } with the fresh payload.
+   */
+  async revalidate(url, etag) {
+    const headers = etag ? { 'If-None-Match': `"${etag}"` } : {};
+    const response = await fetch(url, { headers, cache: 'no-cache' });
+    if (response.status === 304) return null;
+    if (!response.ok) {
+      throw new Error(`Failed to revalidate ${url} (${response.status})`);
+    }
+    const freshEtag = (response.headers.get('ETag') || '').replace(/^W\//, '').replace(/"/g, '');
+    return { data: await response.json(), etag: freshEtag || null };
+  },
+
+  /**
+   * Persisted copy of a response (see LocalCache): { data, etag, generation }
+   * or null when there is none.
+   */
+  async getLocal(key) {
+    return await LocalCache.get(key);
+  },
+
+  putLocal(key, data, etag, generation = null) {
+    return LocalCache.put(key, data, etag, generation).catch(() => {});
+  },
+
+  /**
+   * Conditional GET against the persisted copy of key: the local data when
+   * the server answers 304, else the fresh payload (which is persisted).
+   * Resolves to { data, etag, changed }.
+   */
+  async fetchCached(url, key = url) {
+    const local = await this.getLocal(key);
+    const fresh = await this.revalidate(url, local ? local.etag : null);
+    if (!fresh) return { data: local.data, etag: local.etag, changed: false };
+    this.putLocal(key, fresh.data, fresh.etag);
+    return { ...fresh, changed: true };
+  },
+
+  /** Current ETag per client-cacheable snapshot: { generation, keys }. */
+  async getVersions() {
+    const response = await fetch('/api/cache/versions', { cache: 'no-cache' });
+    if (!response.ok) {
+      throw new Error(`Failed to load cache versions (${response.status})`);
+    }
+    return await response.json();
+  },
+
+  /**
+   * Run several API calls in one round trip via /api/batch.
+   * requests: [{ path, method?, body? }]; resolves to [{ status, body, etag? }] in order.
+   */
+  async batch(requests) {
+    const response = await fetch('/api/batch', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      credentials: 'include',
+      body: JSON.stringify({ requests })
+    });
+    if (!response.ok) {
+      throw new Error(`Batch request failed (${response.status})`);
+    }
+    const data = await response.json();
+    return data.responses || [];
+  },
+
+  /**
+   * Read an NDJSON stream (see _ndjson_response on the server), calling
+   * onRows(rows, meta) for each chunk as it arrives so callers can render
+   * progressively. Resolves to { meta, count } after the end line.
+   */
+  async streamNdjson(url, init = {}, onRows = () => {}) {
+    const response = await fetch(url, init);
+    if (!response.ok) {
+      let message = `Request failed (${response.status})`;
+      try {
+        const errorData = await response.json();
+        message = errorData.message || message;
+      } catch (_) {}
+      throw new Error(message);
+    }
+
+    let meta = null;
+    let count = 0;
+    let ended = false;
+    const handleLines = (lines) => {
+      const rows = [];
+      lines.forEach((line) => {
+        if (!line.trim()) return;
+        const obj = JSON.parse(line);
+        if (obj._stream === 'meta') meta = obj;
+        else if (obj._stream === 'end') ended = true;
+        else if (obj._stream === 'error') throw new Error(obj.message || 'Stream failed');
+        else rows.push(obj);
+      });
+      if (rows.length) {
+        count += rows.length;
+        onRows(rows, meta);
+      }
+    };
+
+    if (!response.body || !response.body.getReader) {
+      handleLines((await response.text()).split('\n'));
+    } else {
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let pending = '';
+      while (true) {
+        const { done, value } = await reader.read();
+        pending += decoder.decode(value || new Uint8Array(), { stream: !done });
+        const lines = pending.split('\n');
+        pending = done ? '' : lines.pop();
+        handleLines(lines);
+        if (done) break;
+      }
+    }
+
+    if (!ended) throw new Error('Stream ended unexpectedly');
+    return { meta, count };
+  },
+
   async getItems() {
     const response = await fetch('/api/items');
     if (!response.ok) {
@@ -16,6 +163,41 @@ window.ApiClient = {
     return await response.json();
   },
 
+  async getSuggestions(query, type = '', limit = 10) {
+    const params = new URLSearchParams({ q: query, limit: String(limit) });
+    if (type) params.set('type', type);
+    const response = await fetch(`/api/search/suggest?${params}`);
+    if (!response.ok) {
+      throw new Error(`Failed to load suggestions (${response.status})`);
+    }
+    const data = await response.json();
+    return data.suggestions || [];
+  },
+
+  /**
+   * Overview tab summaries (quick stats, active character, equipment,
+   * inventory, recent listings and market figures), aggregated server-side.
+   */
+  async getOverview() {
+    const response = await fetch('/api/overview', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      credentials: 'include',
+      body: JSON.stringify({})
+    });
+
+    if (!response.ok) {
+      let message = 'Failed to load overview';
+      try {
+        const errorData = await response.json();
+        message = errorData.message || message;
+      } catch (_) {}
+      throw new Error(message);
+    }
+
+    return await response.json();
+  },
+
   async getInventory(token, page = 1) {
     const response = await fetch('/api/inventory', {
       method: 'POST',
@@ -0,0 +1,152 @@
+// System layer: persistent response copies in IndexedDB (no UI, no State mutations)
+//
+// Each copy is stored with the ETag it was served with and the snapshot
+// generation it belonged to. The ETags held are mirrored into a cookie so
+// the server can leave already-held snapshots out of the index page.
+window.LocalCache = {
+  DB_NAME: 'streamarena-cache',
+  // Bump when the shape of stored payloads changes: older databases are dropped on open
+  SCHEMA_VERSION: 1,
+  DATA_STORE: 'responses',
+  META_STORE: 'meta',
+  COOKIE: 'client_cache',
+
+  _db: null,      // Promise<IDBDatabase|null>
+  _meta: {},      // key -> { etag, generation, storedAt }
+
+  /**
+   * Open the database once. Resolves to null when IndexedDB is unavailable
+   * (private browsing, blocked upgrade); every other method then no-ops.
+   */
+  open() {
+    if (this._db) return this._db;
+    this._db = new Promise((resolve) => {
+      let request;
+      try {
+        request = window.indexedDB ? indexedDB.open(this.DB_NAME, this.SCHEMA_VERSION) : null;
+      } catch (e) {
+        request = null;
+      }
+      if (!request) return resolve(null);
+
+      request.onupgradeneeded = () => {
+        const db = request.result;
+        Array.from(db.objectStoreNames).forEach((name) => db.deleteObjectStore(name));
+        db.createObjectStore(this.DATA_STORE);
+        db.createObjectStore(this.META_STORE);
+      };
+      request.onsuccess = () => resolve(request.result);
+      request.onerror = () => {
+        console.warn('⚠ Local cache unavailable:', request.error && request.error.message);
+        resolve(null);
+      };
+      request.onblocked = () => resolve(null);
+    }).then(async (db) => {
+      if (db) {
+        try {
+          // Metadata only: copies themselves are read on demand
+          const tx = db.transaction(this.META_STORE, 'readonly');
+          const store = tx.objectStore(this.META_STORE);
+          const [keys, values] = await Promise.all([
+            this._request(store.getAllKeys()),
+            this._request(store.getAll())
+          ]);
+          keys.forEach((key, i) => { this._meta[key] = values[i]; });
+        } catch (e) {
+          console.warn('⚠ Local cache metadata unreadable:', e.message);
+        }
+      }
+      this._writeCookie();
+      return db;
+    });
+    return this._db;
+  },
+
+  _request(request) {
+    return new Promise((resolve, reject) => {
+      request.onsuccess = () => resolve(request.result);
+      request.onerror = () => reject(request.error);
+    });
+  },
+
+  _done(tx) {
+    return new Promise((resolve, reject) => {
+      tx.oncomplete = () => resolve();
+      tx.onerror = () => reject(tx.error);
+      tx.onabort = () => reject(tx.error);
+    });
+  },
+
+  /** ETag of the stored copy of key (null if none). */
+  etagOf(key) {
+    const meta = this._meta[key];
+    return meta ? meta.etag : null;
+  },
+
+  /** Stored copy: { data, etag, generation, storedAt } or null. */
+  async get(key) {
+    const db = await this.open();
+    if (!db || !this._meta[key]) return null;
+    try {
+      const data = await this._request(db.transaction(this.DATA_STORE, 'readonly').objectStore(this.DATA_STORE).get(key));
+      return data === undefined ? null : { data, ...this._meta[key] };
+    } catch (e) {
+      console.warn(`⚠ Local cache read failed for ${key}:`, e.message);
+      return null;
+    }
+  },
+
+  /** Store a copy; rewriting a copy with the same ETag only updates its generation. */
+  async put(key, data, etag = null, generation = null) {
+    const db = await this.open();
+    if (!db) return;
+    const meta = { etag, generation, storedAt: Date.now() };
+    const unchanged = etag && this.etagOf(key) === etag;
+    try {
+      const tx = db.transaction([this.DATA_STORE, this.META_STORE], 'readwrite');
+      if (!unchanged) tx.objectStore(this.DATA_STORE).put(data, key);
+      tx.objectStore(this.META_STORE).put(meta, key);
+      await this._done(tx);
+      this._meta[key] = meta;
+    } catch (e) {
+      // Quota exceeded or similar: forget the key rather than keep a stale copy
+      console.warn(`⚠ Local cache write failed for ${key}:`, e && e.message);
+      await this.remove(key);
+    }
+    this._writeCookie();
+  },
+
+  async remove(key) {
+    const db = await this.open();
+    delete this._meta[key];
+    this._writeCookie();
+    if (!db) return;
+    try {
+      const tx = db.transaction([this.DATA_STORE, this.META_STORE], 'readwrite');
+      tx.objectStore(this.DATA_STORE).delete(key);
+      tx.objectStore(this.META_STORE).delete(key);
+      await this._done(tx);
+    } catch (_) {}
+  },
+
+  /**
+   * Whether the stored copy of key is the one the server serves now, i.e.
+   * can be used without revalidating. versions: { generation, keys } from
+   * /api/cache/versions; a new generation only invalidates the keys whose
+   * ETag moved.
+   */
+  isCurrent(key, versions) {
+    const meta = this._meta[key];
+    const etag = versions && versions.keys ? versions.keys[key] : null;
+    return !!(meta && etag && meta.etag === etag);
+  },
+
+  _writeCookie() {
+    const pairs = Object.keys(this._meta)
+      .filter((key) => this._meta[key].etag)
+      .map((key) => `${encodeURIComponent(key)}=${encodeURIComponent(this._meta[key].etag)}`);
+    document.cookie = pairs.length
+      ? `${this.COOKIE}=${pairs.join('&')}; path=/; max-age=31536000; SameSite=Lax`
+      : `${this.COOKIE}=; path=/; max-age=0; SameSite=Lax`;
+  }
+};
@@ -192,6 +192,8 @@ const UIComponents = {
         `;
     },
     
+    // No per-index animation-delay: UIListRenderer staggers the rows it inserts,
+    // and position-independent markup lets it reuse nodes across filter changes
     renderItemCard(item, idx, showSeller = false) {
                 const model = (item instanceof ItemModel) ? item : new ItemModel(item);
         const name = model.name;
@@ -220,7 +222,7 @@ const comparisonHTML = showSeller ?
         const clickHandler = showSeller ? `onclick="filterToItem('${Utils.escapeJs(name)}')"` : '';
         
         return `
-            <div class="item-card${statusClasses}" style="animation-delay: ${idx * 0.05}s" ${clickHandler}>
+            <div class="item-card${statusClasses}" ${clickHandler}>
                 <div class="card-header">
                     <div>
                         <div class="item-id">#${Utils.escapeHtml(item.id)}</div>
@@ -267,7 +269,7 @@ const comparisonHTML = showSeller ?
         const clickHandler = onClickHandler ? `onclick="${onClickHandler}('${Utils.escapeJs(name)}')"` : '';
 
 return `
-            <div class="item-row${statusClasses}" style="animation-delay: ${idx * 0.02}s" ${clickAttr}>
+            <div class="item-row${statusClasses}" ${clickAttr}>
                 <div class="item-id">#${Utils.escapeHtml(item.id)}</div>
                 <div>
                     <div class="item-name">${Utils.escapeHtml(name)}</div>
@@ -1,5 +1,28 @@
 // UI layer: standardized list rendering for tabs (no fetching, no state mutation)
+//
+// Large collections are windowed: only the rows in (or near) the viewport
+// exist in the DOM, and padding on the container stands in for the rest.
+// Nodes are cached by item key, so scrolling reattaches nodes that were
+// already built and a re-render (filter change, view refresh) only rebuilds
+// the rows whose markup actually changed.
 const UIListRenderer = {
+  // Collections up to this size are rendered in full (still keyed/patched)
+  WINDOW_MIN_ITEMS: 100,
+  // Extra rows rendered above and below the viewport
+  OVERSCAN_ROWS: 4,
+  // Row pitch guesses until the first rows are measured
+  ESTIMATED_CARD_ROW: 420,
+  ESTIMATED_LIST_ROW: 80,
+  // Detached nodes kept per container for reuse
+  MAX_CACHED_NODES: 600,
+  // Entrance animation stagger for newly created nodes (capped)
+  STAGGER_SECONDS: 0.02,
+  STAGGER_MAX: 15,
+
+  _views: new Map(),
+  _listening: false,
+  _frame: null,
+
   /**
    * Render a collection into a container, respecting the global grid/list view.
    * Options:
@@ -8,8 +31,10 @@ const UIListRenderer = {
    * - row: (item, idx) => html
    * - decorateCard: (html, item, idx) => html
    * - decorateRow: (html, item, idx) => html
+   * - key: (item, idx) => stable identity (default item.id)
    * - listClassName: override for list view (default 'items-list')
    * - gridClassName: override for grid view (default 'items-grid')
+   * - windowed: false to always render every item
    */
   render(containerId, items, options = {}) {
     const container = document.getElementById(containerId);
@@ -22,6 +47,7 @@ const UIListRenderer = {
     const emptyText = options.emptyText ?? 'No items to display';
 
     if (!items || items.length === 0) {
+      this._release(containerId);
       container.className = options.emptyClassName || '';
       container.innerHTML = UIComponents.renderEmptyState(emptyIcon, emptyText);
       return;
@@ -37,13 +63,248 @@ const UIListRenderer = {
     const decorateCard = options.decorateCard || ((html) => html);
     const decorateRow  = options.decorateRow  || ((html) => html);
 
+    let view = this._views.get(containerId);
+    if (!view || view.container !== container || view.isGrid !== isGrid) {
+      this._release(containerId);
+      view = this._createView(containerId, container, isGrid);
+    }
+
     container.className = isGrid ? gridClassName : listClassName;
 
-    const html = items.map((item, idx) => {
-      const base = isGrid ? cardFn(item, idx) : rowFn(item, idx);
-      return isGrid ? decorateCard(base, item, idx) : decorateRow(base, item, idx);
-    }).join('');
+    view.items = items;
+    view.keyFn = options.key || ((item, idx) => item?.id ?? `#${idx}`);
+    view.html = isGrid
+      ? (item, idx) => decorateCard(cardFn(item, idx), item, idx)
+      : (item, idx) => decorateRow(rowFn(item, idx), item, idx);
+    view.windowed = options.windowed !== false && items.length > this.WINDOW_MIN_ITEMS;
+    // New generation: visible rows re-check their markup instead of trusting the cache
+    view.generation++;
+
+    this._update(view, true);
+  },
+
+  _createView(containerId, container, isGrid) {
+    // Markup from a previous innerHTML render (or empty state) is not ours to reuse
+    container.innerHTML = '';
+    const view = {
+      id: containerId,
+      container,
+      isGrid,
+      items: [],
+      keyFn: null,
+      html: null,
+      windowed: false,
+      generation: 0,
+      nodes: new Map(),       // key -> { node, html, item, generation }
+      range: null,
+      rowPitch: isGrid ? this.ESTIMATED_CARD_ROW : this.ESTIMATED_LIST_ROW,
+      observer: null
+    };
+    if (typeof ResizeObserver !== 'undefined') {
+      // Fires when the tab becomes visible or the grid reflows to another column count
+      view.observer = new ResizeObserver(() => this._schedule());
+      view.observer.observe(container);
+    }
+    this._views.set(containerId, view);
+    this._listen();
+    return view;
+  },
+
+  _release(containerId) {
+    const view = this._views.get(containerId);
+    if (!view) return;
+    if (view.observer) view.observer.disconnect();
+    view.container.style.paddingTop = '';
+    view.container.style.paddingBottom = '';
+    view.nodes.clear();
+    this._views.delete(containerId);
+  },
+
+  _listen() {
+    if (this._listening) return;
+    this._listening = true;
+    // Capture: also sees scrolling of nested scroll containers
+    document.addEventListener('scroll', () => this._schedule(), { capture: true, passive: true });
+    window.addEventListener('resize', () => this._schedule(), { passive: true });
+  },
+
+  _schedule() {
+    if (this._frame !== null) return;
+    this._frame = requestAnimationFrame(() => {
+      this._frame = null;
+      this._views.forEach(view => {
+        if (view.windowed) this._update(view, false);
+      });
+    });
+  },
+
+  _columns(view) {
+    if (!view.isGrid) return 1;
+    const tracks = getComputedStyle(view.container).gridTemplateColumns;
+    return (tracks && tracks !== 'none') ? Math.max(1, tracks.split(' ').length) : 1;
+  },
+
+  _visibleRange(view) {
+    const total = view.items.length;
+    if (!view.windowed) return { start: 0, end: total, columns: 1 };
+
+    const columns = this._columns(view);
+    const totalRows = Math.ceil(total / columns);
+    const pitch = view.rowPitch;
+    const rect = view.container.getBoundingClientRect();
+
+    let firstRow, lastRow;
+    if (rect.width === 0 && rect.height === 0) {
+      // Hidden tab: render the head of the list; the ResizeObserver catches it being shown
+      firstRow = 0;
+      lastRow = this.OVERSCAN_ROWS * 2;
+    } else {
+      const top = Math.max(0, -rect.top);
+      const bottom = Math.max(top, window.innerHeight - rect.top);
+      firstRow = Math.floor(top / pitch) - this.OVERSCAN_ROWS;
+      lastRow = Math.ceil(bottom / pitch) + this.OVERSCAN_ROWS;
+    }
+    const span = Math.max(1, lastRow - firstRow);
+    // A filter change can leave the viewport past the end of a shorter list
+    firstRow = Math.max(0, Math.min(firstRow, totalRows - span));
+    lastRow = Math.min(totalRows, firstRow + span);
+
+    return {
+      start: firstRow * columns,
+      end: Math.min(total, lastRow * columns),
+      columns,
+      rowsBefore: firstRow,
+      rowsAfter: totalRows - lastRow
+    };
+  },
+
+  _update(view, fresh) {
+    const range = this._visibleRange(view);
+    const prev = view.range;
+    if (!fresh && prev && prev.start === range.start && prev.end === range.end && prev.columns === range.columns) {
+      return;
+    }
+    view.range = range;
+
+    this._patch(view, range.start, range.end, fresh);
 
-    container.innerHTML = html;
+    if (view.windowed) {
+      view.container.style.paddingTop = `${range.rowsBefore * view.rowPitch}px`;
+      view.container.style.paddingBottom = `${range.rowsAfter * view.rowPitch}px`;
+      if (this._measure(view, range)) this._schedule();
+    } else {
+      view.container.style.paddingTop = '';
+      view.container.style.paddingBottom = '';
+    }
+  },
+
+  /**
+   * Make the container's children exactly the nodes for items[start, end),
+   * reusing cached nodes and moving only what is out of place.
+   */
+  _patch(view, start, end, fresh) {
+    const container = view.container;
+    const desired = [];
+    const used = new Set();
+    let created = 0;
+
+    for (let idx = start; idx < end; idx++) {
+      const item = view.items[idx];
+      let key = view.keyFn(item, idx);
+      if (used.has(key)) key = `${key}#${idx}`;
+      used.add(key);
+
+      let entry = view.nodes.get(key);
+      if (!entry || entry.item !== item || entry.generation !== view.generation) {
+        const html = view.html(item, idx);
+        if (entry && entry.html === html) {
+          entry.item = item;
+          entry.generation = view.generation;
+        } else {
+          entry = { node: this._build(html), html, item, generation: view.generation };
+          // Fresh renders stagger in new rows; rows scrolled into view appear settled
+          if (fresh) {
+            entry.node.style.animationDelay = `${Math.min(created, this.STAGGER_MAX) * this.STAGGER_SECONDS}s`;
+          } else {
+            this._settle(entry.node);
+          }
+          created++;
+        }
+      }
+      // Most recently used last
+      view.nodes.delete(key);
+      view.nodes.set(key, entry);
+      desired.push(entry.node);
+    }
+
+    const keep = new Set(desired);
+    Array.from(container.children).forEach(child => {
+      if (!keep.has(child)) {
+        child.remove();
+        // Re-inserting a node restarts its CSS animation
+        this._settle(child);
+      }
+    });
+
+    let cursor = container.firstElementChild;
+    desired.forEach(node => {
+      if (node === cursor) {
+        cursor = cursor.nextElementSibling;
+      } else {
+        container.insertBefore(node, cursor);
+      }
+    });
+
+    const limit = Math.max(this.MAX_CACHED_NODES, desired.length * 3);
+    if (view.nodes.size > limit) {
+      for (const [key, entry] of view.nodes) {
+        if (view.nodes.size <= limit) break;
+        if (!keep.has(entry.node)) view.nodes.delete(key);
+      }
+    }
+  },
+
+  _build(html) {
+    const template = document.createElement('template');
+    template.innerHTML = html.trim();
+    if (template.content.childElementCount === 1) {
+      return template.content.firstElementChild;
+    }
+    const wrapper = document.createElement('div');
+    wrapper.style.display = 'contents';
+    wrapper.appendChild(template.content);
+    return wrapper;
+  },
+
+  _settle(node) {
+    node.style.animationDelay = '0s';
+    node.style.animationDuration = '0s';
+  },
+
+  /**
+   * Update the row pitch from the rendered rows. Returns true if it moved
+   * enough that the visible range should be recomputed.
+   */
+  _measure(view, range) {
+    const first = view.container.firstElementChild;
+    const last = view.container.lastElementChild;
+    const rows = Math.ceil((range.end - range.start) / range.columns);
+    if (!first || !last || rows === 0 || first.offsetHeight === 0) return false;
+
+    const gap = parseFloat(getComputedStyle(view.container).rowGap) || 0;
+    const height = last.getBoundingClientRect().bottom - first.getBoundingClientRect().top;
+    const pitch = (height + gap) / rows;
+    if (!(pitch > 0) || Math.abs(pitch - view.rowPitch) < 1) return false;
+
+    // Rows differ in height; only a clearly wrong estimate is worth another pass
+    const off = Math.abs(pitch - view.rowPitch) / view.rowPitch > 0.1;
+    view.rowPitch = pitch;
+    view.container.style.paddingTop = `${range.rowsBefore * pitch}px`;
+    view.container.style.paddingBottom = `${range.rowsAfter * pitch}px`;
+    if (off) {
+      // Force the next frame to recompute even if the index range looks the same
+      view.range = null;
+    }
+    return off;
   }
 };
@@ -0,0 +1,35 @@
+"""Shared fixtures: the app modules live at the repository root."""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def make_listing(listing_id, base_item_id=1, slot='head', power='0.5', gold=1000, platinum=0, gems=0,
+                 username='seller', extra=''):
+    """One upstream listing row."""
+    return {
+        'id': str(listing_id),
+        'base_item_id': str(base_item_id),
+        'slot': slot,
+        'username': username,
+        'power': power,
+        'platinum_cost': str(platinum),
+        'gold_cost': str(gold),
+        'gem_cost': str(gems),
+        'extra': json.dumps({'extra': extra}),
+        'time_created': '2026-10-01 12:00:00',
+        'time_expires': '2026-11-01 12:00:00',
+    }
+
+
+@pytest.fixture
+def catalog():
+    return {'items': [
+        {'id': 1, 'slot': 'head', 'item_name': 'Iron Helm', 'class': json.dumps(['mage', 'rogue'])},
+        {'id': 2, 'slot': 'weapon', 'item_name': 'Short Bow', 'class': json.dumps(['ranger'])},
+    ]}
@@ -0,0 +1,111 @@
+import copy
+
+from conftest import make_listing
+from deals import DealIndex
+from listing_store import ListingStore
+
+
+def snapshot(listings, catalog):
+    return ListingStore.from_listings(listings, catalog)
+
+
+def helm_group(prices, start=1):
+    return [make_listing(start + i, gold=price) for i, price in enumerate(prices)]
+
+
+def test_cheap_listing_in_a_full_group_is_a_deal(catalog):
+    index = DealIndex()
+    summary = index.update(snapshot(helm_group([1000, 1000, 1000, 1000, 400]), catalog), catalog)
+
+    assert summary['added'] == 5
+    deals = index.top()
+    assert [deal['listing']['id'] for deal in deals] == [5]
+    assert deals[0]['ratio'] == 0.4
+    assert deals[0]['group']['name'] == 'Iron Helm'
+    assert deals[0]['group']['count'] == 5
+
+
+def test_small_groups_have_no_baseline(catalog):
+    index = DealIndex()
+    index.update(snapshot(helm_group([1000, 1000, 1000, 400]), catalog), catalog)
+
+    assert index.top() == []
+    assert index.groups()[0]['count'] == 4
+
+
+def test_removed_deal_leaves_the_ranking(catalog):
+    index = DealIndex()
+    listings = helm_group([1000, 1000, 1000, 1000, 1000, 400])
+    index.update(snapshot(listings, catalog), catalog)
+    assert len(index.top()) == 1
+
+    summary = index.update(snapshot(listings[:-1], catalog), catalog)
+
+    assert summary['removed'] == 1
+    assert index.top() == []
+    assert index.stats() == {'groups': 1, 'listings': 5, 'deals': 0}
+
+
+def test_repriced_listing_becomes_a_deal_and_only_its_group_is_touched(catalog):
+    index = DealIndex()
+    helms = helm_group([1000] * 5)
+    bows = [make_listing(100 + i, base_item_id=2, slot='weapon', gold=1000) for i in range(5)]
+    index.update(snapshot(helms + bows, catalog), catalog)
+    assert index.top() == []
+
+    repriced = copy.deepcopy(helms)
+    repriced[2]['gold_cost'] = '300'
+    summary = index.update(snapshot(repriced + bows, catalog), catalog)
+
+    assert summary['changed'] == 1
+    assert summary['groups_touched'] == 1
+    assert [deal['listing']['id'] for deal in index.top()] == [3]
+
+
+def test_deal_cleared_when_group_median_drops(catalog):
+    index = DealIndex()
+    index.update(snapshot(helm_group([1000, 1000, 1000, 1000, 500]), catalog), catalog)
+    assert len(index.top()) == 1
+
+    # Four more cheap listings pull the median down to the deal's price
+    index.update(snapshot(helm_group([1000, 1000, 1000, 1000, 500, 500, 500, 500, 500]), catalog), catalog)
+
+    assert index.top() == []
+
+
+def test_gem_only_and_powerless_listings_are_skipped(catalog):
+    index = DealIndex()
+    listings = helm_group([1000] * 5) + [make_listing(50, gold=0, gems=10), make_listing(51, power='0')]
+    summary = index.update(snapshot(listings, catalog), catalog)
+
+    assert summary['added'] == 5
+
+
+def test_top_filters_by_slot_and_class(catalog):
+    index = DealIndex()
+    helms = helm_group([1000, 1000, 1000, 1000, 400])
+    bows = [make_listing(100 + i, base_item_id=2, slot='weapon', gold=gold)
+            for i, gold in enumerate([1000, 1000, 1000, 1000, 300])]
+    index.update(snapshot(helms + bows, catalog), catalog)
+
+    assert [d['listing']['id'] for d in index.top()] == [104, 5]
+    assert [d['listing']['id'] for d in index.top(slot='head')] == [5]
+    assert [d['listing']['id'] for d in index.top(item_class='ranger')] == [104]
+    assert [d['listing']['id'] for d in index.top(max_ratio=0.35)] == [104]
+
+
+def test_group_memo_follows_the_snapshot_and_catalog(catalog):
+    index = DealIndex()
+    helms = helm_group([1000] * 5)
+    bows = [make_listing(100 + i, base_item_id=2, slot='weapon') for i in range(5)]
+    index.update(snapshot(helms + bows, catalog), catalog)
+    assert len(index._group_memo) == 2
+
+    index.update(snapshot(helms, catalog), catalog)
+    assert len(index._group_memo) == 1
+
+    renamed = copy.deepcopy(catalog)
+    renamed['items'][0]['item_name'] = 'Steel Helm'
+    first = index._group_memo
+    index.update(snapshot(helms, renamed), renamed)
+    assert index._group_memo is not first
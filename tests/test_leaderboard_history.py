@@ -0,0 +1,127 @@
+import gzip
+from datetime import datetime, timezone
+
+import pytest
+
+from leaderboard_history import LeaderboardHistory, parse_window
+
+JAN = datetime(2026, 1, 10, tzinfo=timezone.utc).timestamp()
+FEB = datetime(2026, 2, 1, 12, tzinfo=timezone.utc).timestamp()
+
+
+def board(*names, weapons=None, level=10):
+    weapons = weapons or {}
+    return {'top_10': [
+        {'username': name, 'level': level, 'experience': 1000 - i, 'class': 'Mage',
+         'weapon_equip': weapons.get(name, 100), 'back_equip': 9}
+        for i, name in enumerate(names)
+    ]}
+
+
+def event_types(events):
+    return sorted((event[0], event[1]) for event in events)
+
+
+@pytest.fixture
+def history(tmp_path):
+    return LeaderboardHistory(tmp_path)
+
+
+def test_parse_window():
+    assert parse_window('90m') == 5400
+    assert parse_window(' 7D ') == 7 * 86400
+    for value in ('', '7', 'week', '-1d', None):
+        with pytest.raises(ValueError):
+            parse_window(value)
+
+
+def test_records_rank_entry_exit_and_equipment_events(history):
+    assert history.record(board('ann', 'bob', 'cat'), JAN) == []
+
+    events = history.record(board('bob', 'ann', 'dan', weapons={'ann': 555}), JAN + 60)
+
+    assert event_types(events) == [('equip', 'ann'), ('new', 'dan'), ('out', 'cat'),
+                                   ('rank', 'ann'), ('rank', 'bob')]
+    assert ['equip', 'ann', 'weapon_equip', '100', '555'] in events
+
+
+def test_unchanged_snapshot_is_skipped(history):
+    history.record(board('ann', 'bob'), JAN)
+    assert history.record(board('ann', 'bob'), JAN + 60) is None
+    assert history.record({'top_10': []}, JAN + 120) is None
+
+    stats = history.stats()
+    assert (stats['snapshots'], stats['recorded'], stats['skipped']) == (1, 1, 1)
+
+
+def test_movement_ignores_equipment_only_snapshots_and_follows_new_records(history):
+    assert history.movement() == {}
+    history.record(board('ann', 'bob', 'cat'), JAN)
+    history.record(board('bob', 'ann', 'dan'), JAN + 60)
+    history.record(board('bob', 'ann', 'dan', weapons={'dan': 7}), JAN + 120)
+
+    movement = history.movement()
+    assert movement['bob'] == {'rank': 1, 'previous_rank': 2, 'change': 1, 'new': False}
+    assert movement['dan']['new'] and movement['dan']['previous_rank'] is None
+    assert history.movement() is movement
+
+    history.record(board('dan', 'bob', 'ann'), JAN + 180)
+    assert history.movement()['dan']['change'] == 2
+
+
+def test_window_and_player_bisect_on_time(history):
+    history.record(board('ann', 'bob'), JAN)
+    history.record(board('bob', 'ann'), JAN + 60)
+    history.record(board('ann', 'bob'), JAN + 120)
+
+    window = history.window(since=JAN + 30, until=JAN + 90)
+    assert window['total_snapshots'] == 1
+    assert window['snapshots'] == [{'at': JAN + 60, 'players': ['bob', 'ann']}]
+    assert {e['type'] for e in window['events']} == {'rank'}
+    assert history.window(limit=2)['snapshots'][0]['at'] == JAN + 60
+
+    ann = history.player('ANN', since=JAN + 60)
+    assert ann['username'] == 'ann'
+    assert [p['rank'] for p in ann['points']] == [2, 1]
+    assert (ann['current_rank'], ann['best_rank'], ann['first_seen']) == (1, 1, JAN)
+    assert [(e['from'], e['to']) for e in ann['events']] == [(1, 2), (2, 1)]
+    # back_equip is cosmetic and not tracked
+    assert ann['equipment'] == {'weapon_equip': '100'}
+    assert history.player('nobody') is None
+
+
+def test_month_rollover_gzips_the_closed_segment(tmp_path, history):
+    history.record(board('ann', 'bob'), JAN)
+    history.record(board('bob', 'ann'), FEB)
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['2026-01.jsonl.gz', '2026-02.jsonl']
+    with gzip.open(tmp_path / '2026-01.jsonl.gz', 'rt') as f:
+        assert len(f.readlines()) == 1
+
+    reopened = LeaderboardHistory(tmp_path)
+    assert reopened.stats()['snapshots'] == 2
+    assert reopened.movement()['bob']['change'] == 1
+
+
+def test_out_of_order_timestamp_is_clamped(history):
+    history.record(board('ann', 'bob'), JAN + 60)
+    history.record(board('bob', 'ann'), JAN)
+    assert history.stats()['last_at'] == JAN + 60
+
+
+def test_second_process_catches_up(tmp_path):
+    first, second = LeaderboardHistory(tmp_path), LeaderboardHistory(tmp_path)
+    first.record(board('ann', 'bob'), JAN)
+    # The other worker fetched the same leaderboard: nothing new to store
+    assert second.record(board('ann', 'bob'), JAN + 30) is None
+
+    second.record(board('bob', 'ann'), JAN + 60)
+    # movement() stays cached until a query or record catches up
+    assert first.movement()['bob']['change'] == 0
+    assert first.stats()['snapshots'] == 2
+    assert first.movement()['bob']['change'] == 1
+    assert event_types(first.record(board('bob', 'ann', 'cat'), JAN + 90)) == [('new', 'cat')]
+
+    assert second.stats()['snapshots'] == 3
+    assert second.movement()['cat']['new']
+    assert len(second.window()['events']) == len(first.window()['events']) == 3
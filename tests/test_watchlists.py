@@ -0,0 +1,159 @@
+import pytest
+
+import watchlists
+from conftest import make_listing
+from listing_store import ListingStore
+from watchlists import Watchlists, normalize_filters
+
+
+def snapshot(listings, catalog):
+    return ListingStore.from_listings(listings, catalog)
+
+
+@pytest.fixture
+def base(catalog):
+    return [make_listing(i, gold=1000) for i in range(1, 4)]
+
+
+def test_normalize_filters_types_and_rejects_empty():
+    assert normalize_filters({'slot': ' head ', 'username': 'Bob', 'maxGold': '500', 'minPower': ''}) == \
+        {'slot': 'head', 'username': 'bob', 'maxGold': 500.0}
+    with pytest.raises(ValueError):
+        normalize_filters({'slot': ''})
+    with pytest.raises(ValueError):
+        normalize_filters({'maxGold': 'cheap'})
+    with pytest.raises(ValueError):
+        normalize_filters([])
+
+
+def test_per_user_query_limit():
+    lists = Watchlists(max_queries_per_user=2)
+    lists.add('alice', 'a', {'slot': 'head'})
+    lists.add('alice', 'b', {'slot': 'head'})
+    lists.add('bob', 'c', {'slot': 'head'})
+    with pytest.raises(ValueError):
+        lists.add('alice', 'd', {'slot': 'head'})
+    assert [q['name'] for q in lists.list('alice')] == ['a', 'b']
+    assert 'owner' not in lists.list('bob')[0]
+
+
+def test_first_snapshot_is_a_baseline_then_new_listings_match(catalog, base):
+    lists = Watchlists()
+    lists.add('alice', 'helms', {'slot': 'head', 'maxGold': 1500})
+
+    assert lists.process_snapshot(snapshot(base, catalog), catalog)['matched'] == 0
+    assert lists.matches('alice') == ([], 0)
+
+    summary = lists.process_snapshot(snapshot(base + [make_listing(10, gold=1200)], catalog), catalog)
+
+    assert summary['delta'] == 1
+    matches, cursor = lists.matches('alice')
+    assert [m['listing']['id'] for m in matches] == [10]
+    assert matches[0]['query_name'] == 'helms'
+    assert lists.matches('alice', since=cursor) == ([], cursor)
+
+
+def test_only_new_or_repriced_listings_are_matched(catalog, base):
+    lists = Watchlists()
+    lists.add('alice', 'cheap helms', {'slot': 'head', 'maxGold': 800})
+    lists.process_snapshot(snapshot(base, catalog), catalog)
+
+    repriced = [dict(listing) for listing in base]
+    repriced[1]['gold_cost'] = '700'
+    assert lists.process_snapshot(snapshot(repriced, catalog), catalog)['matched'] == 1
+    # Unchanged snapshot: nothing new
+    assert lists.process_snapshot(snapshot(repriced, catalog), catalog)['delta'] == 0
+    assert [m['listing']['id'] for m in lists.matches('alice')[0]] == [2]
+
+
+def test_inverted_index_skips_other_slots_and_residual_filters_apply(catalog, base):
+    lists = Watchlists()
+    lists.add('alice', 'bows', {'slot': 'weapon'})
+    lists.add('bob', 'strong helms', {'itemName': 'Iron Helm', 'minPower': 60})
+    lists.add('carol', 'from dave', {'username': 'DAVE'})
+    lists.process_snapshot(snapshot(base, catalog), catalog)
+
+    new = [make_listing(20, power='0.5'), make_listing(21, power='0.7'), make_listing(22, username='dave')]
+    summary = lists.process_snapshot(snapshot(base + new, catalog), catalog)
+
+    # The weapon query is never a candidate for helms
+    assert summary['evaluated'] == 6
+    assert [m['listing']['id'] for m in lists.matches('bob')[0]] == [21]
+    assert [m['listing']['id'] for m in lists.matches('carol')[0]] == [22]
+    assert lists.matches('alice')[0] == []
+
+
+def test_removed_query_stops_matching(catalog, base):
+    lists = Watchlists()
+    query = lists.add('alice', 'helms', {'slot': 'head'})
+    lists.process_snapshot(snapshot(base, catalog), catalog)
+    assert not lists.remove('bob', query['id'])
+    assert lists.remove('alice', query['id'])
+
+    lists.process_snapshot(snapshot(base + [make_listing(30)], catalog), catalog)
+
+    assert lists.matches('alice')[0] == []
+
+
+def test_workers_share_queries_and_one_match_sequence(tmp_path, catalog, base):
+    path = tmp_path / 'watchlists.json'
+    first, second = Watchlists(path), Watchlists(path)
+    first.add('alice', 'helms', {'slot': 'head'})
+    second.add('bob', 'helms', {'slot': 'head'})
+    assert len(first.list('bob')) == 1 and len(second.list('alice')) == 1
+
+    for lists in (first, second):
+        lists.process_snapshot(snapshot(base, catalog), catalog)
+    newer = snapshot(base + [make_listing(40)], catalog)
+    assert first.process_snapshot(newer, catalog)['matched'] == 2
+    # The other worker sees the same delta but the matches were delivered already
+    assert second.process_snapshot(newer, catalog)['matched'] == 0
+
+    assert first.matches('alice') == second.matches('alice')
+    assert sorted(m['seq'] for owner in ('alice', 'bob') for m in second.matches(owner)[0]) == [1, 2]
+
+
+def test_saves_from_two_workers_keep_each_others_queries(tmp_path):
+    path = tmp_path / 'watchlists.json'
+    first, second = Watchlists(path), Watchlists(path)
+    kept = first.add('alice', 'a', {'slot': 'head'})
+    dropped = second.add('alice', 'b', {'slot': 'head'})
+    first.remove('alice', dropped['id'])
+
+    assert [q['id'] for q in Watchlists(path).list('alice')] == [kept['id']]
+    assert [q['id'] for q in second.list('alice')] == [kept['id']]
+
+
+def test_matches_and_sequence_survive_a_restart(tmp_path, catalog, base):
+    path = tmp_path / 'watchlists.json'
+    lists = Watchlists(path)
+    lists.add('alice', 'helms', {'slot': 'head'})
+    lists.process_snapshot(snapshot(base, catalog), catalog)
+    lists.process_snapshot(snapshot(base + [make_listing(50)], catalog), catalog)
+
+    restarted = Watchlists(path)
+    matches, cursor = restarted.matches('alice')
+    assert [m['listing']['id'] for m in matches] == [50] and cursor == 1
+
+    restarted.process_snapshot(snapshot(base + [make_listing(50)], catalog), catalog)
+    restarted.process_snapshot(snapshot(base + [make_listing(50), make_listing(51)], catalog), catalog)
+    assert [m['seq'] for m in restarted.matches('alice', since=cursor)[0]] == [2]
+
+
+def test_log_compaction_keeps_inboxes_and_readers_follow(tmp_path, catalog, base, monkeypatch):
+    monkeypatch.setattr(watchlists, 'COMPACT_LOG_BYTES', 2000)
+    path = tmp_path / 'watchlists.json'
+    writer = Watchlists(path, max_matches_per_user=2)
+    reader = Watchlists(path, max_matches_per_user=2)
+    writer.add('alice', 'helms', {'slot': 'head'})
+    writer.process_snapshot(snapshot(base, catalog), catalog)
+    listings = list(base)
+    for i in range(60, 66):
+        listings.append(make_listing(i))
+        writer.process_snapshot(snapshot(listings, catalog), catalog)
+        reader.matches('alice')
+
+    log = tmp_path / 'watchlists_matches.jsonl'
+    assert log.stat().st_size < 2000
+    assert [m['seq'] for m in reader.matches('alice')[0]] == [5, 6]
+    assert [m['seq'] for m in Watchlists(path).matches('alice')[0]] == [5, 6]
@@ -0,0 +1,147 @@
+"""
+Lightweight per-request spans.
+Upstream calls (per portal route), upstream budget queue waits, cache
+lookups and JSON serialization are timed into the current request's
+span collector and reported as a Server-Timing header, and optionally
+as one structured JSON log line per request.
+"""
+
+import json
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+
+logger = logging.getLogger(__name__)
+
+# Collector bound to a worker thread by propagate()
+_local = threading.local()
+
+
+def _metric_name(name):
+    """Server-Timing metric names must be HTTP tokens."""
+    return re.sub(r'[^A-Za-z0-9_-]+', '_', name)
+
+
+class Spans:
+    """Span durations of one request, aggregated by name (thread-safe)."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._entries = {}      # name -> [total ms, count, max ms]
+
+    def add(self, name, duration_ms):
+        with self._lock:
+            entry = self._entries.setdefault(name, [0.0, 0, 0.0])
+            entry[0] += duration_ms
+            entry[1] += 1
+            entry[2] = max(entry[2], duration_ms)
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                name: {'total_ms': round(total, 1), 'count': count, 'max_ms': round(longest, 1)}
+                for name, (total, count, longest) in self._entries.items()
+            }
+
+    def header(self):
+        """
+        Server-Timing value. Repeated spans (e.g. parallel upstream calls)
+        are summed; desc carries the count and the slowest single span.
+        """
+        parts = []
+        for name, entry in self.as_dict().items():
+            part = f"{_metric_name(name)};dur={entry['total_ms']}"
+            if entry['count'] > 1:
+                part += f';desc="{entry["count"]}x, max {entry["max_ms"]}ms"'
+            parts.append(part)
+        parts.append(f"total;dur={self.elapsed_ms():.1f}")
+        return ", ".join(parts)
+
+
+def current():
+    """Span collector of the running request (None outside requests)."""
+    spans = getattr(_local, 'spans', None)
+    if spans is None and has_request_context():
+        spans = g.get('spans')
+    return spans
+
+
+@contextmanager
+def span(name):
+    """Time the enclosed block into the current request's spans."""
+    spans = current()
+    if spans is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        spans.add(name, (time.perf_counter() - started) * 1000)
+
+
+def propagate(fn):
+    """
+    Wrap fn so spans recorded while it runs in a worker thread land in
+    the submitting request's collector.
+    """
+    spans = current()
+
+    def run(*args, **kwargs):
+        previous = getattr(_local, 'spans', None)
+        _local.spans = spans
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _local.spans = previous
+
+    return run
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """JSON provider whose jsonify() serialization is recorded as a span."""
+
+    def response(self, *args, **kwargs):
+        with span('serialize'):
+            return super().response(*args, **kwargs)
+
+
+def init_app(app, log_json=False):
+    """
+    Collect spans for every request and emit them as Server-Timing.
+
+    Args:
+        app: Flask app
+        log_json: Also log one JSON line per request with all spans
+    """
+    app.json = TimedJSONProvider(app)
+
+    @app.before_request
+    def _start_spans():
+        g.spans = Spans()
+
+    @app.after_request
+    def _emit_spans(response):
+        spans = g.get('spans')
+        if spans is None:
+            return response
+        response.headers['Server-Timing'] = spans.header()
+        if log_json:
+            logger.info(json.dumps({
+                'event': 'request_timing',
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'total_ms': round(spans.elapsed_ms(), 1),
+                'spans': spans.as_dict(),
+            }))
+        return response
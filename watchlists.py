@@ -0,0 +1,421 @@
+"""
+Saved-search watchlists matched incrementally against listing deltas.
+Users save FilterEngine-style queries (owned by a hash of their token).
+On every listings snapshot only new or repriced listings are matched, and
+an inverted index on slot, class and item name picks the candidate
+queries so not every query is evaluated against every listing.
+Workers sharing the cache directory share one store: queries live in a
+JSON file rewritten under a file lock after reloading it, and matches are
+appended to a log with one sequence across workers and restarts, which
+every worker tails into its inboxes.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from pathlib import Path
+
+from deals import listing_group
+from listing_store import build_catalog_index
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; the store is then per process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Filter fields accepted in a saved query (same names as FilterEngine.getMarketplaceFilters)
+TEXT_FIELDS = ('username', 'itemName', 'slot', 'itemClass', 'extraProp', 'twoHanded')
+NUMBER_FIELDS = ('minPower', 'maxPower', 'minRange', 'maxRange', 'maxPlatinum', 'maxGold', 'maxGems')
+
+MAX_QUERIES_PER_USER = 20
+MAX_MATCHES_PER_USER = 200
+
+# Match log size that triggers rewriting it with just the inbox contents
+COMPACT_LOG_BYTES = 8 * 1024 * 1024
+
+
+def hash_token(token):
+    """Owner key for a user token; raw tokens are never stored."""
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+def normalize_filters(filters):
+    """
+    Keep only known filter fields, typed and trimmed.
+
+    Raises:
+        ValueError: if filters is not a dict or sets no field at all
+    """
+    if not isinstance(filters, dict):
+        raise ValueError("Filters must be an object")
+    normalized = {}
+    for field in TEXT_FIELDS:
+        value = str(filters.get(field) or '').strip()
+        if value:
+            normalized[field] = value.lower() if field == 'username' else value
+    for field in NUMBER_FIELDS:
+        value = filters.get(field)
+        if value in (None, ''):
+            continue
+        try:
+            normalized[field] = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid value for {field}")
+    if not normalized:
+        raise ValueError("At least one filter is required")
+    return normalized
+
+
+class Watchlists:
+    """Registry of saved queries plus per-user match inboxes."""
+
+    def __init__(self, path=None, max_queries_per_user=MAX_QUERIES_PER_USER,
+                 max_matches_per_user=MAX_MATCHES_PER_USER):
+        self.path = Path(path) if path else None
+        self.max_queries_per_user = max_queries_per_user
+        self.max_matches_per_user = max_matches_per_user
+        self.lock = threading.Lock()
+
+        self._queries = {}                     # query id -> record
+        self._by_slot = defaultdict(set)       # slot ('' = any) -> query ids
+        self._by_class = defaultdict(set)      # class ('' = any) -> query ids
+        self._by_name = defaultdict(set)       # item name ('' = any) -> query ids
+        self._matches = defaultdict(lambda: deque(maxlen=self.max_matches_per_user))
+        self._sequence = 0                     # highest match seq seen
+        self._fingerprints = None              # None until the first snapshot is seen
+
+        # What this process last read of the shared files
+        self._queries_stamp = None
+        self._log_path = self.path.with_name(self.path.stem + '_matches.jsonl') if self.path else None
+        self._log_inode = None
+        self._log_offset = 0
+
+        with self.lock:
+            self._sync_queries()
+            self._sync_matches()
+        if self._queries:
+            logger.info(f"Loaded {len(self._queries)} saved watchlist queries")
+
+    # Shared store
+
+    @staticmethod
+    def _stamp(path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    @contextmanager
+    def _file_lock(self):
+        """Serialize read-modify-write of the shared files with other processes."""
+        if not self.path or fcntl is None:
+            yield
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path.with_name(self.path.name + '.lock'), 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            yield
+
+    def _sync_queries(self):
+        """Reload the queries file if another process rewrote it (caller holds the lock)."""
+        if not self.path:
+            return
+        stamp = self._stamp(self.path)
+        if stamp is None or stamp == self._queries_stamp:
+            return
+        try:
+            with open(self.path, 'r') as f:
+                records = json.load(f).get('queries', [])
+        except Exception as e:
+            logger.error(f"Error loading watchlists: {e}")
+            return
+        self._queries.clear()
+        self._by_slot.clear()
+        self._by_class.clear()
+        self._by_name.clear()
+        for record in records:
+            self._index(record)
+        self._queries_stamp = stamp
+
+    def _save(self):
+        """Persist queries (caller holds the lock and the file lock, after _sync_queries)."""
+        if not self.path:
+            return
+        tmp = self.path.with_name(f'.{self.path.name}.{os.getpid()}.tmp')
+        try:
+            with open(tmp, 'w') as f:
+                json.dump({'queries': list(self._queries.values())}, f)
+            os.replace(tmp, self.path)
+            self._queries_stamp = self._stamp(self.path)
+        except Exception as e:
+            logger.error(f"Error saving watchlists: {e}")
+
+    def _sync_matches(self):
+        """Apply matches appended to the log since the last call, by any process (caller holds the lock)."""
+        if not self._log_path:
+            return
+        stamp = self._stamp(self._log_path)
+        if stamp is None:
+            return
+        inode, size, _ = stamp
+        if inode != self._log_inode or size < self._log_offset:
+            # Compacted by some process: its contents replace the inboxes
+            self._matches.clear()
+            self._log_inode = inode
+            self._log_offset = 0
+        if size == self._log_offset:
+            return
+        try:
+            with open(self._log_path, 'rb') as f:
+                f.seek(self._log_offset)
+                data = f.read()
+        except OSError as e:
+            logger.error(f"Error reading watchlist matches: {e}")
+            return
+        # Only complete lines: a writer may be mid-append
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].splitlines():
+            try:
+                self._deliver(json.loads(line))
+            except (ValueError, KeyError, TypeError) as e:
+                logger.error(f"Skipping bad watchlist match line: {e}")
+        self._log_offset += end
+
+    def _deliver(self, match):
+        match = dict(match)
+        self._matches[match.pop('owner')].append(match)
+        self._sequence = max(self._sequence, match['seq'])
+
+    def _append_matches(self, records):
+        """Log new matches for every process (caller holds the lock and the file lock, after _sync_matches)."""
+        for record in records:
+            self._deliver(record)
+        if not self._log_path or not records:
+            return
+        data = b''.join(json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n'
+                        for record in records)
+        try:
+            with open(self._log_path, 'ab') as f:
+                f.write(data)
+            stamp = self._stamp(self._log_path)
+            if stamp[0] != self._log_inode:
+                self._log_inode, self._log_offset = stamp[0], 0
+            self._log_offset += len(data)
+            if self._log_offset > COMPACT_LOG_BYTES:
+                self._compact_log()
+        except OSError as e:
+            logger.error(f"Error saving watchlist matches: {e}")
+
+    def _compact_log(self):
+        """Rewrite the match log with only what the inboxes still hold."""
+        records = sorted(({**match, 'owner': owner} for owner, inbox in self._matches.items() for match in inbox),
+                         key=lambda record: record['seq'])
+        tmp = self._log_path.with_name(f'.{self._log_path.name}.{os.getpid()}.tmp')
+        with open(tmp, 'wb') as f:
+            for record in records:
+                f.write(json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n')
+        os.replace(tmp, self._log_path)
+        stamp = self._stamp(self._log_path)
+        self._log_inode, self._log_offset = stamp[0], stamp[1]
+        logger.info(f"Compacted watchlist match log to {len(records)} matches")
+
+    def _index(self, record):
+        query_id, filters = record['id'], record['filters']
+        self._queries[query_id] = record
+        self._by_slot[filters.get('slot', '')].add(query_id)
+        self._by_class[filters.get('itemClass', '')].add(query_id)
+        self._by_name[filters.get('itemName', '')].add(query_id)
+
+    def _unindex(self, query_id):
+        filters = self._queries.pop(query_id)['filters']
+        self._by_slot[filters.get('slot', '')].discard(query_id)
+        self._by_class[filters.get('itemClass', '')].discard(query_id)
+        self._by_name[filters.get('itemName', '')].discard(query_id)
+
+    def add(self, owner, name, filters):
+        """
+        Save a query for owner (a hash_token value).
+
+        Raises:
+            ValueError: on invalid filters or when the per-user limit is reached
+        """
+        filters = normalize_filters(filters)
+        with self.lock, self._file_lock():
+            self._sync_queries()
+            owned = sum(1 for record in self._queries.values() if record['owner'] == owner)
+            if owned >= self.max_queries_per_user:
+                raise ValueError("Watchlist limit reached")
+            record = {
+                'id': uuid.uuid4().hex[:12],
+                'owner': owner,
+                'name': str(name or 'Saved search')[:100],
+                'filters': filters,
+                'created_at': time.time(),
+            }
+            self._index(record)
+            self._save()
+        return self._public(record)
+
+    def remove(self, owner, query_id):
+        with self.lock, self._file_lock():
+            self._sync_queries()
+            record = self._queries.get(query_id)
+            if not record or record['owner'] != owner:
+                return False
+            self._unindex(query_id)
+            self._save()
+            return True
+
+    def list(self, owner):
+        with self.lock:
+            self._sync_queries()
+            return [self._public(r) for r in self._queries.values() if r['owner'] == owner]
+
+    def matches(self, owner, since=0):
+        """
+        Matches delivered to owner after cursor since.
+
+        Returns:
+            (list of match records, cursor to pass as since next time)
+        """
+        with self.lock:
+            self._sync_matches()
+            inbox = self._matches.get(owner) or ()
+            result = [m for m in inbox if m['seq'] > since]
+        cursor = result[-1]['seq'] if result else since
+        return result, cursor
+
+    @staticmethod
+    def _public(record):
+        return {k: v for k, v in record.items() if k != 'owner'}
+
+    def _candidates(self, slot, classes, item_name):
+        """Queries whose indexed predicates admit a listing."""
+        by_slot = self._by_slot.get(slot, set()) | self._by_slot.get('', set())
+        by_class = set(self._by_class.get('', set()))
+        for cls in classes:
+            by_class |= self._by_class.get(cls, set())
+        by_name = self._by_name.get(item_name, set()) | self._by_name.get('', set())
+        sets = sorted((by_slot, by_class, by_name), key=len)
+        return sets[0].intersection(*sets[1:])
+
+    @staticmethod
+    def _residual_match(filters, row):
+        """Predicates not covered by the inverted index."""
+        if 'username' in filters and filters['username'] not in row['username'].lower():
+            return False
+        if 'extraProp' in filters and filters['extraProp'] not in row['stats']:
+            return False
+        if filters.get('twoHanded') == 'yes' and not row['two_handed']:
+            return False
+        if filters.get('twoHanded') == 'no' and row['two_handed']:
+            return False
+        power = row['power'] * 100
+        if power < filters.get('minPower', float('-inf')) or power > filters.get('maxPower', float('inf')):
+            return False
+        if 'minRange' in filters and not row['range'] >= filters['minRange']:
+            return False
+        if 'maxRange' in filters and not row['range'] <= filters['maxRange']:
+            return False
+        if row['platinum_cost'] > filters.get('maxPlatinum', float('inf')):
+            return False
+        if row['total_gold'] > filters.get('maxGold', float('inf')):
+            return False
+        if row['gem_cost'] > filters.get('maxGems', float('inf')):
+            return False
+        return True
+
+    @staticmethod
+    def _match_key(query_id, listing):
+        return (query_id, listing['id'], listing['platinum_cost'], listing['gold_cost'], listing['gem_cost'])
+
+    def process_snapshot(self, store, items_data=None):
+        """
+        Match the new and repriced listings of a snapshot against all queries.
+        The first snapshot only records a baseline (nothing is "new" yet).
+        Every worker diffs against the snapshot it saw last, so a listing
+        already matched by another worker is not delivered twice.
+
+        Returns:
+            Dict with counts of delta rows, candidate evaluations and matches
+        """
+        changed_rows, removed_ids, fingerprints = store.diff(self._fingerprints or {})
+        if self._fingerprints is None:
+            self._fingerprints = fingerprints
+            return {'delta': 0, 'evaluated': 0, 'matched': 0}
+        self._fingerprints = fingerprints
+
+        catalog = build_catalog_index(items_data)
+        evaluated = 0
+        records = []
+        delivered = {}
+        groups = {}                            # (base item, slot, extra) -> listing_group, this snapshot only
+        now = time.time()
+        with self.lock, self._file_lock():
+            self._sync_queries()
+            if not self._queries:
+                return {'delta': len(changed_rows), 'evaluated': 0, 'matched': 0}
+            self._sync_matches()
+            for i in changed_rows:
+                slot = store.slots.values[store.slot_codes[i]]
+                classes = store.classes.values[store.class_codes[i]].split(',')
+                item_name = store.item_names.values[store.item_name_codes[i]]
+                candidates = self._candidates(slot, classes, item_name)
+                if not candidates:
+                    continue
+
+                memo_key = (store.base_item_ids[i], slot, store.extra[i])
+                if memo_key not in groups:
+                    catalog_item = catalog.get((str(store.base_item_ids[i]), slot)) or {}
+                    groups[memo_key] = listing_group(*memo_key, catalog_item)
+                _, stats, two_handed = groups[memo_key]
+                row = {
+                    'username': store.usernames.values[store.username_codes[i]],
+                    'stats': stats,
+                    'two_handed': two_handed,
+                    'power': store.power[i],
+                    'range': store.range[i],
+                    'platinum_cost': store.platinum_cost[i],
+                    'total_gold': store.total_gold[i],
+                    'gem_cost': store.gem_cost[i],
+                }
+
+                listing = None
+                for query_id in candidates:
+                    evaluated += 1
+                    record = self._queries[query_id]
+                    if not self._residual_match(record['filters'], row):
+                        continue
+                    listing = listing or store.row(i)
+                    owner = record['owner']
+                    if owner not in delivered:
+                        delivered[owner] = {self._match_key(m['query_id'], m['listing'])
+                                            for m in self._matches.get(owner) or ()}
+                    key = self._match_key(query_id, listing)
+                    if key in delivered[owner]:
+                        continue
+                    delivered[owner].add(key)
+                    self._sequence += 1
+                    records.append({
+                        'seq': self._sequence,
+                        'owner': owner,
+                        'query_id': query_id,
+                        'query_name': record['name'],
+                        'matched_at': now,
+                        'listing': listing,
+                    })
+            self._append_matches(records)
+
+        summary = {'delta': len(changed_rows), 'removed': len(removed_ids),
+                   'evaluated': evaluated, 'matched': len(records)}
+        logger.info(f"Watchlists matched snapshot delta: {summary}")
+        return summary